@@ -0,0 +1,48 @@
+import pytest
+from qmanalysis.containers import AtomData, FrameData
+from qmanalysis.xyzreader import XYZFile
+
+from .synthetic import write_gaussian_logs, write_xyz_trajectory
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-scale", type=int, default=1,
+                     help="Multiplier for the size of the synthetic benchmark datasets")
+
+
+@pytest.fixture(scope="session")
+def scale(request):
+    return request.config.getoption("--bench-scale")
+
+
+@pytest.fixture(scope="session")
+def xyz_paths(tmp_path_factory, scale):
+    return write_xyz_trajectory(tmp_path_factory.mktemp("xyz"), n_frames=10 * scale, n_atoms=24)
+
+
+@pytest.fixture(scope="session")
+def gaussian_paths(tmp_path_factory, scale):
+    return write_gaussian_logs(tmp_path_factory.mktemp("gaussian"), n_files=2 * scale,
+                               n_atoms=24, n_steps=10, scf_cycles=50)
+
+
+@pytest.fixture
+def loaded_xyz(xyz_paths):
+    """AtomData and FrameData holding every synthetic XYZ frame."""
+    atom_data = AtomData()
+    frame_data = FrameData()
+    for path in xyz_paths:
+        XYZFile(atom_data, frame_data, str(path), file_name=path.stem)
+    return atom_data, frame_data
+
+
+@pytest.fixture
+def measurements_yaml():
+    return {
+        "measurements": {
+            "distance": [{"name": "d12", "a": 1, "b": 2}, {"name": "dS", "a": "S1", "b": 3}],
+            "angle": [{"name": "a123", "a": 1, "b": 2, "c": 3}],
+            "dihedral": [{"name": "t1234", "a": 1, "b": 2, "c": 3, "d": 4}],
+        },
+        "substitutions": [{"name": "S1", "entries": [{"file": "frame*", "atom_index": 5}]}],
+    }
@@ -0,0 +1,152 @@
+"""
+Synthetic input generators for the benchmark suite.
+
+All generators are deterministic for a given seed, so timings from
+different runs and releases are comparable.
+"""
+
+import numpy as np
+from pathlib import Path
+
+ELEMENTS = [("C", 6), ("H", 1), ("N", 7), ("O", 8)]
+
+
+def random_geometry(n_atoms, seed=0, spacing=1.5):
+    """
+    Return (symbols, atomic_numbers, coordinates) for `n_atoms` atoms placed on a
+    jittered cubic grid, so no two atoms coincide.
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(n_atoms ** (1.0 / 3.0)))
+    grid = np.stack(np.meshgrid(np.arange(side), np.arange(side),
+                    np.arange(side), indexing="ij"), axis=-1).reshape(-1, 3)
+    coords = grid[:n_atoms] * spacing + rng.normal(0.0, 0.1, (n_atoms, 3))
+    picks = rng.integers(0, len(ELEMENTS), n_atoms)
+    symbols = [ELEMENTS[i][0] for i in picks]
+    numbers = [ELEMENTS[i][1] for i in picks]
+    return symbols, numbers, coords
+
+
+def xyz_text(symbols, coords, comment="synthetic frame"):
+    lines = [str(len(symbols)), comment]
+    lines += [f"{s} {x:12.6f} {y:12.6f} {z:12.6f}" for s,
+              (x, y, z) in zip(symbols, coords)]
+    return "\n".join(lines) + "\n"
+
+
+def write_xyz_trajectory(directory, n_frames, n_atoms, seed=0, prefix="frame"):
+    """
+    Write `n_frames` single-frame XYZ files of a randomly vibrating molecule with
+    `n_atoms` atoms into `directory` and return their paths.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    symbols, _, coords = random_geometry(n_atoms, seed)
+    paths = []
+    for frame in range(n_frames):
+        displaced = coords + rng.normal(0.0, 0.05, coords.shape)
+        path = directory / f"{prefix}{frame:05d}.xyz"
+        path.write_text(xyz_text(symbols, displaced, f"frame {frame}"))
+        paths.append(path)
+    return paths
+
+
+def _orientation_block(numbers, coords):
+    dashes = " " + "-" * 69
+    lines = ["                         Standard orientation:                         ",
+             dashes,
+             " Center     Atomic      Atomic             Coordinates (Angstroms)",
+             " Number     Number       Type             X           Y           Z",
+             dashes]
+    for i, (num, (x, y, z)) in enumerate(zip(numbers, coords), start=1):
+        lines.append(
+            f" {i:6d} {num:10d} {0:11d} {x:15.6f} {y:11.6f} {z:11.6f}")
+    lines.append(dashes)
+    lines.append("")
+    return lines
+
+
+def _archive_block(symbols, coords, energy, comment):
+    atoms = "\\".join(f"{s},{x:.6f},{y:.6f},{z:.6f}" for s,
+                      (x, y, z) in zip(symbols, coords))
+    archive = ("1\\1\\GINC-SYNTH\\FOpt\\RB3LYP\\6-31G(d)\\SYNTH\\BENCH\\01-Jan-2025\\0\\\\"
+               f"#p opt freq b3lyp/6-31g(d)\\\\{comment}\\\\0,1\\{atoms}\\\\"
+               f"Version=ES64L-G16RevC.01\\State=1-A\\HF={energy:.7f}\\RMSD=1.234e-09\\"
+               "RMSF=2.345e-05\\ZeroPoint=0.1012345\\Thermal=0.1065432\\"
+               "Dipole=0.1,-0.2,0.3\\PG=C01 [X(C6H6)]\\NImag=0\\\\@")
+    return [" " + archive[i:i + 70] for i in range(0, len(archive), 70)] + [""]
+
+
+def _frequency_block(numbers, rng):
+    # Normal mode table of a frequency job, three modes per block
+    n_modes = max(3 * len(numbers) - 6, 1)
+    frequencies = np.sort(rng.uniform(30.0, 3500.0, n_modes))
+    rows = {"Frequencies --": frequencies,
+            "Red. masses --": rng.uniform(1.0, 12.0, n_modes),
+            "Frc consts  --": rng.uniform(0.01, 8.0, n_modes),
+            "IR Inten    --": rng.uniform(0.0, 200.0, n_modes),
+            "Raman Activ --": rng.uniform(0.0, 150.0, n_modes),
+            "Depolar (P) --": np.full(n_modes, 0.75),
+            "Depolar (U) --": np.full(n_modes, 0.8571)}
+    lines = [" Harmonic frequencies (cm**-1), IR intensities (KM/Mole), Raman scattering",
+             " activities (A**4/AMU), depolarization ratios for plane and unpolarized",
+             " incident light, reduced masses (AMU), force constants (mDyne/A),",
+             " and normal coordinates:"]
+    for start in range(0, n_modes, 3):
+        block = range(start, min(start + 3, n_modes))
+        lines.append(" " * 18 + "".join(f"{k + 1:>23d}" for k in block))
+        lines.append(" " * 18 + "".join(f"{'A':>23s}" for k in block))
+        for label, values in rows.items():
+            lines.append(f" {label}" + "".join(f"{values[k]:>23.4f}" for k in block))
+        lines.append("  Atom  AN" + "      X      Y      Z  " * len(block))
+        for i, number in enumerate(numbers, start=1):
+            lines.append(f" {i:5d} {number:3d}" + "".join(
+                "".join(f"{v:7.2f}" for v in rng.uniform(-0.5, 0.5, 3)) + "  " for _ in block))
+    lines += ["", " - Thermochemistry -", " Temperature   298.150 Kelvin.  Pressure   1.00000 Atm.",
+              " Rotational symmetry number  1.", ""]
+    return lines, frequencies
+
+
+def gaussian_log_text(n_atoms, n_steps=5, scf_cycles=20, seed=0, frequencies=False):
+    """
+    Return the text of a Gaussian-like optimisation log with `n_steps` geometry
+    steps, each followed by `scf_cycles` lines of SCF iteration noise, and a
+    final archive block. With `frequencies`, a normal mode table of a frequency
+    job is printed before the archive block.
+    """
+    rng = np.random.default_rng(seed)
+    symbols, numbers, coords = random_geometry(n_atoms, seed)
+    lines = [" Entering Gaussian System, Link 0=g16",
+             " #p opt freq b3lyp/6-31g(d)", ""]
+    energy = -100.0 - n_atoms
+    for step in range(n_steps):
+        coords = coords + rng.normal(0.0, 0.01, coords.shape)
+        lines += _orientation_block(numbers, coords)
+        for cycle in range(scf_cycles):
+            lines.append(
+                f" Cycle {cycle + 1:4d}  Pass 1  IDiag  1:  E= {energy - cycle * 1e-4:.12f}  Delta-E= {1e-4:.9f}")
+        energy -= 1e-3
+        lines.append(
+            f" SCF Done:  E(RB3LYP) =  {energy:.9f}     A.U. after   {scf_cycles} cycles")
+    if frequencies:
+        lines += _frequency_block(numbers, rng)[0]
+    lines += _archive_block(symbols, coords, energy, "synthetic benchmark")
+    lines.append(" Normal termination of Gaussian 16.")
+    return "\n".join(lines) + "\n"
+
+
+def write_gaussian_logs(directory, n_files, n_atoms, n_steps=5, scf_cycles=20, seed=0, prefix="opt",
+                        frequencies=False):
+    """
+    Write `n_files` Gaussian-like logs into `directory` and return their paths.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n_files):
+        path = directory / f"{prefix}{i:05d}.out"
+        path.write_text(gaussian_log_text(
+            n_atoms, n_steps, scf_cycles, seed + i, frequencies))
+        paths.append(path)
+    return paths
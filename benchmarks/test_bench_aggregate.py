@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+from qmanalysis.aggregate import aggregate_frames
+
+
+class _Frames:
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+
+
+def test_aggregate_conformers(benchmark, scale):
+    rng = np.random.default_rng(0)
+    n_frames = 20000 * scale
+    index = pd.MultiIndex.from_arrays(
+        [[f"mol{i // 50:04d}_conf{i % 50:02d}" for i in range(n_frames)],
+         [f"mol{i // 50:04d}_conf{i % 50:02d}.out" for i in range(n_frames)], [None] * n_frames],
+        names=["file_name", "file_path", "timestep_name"])
+    frame_data = _Frames(pd.DataFrame(rng.normal(size=(n_frames, 6)),
+                                      columns=["HF", "a", "b", "c", "d", "e"], index=index))
+    frame_data.dataframe["HF"] = -500.0 + 0.005 * frame_data.dataframe["HF"]
+    summary = benchmark(aggregate_frames, frame_data, ["a", "b", "c", "d", "e"], pattern=r"^(mol\d+)_")
+    assert len(summary) == n_frames // 50
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis.containers import FrameData
+from qmanalysis.customcalculationrunner import CustomCalculationRunner
+
+
+@pytest.fixture
+def frame_data(scale):
+    n = 500 * scale
+    rng = np.random.default_rng(0)
+    frame_data = FrameData()
+    idx = pd.MultiIndex.from_arrays([[f"f{i}" for i in range(n)], [f"/f{i}.xyz" for i in range(n)], ["init"] * n],
+                                    names=frame_data.dataframe.index.names)
+    frame_data.dataframe = pd.DataFrame({"HF": rng.normal(-100.0, 1.0, n),
+                                         "ZPE": rng.normal(0.1, 0.01, n),
+                                         "d12": rng.normal(1.5, 0.1, n)}, index=idx)
+    return frame_data
+
+
+def test_custom_calculation(benchmark, frame_data):
+    calcs = [{"name": "E_kcal", "expr": "(HF + ZPE) * 627.509"},
+             {"name": "rel", "expr": "E_kcal - pivot('f0', 'E_kcal')"},
+             {"name": "d2", "expr": "np.sqrt(d12 * d12)"}]
+    runner = CustomCalculationRunner(frame_data)
+    benchmark(runner.run, calcs)
+    assert frame_data.dataframe["rel"].notna().all()
@@ -0,0 +1,15 @@
+import numpy as np
+from qmanalysis.clustering import cluster_frames, rmsd_neighbours
+
+
+def test_rmsd_neighbours(benchmark, scale):
+    coords = np.random.default_rng(0).normal(size=(500 * scale, 24, 3))
+    pairs = benchmark.pedantic(rmsd_neighbours, args=(coords, 1.0), kwargs={"memory_mb": 16},
+                               rounds=3, iterations=1)
+    assert pairs.shape[1] == 2
+
+
+def test_cluster_frames(benchmark, loaded_xyz):
+    atom_data, frame_data = loaded_xyz
+    result = benchmark(cluster_frames, atom_data, 0.5)
+    assert len(result) == len(frame_data.dataframe)
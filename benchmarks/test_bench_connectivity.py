@@ -0,0 +1,16 @@
+import numpy as np
+from qmanalysis.connectivity import analyze_frames, perceive_bonds
+
+from .synthetic import random_geometry
+
+
+def test_perceive_bonds(benchmark, scale):
+    _, numbers, coords = random_geometry(5000 * scale, spacing=1.2)
+    bonds = benchmark(perceive_bonds, np.array(numbers), coords)
+    assert len(bonds) > 0
+
+
+def test_analyze_frames(benchmark, loaded_xyz):
+    atom_data, frame_data = loaded_xyz
+    result = benchmark(analyze_frames, atom_data, measurements=["bonds", "angles", "torsions"])
+    assert len(result) == len(frame_data.dataframe)
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+from qmanalysis.constantsjoin import join_constants
+
+
+def test_join_constants(benchmark, scale):
+    n = 20000 * scale
+    index = pd.MultiIndex.from_arrays([[f"conf{i % 500}" for i in range(n)],
+                                       [f"/run{i % 7}/conf{i}.out" for i in range(n)],
+                                       [f"step{i % 20:04d}" for i in range(n)]],
+                                      names=("file_name", "file_path", "timestep_name"))
+    frame_df = pd.DataFrame({"HF": np.zeros(n)}, index=index)
+    constants = pd.DataFrame({
+        "file_name": [f"conf{i}" for i in range(400)] + [np.nan] * 7,
+        "file_path": [np.nan] * 400 + [f"/run{i}/*" for i in range(7)],
+        "weight": np.arange(407, dtype=float),
+        "radius": np.arange(407, dtype=float) / 100.0,
+    })
+    result = benchmark(join_constants, frame_df, constants)
+    assert result["weight"].notna().all()
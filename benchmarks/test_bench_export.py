@@ -0,0 +1,22 @@
+from qmanalysis.framedataexporter import FrameDataExporter
+
+
+def test_export_csv_tuples(benchmark, loaded_xyz, tmp_path):
+    _, frame_data = loaded_xyz
+    exporter = FrameDataExporter(frame_data)
+    benchmark(exporter.export_csv_tuples, tmp_path / "out.csv")
+    assert (tmp_path / "out.csv").exists()
+
+
+def test_export_csv_multiindex(benchmark, loaded_xyz, tmp_path):
+    _, frame_data = loaded_xyz
+    exporter = FrameDataExporter(frame_data)
+    benchmark(exporter.export_csv_multiindex, tmp_path / "out.csv")
+    assert (tmp_path / "out.csv").exists()
+
+
+def test_export_xls_tuples(benchmark, loaded_xyz, tmp_path):
+    _, frame_data = loaded_xyz
+    exporter = FrameDataExporter(frame_data)
+    benchmark(exporter.export_xls_tuples, tmp_path / "out.xlsx")
+    assert (tmp_path / "out.xlsx").exists()
@@ -0,0 +1,7 @@
+from qmanalysis.fingerprint import geometry_fingerprints
+
+
+def test_geometry_fingerprints(benchmark, loaded_xyz):
+    atom_data, frame_data = loaded_xyz
+    fingerprints = benchmark(geometry_fingerprints, atom_data)
+    assert len(fingerprints) == len(frame_data.dataframe)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from qmanalysis import kernels
+
+BACKENDS = ["numpy", pytest.param("numba", marks=pytest.mark.skipif(
+    not kernels.numba_available(), reason="numba is not installed"))]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = kernels.get_backend()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+def warm(kernel, *args):
+    # Numba compiles on the first call, which should not be timed
+    kernel(*args)
+    return args
+
+
+def test_dihedrals(benchmark, backend, scale):
+    coords = np.random.default_rng(0).normal(size=(4, 10000 * scale, 3))
+    values = benchmark(kernels.dihedrals, *warm(kernels.dihedrals, *coords))
+    assert values.shape == (10000 * scale,)
+
+
+def test_pair_repulsion(benchmark, backend, scale):
+    points = np.random.default_rng(0).uniform(size=(200 * scale, 2))
+    assert benchmark(kernels.pair_repulsion, *warm(kernels.pair_repulsion, points)) > 0
+
+
+def test_center_repulsion(benchmark, backend, scale):
+    rng = np.random.default_rng(0)
+    points, centers = rng.uniform(size=(2, 200 * scale, 2))
+    args = warm(kernels.center_repulsion, points, centers, 500.0)
+    assert benchmark(kernels.center_repulsion, *args) > 0
+
+
+def test_prune_close(benchmark, backend, scale):
+    positions = np.random.default_rng(0).uniform(size=(500 * scale, 2))
+    assert benchmark(kernels.prune_close, *warm(kernels.prune_close, positions, 0.02)).any()
@@ -0,0 +1,15 @@
+import numpy as np
+from src.main import circler
+
+
+def test_circler(benchmark, scale):
+    rng = np.random.default_rng(0)
+    markers = rng.uniform(0.0, 10.0, (5 * scale, 2))
+    others = rng.uniform(0.0, 10.0, (5 * scale, 2))
+
+    def layout():
+        np.random.seed(0)
+        return circler(markers, others, 0.045, x_axis_start=0.0, y_axis_start=0.0,
+                       x_axis_end=10.0, y_axis_end=10.0)
+    positions = benchmark.pedantic(layout, rounds=3, iterations=1)
+    assert positions.shape == markers.shape
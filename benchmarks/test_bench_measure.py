@@ -0,0 +1,28 @@
+from qmanalysis.measure import Measure
+from src.main import apply_substitutions, resolve_atom, run_measurements
+
+
+def test_measure_dihedral(benchmark, loaded_xyz):
+    atom_data, frame_data = loaded_xyz
+    file_name = frame_data.dataframe.index.get_level_values("file_name")[0]
+    idx = [resolve_atom(atom_data, i, None, file_name) for i in (1, 2, 3, 4)]
+    benchmark(Measure().dihedral, atom_data, *idx)
+
+
+def test_resolve_atom(benchmark, loaded_xyz):
+    atom_data, frame_data = loaded_xyz
+    file_name = frame_data.dataframe.index.get_level_values("file_name")[-1]
+    assert benchmark(resolve_atom, atom_data, 7, None, file_name) is not None
+
+
+def test_substitutions(benchmark, loaded_xyz, measurements_yaml):
+    atom_data, _ = loaded_xyz
+    benchmark(apply_substitutions, measurements_yaml, atom_data)
+    assert (atom_data.dataframe["alias"] == "S1").sum() > 0
+
+
+def test_run_measurements(benchmark, loaded_xyz, measurements_yaml):
+    atom_data, frame_data = loaded_xyz
+    apply_substitutions(measurements_yaml, atom_data)
+    benchmark(run_measurements, measurements_yaml, atom_data, frame_data)
+    assert frame_data.dataframe["t1234"].notna().all()
@@ -0,0 +1,49 @@
+import pytest
+from qmanalysis.containers import AtomData, FrameData
+from qmanalysis.gaussianoutreader import GaussianOutFile
+from qmanalysis.xyzreader import XYZFile
+from src.main import load_files
+
+
+def test_xyzfile(benchmark, xyz_paths):
+    def read_all():
+        atom_data, frame_data = AtomData(), FrameData()
+        for path in xyz_paths:
+            XYZFile(atom_data, frame_data, str(path), file_name=path.stem)
+        return frame_data
+    frame_data = benchmark(read_all)
+    assert len(frame_data.dataframe) == len(xyz_paths)
+
+
+def test_gaussianoutfile(benchmark, gaussian_paths):
+    def read_all():
+        atom_data, frame_data = AtomData(), FrameData()
+        for path in gaussian_paths:
+            GaussianOutFile(atom_data, frame_data, str(path))
+        return frame_data
+    frame_data = benchmark(read_all)
+    assert len(frame_data.dataframe) == len(gaussian_paths)
+
+
+def test_gaussianoutfile_archive_only(benchmark, gaussian_paths):
+    def read_all():
+        atom_data, frame_data = AtomData(), FrameData()
+        for path in gaussian_paths:
+            GaussianOutFile(atom_data, frame_data, str(path),
+                            mode="archive_only")
+        return frame_data
+    frame_data = benchmark(read_all)
+    assert len(frame_data.dataframe) == len(gaussian_paths)
+
+
+@pytest.mark.parametrize("dedupe", [False, True])
+def test_load_files_distinct(benchmark, gaussian_paths, dedupe):
+    # No two files are identical, so deduplication can only add overhead
+    yamldata = {"files": [{"path": str(path), "type": "gaussian_out"} for path in gaussian_paths]}
+
+    def load():
+        atom_data, frame_data = AtomData(), FrameData()
+        load_files(yamldata, atom_data, frame_data, dedupe=dedupe)
+        return frame_data
+    frame_data = benchmark(load)
+    assert len(frame_data.dataframe) == len(gaussian_paths)
@@ -0,0 +1,16 @@
+import numpy as np
+from qmanalysis import spectra
+
+
+def _spectra(positions, intensities, grid):
+    return spectra.broaden(spectra.stick_spectra(positions, intensities, grid))
+
+
+def test_broaden_conformers(benchmark, scale):
+    rng = np.random.default_rng(0)
+    n_frames = 2000 * scale
+    positions = np.sort(rng.uniform(100.0, 3600.0, (n_frames, 90)), axis=1)
+    intensities = rng.uniform(0.0, 200.0, (n_frames, 90))
+    grid = spectra.wavenumber_grid()
+    result = benchmark.pedantic(_spectra, args=(positions, intensities, grid), rounds=3, iterations=1)
+    assert result.shape == (n_frames, len(grid))
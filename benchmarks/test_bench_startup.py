@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+MINIMAL_YAML = """
+name: startup
+comment: startup benchmark
+version: 1
+files:
+  - path: mol.xyz
+    type: xyz
+    name: mol
+output: []
+"""
+
+
+def test_import_main(benchmark):
+    def import_main():
+        subprocess.run([sys.executable, "-c", "import src.main"], check=True)
+    benchmark.pedantic(import_main, rounds=5, iterations=1)
+
+
+def test_cli_minimal_job(benchmark, tmp_path):
+    (tmp_path / "job.yaml").write_text(MINIMAL_YAML)
+    (tmp_path / "mol.xyz").write_text("2\nH2\nH 0 0 0\nH 0 0 0.74\n")
+
+    def run_job():
+        subprocess.run([sys.executable, "-m", "src.main", str(tmp_path / "job.yaml"),
+                        "-rp", str(tmp_path)], check=True, capture_output=True)
+    benchmark.pedantic(run_job, rounds=5, iterations=1)
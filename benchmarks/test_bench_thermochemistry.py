@@ -0,0 +1,12 @@
+import numpy as np
+from qmanalysis.thermochemistry import thermochemistry
+
+
+def test_thermochemistry(benchmark, scale):
+    rng = np.random.default_rng(0)
+    n_frames = 2000 * scale
+    frequencies = np.sort(rng.uniform(20.0, 3500.0, (n_frames, 60)), axis=1)
+    moments = np.sort(rng.uniform(50.0, 500.0, (n_frames, 3)), axis=1)
+    result = benchmark(thermochemistry, frequencies, np.linspace(200.0, 500.0, 7),
+                       np.full(n_frames, 150.0), moments)
+    assert result["free_energy"].shape == (n_frames, 7)
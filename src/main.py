@@ -1,23 +1,32 @@
 import argparse
-from tokenize import group
-import strictyaml as sy
+import sys
 import qmanalysis.xyzreader as xr
 import qmanalysis.yamlreader as yr
 import qmanalysis.measure as mr
+from qmanalysis import aggregate, clustering, connectivity, fingerprint, kernels, spectra, thermochemistry
 from qmanalysis.containers import AtomData, FrameData, MeasurementData
-import matplotlib.pyplot as plt
 from pathlib import Path
+from glob import glob
+import os
 import fnmatch
+from itertools import combinations
+import hashlib
+from contextlib import closing
 import re
-import asteval as av
 from qmanalysis.globalconstantsreader import GlobalConstantsFile
 import pandas as pd
 import numpy as np
-import scipy
-from scipy.optimize import minimize
 
 import qmanalysis.customcalculationrunner as ccr
 from qmanalysis.gaussianoutreader import GaussianOutFile
+from qmanalysis.constantsjoin import join_constants
+from qmanalysis.profiler import StageProfiler
+from qmanalysis.prefetch import Prefetcher
+from qmanalysis.fileopener import COMPRESSION_SUFFIXES, strip_compression_suffix
+from qmanalysis.framedataexporter import FrameDataExporter
+import qmanalysis.server as server
+# matplotlib and scipy are imported where they are needed, so runs without
+# plots do not pay for importing them
 # from tests.test_customcalculationrunner import frame_data
 
 
@@ -34,17 +43,11 @@ def prepend_root_if_relative(file_path, root_path=None):
 
 def prune_close_positions(positions, threshold, x_scale=1.0, y_scale=1.0):
     # Given a list of positions [(x1, y1), (x2, y2), ...] and a threshold,
-    # return a new list where positions closer than the threshold are grouped and replaced by their centroid.
-    positions = np.array(positions)
-    used = np.ones(len(positions), dtype=bool)
+    # return a mask that drops every position closer than the threshold to an earlier kept one.
+    positions = np.array(positions, dtype=float)
     if (len(positions) == 1):
-        return used
-    for i in range(len(positions)):
-        for j in range(len(positions)):
-            if i != j:
-                if used[i] and used[j] and np.linalg.norm((positions[i] - positions[j]) / np.array([x_scale, y_scale])) < threshold:
-                    used[j] = False
-    return used
+        return np.ones(1, dtype=bool)
+    return kernels.prune_close(positions / np.array([x_scale, y_scale]), threshold)
 
 
 def circler(marker_positions, other_positions, radius, x_axis_start=0.0, y_axis_start=0.0, x_axis_end=1.0, y_axis_end=1.0,  diagonal_line=False):
@@ -101,22 +104,16 @@ def circler(marker_positions, other_positions, radius, x_axis_start=0.0, y_axis_
 
     def energy(thetas, centers=centers, radii=radii):
         points = get_points(thetas, centers, radii)
-        # Vectorized pairwise repulsion
-        diff = points[:, np.newaxis, :] - points[np.newaxis, :, :]
-        # add eye to avoid zero division
-        dists = np.linalg.norm(diff, axis=-1) + np.eye(len(points))
-        mask = ~np.eye(len(points), dtype=bool)
-        repulsion = np.sum(1.0 / (dists[mask]**2 + 1e-9))
+        # Pairwise repulsion, a compiled loop if Numba is installed
+        repulsion = kernels.pair_repulsion(points)
         # Vectorized g(p) sum
         x = points[:, 0]
         y = points[:, 1]
         point_strength = 500.0
         wall_strength = 500000.0
         # Repulsion from all centers (including self, but that's ok for energy landscape)
-        center_repulsion = np.zeros(len(points))
-        for (cx, cy), r in zip(centers, radii):
-            d = np.sqrt((x - cx)**2 + (y - cy)**2)
-            center_repulsion += point_strength / (d**6 + 1e-9)
+        center_repulsion = kernels.center_repulsion(
+            points, centers, point_strength)
         wall_penalty = (wall_strength / (x + 1e-9)
                         + wall_strength / (1.0 - x + 1e-9)
                         + wall_strength / (y + 1e-9)
@@ -127,10 +124,11 @@ def circler(marker_positions, other_positions, radius, x_axis_start=0.0, y_axis_
             diag_penalty = diag_strength / \
                 ((np.linalg.norm(
                     points - np.stack([(x + y) / 2.0, (x + y) / 2.0], axis=1), axis=1)**4) + 1e-9)
-        g_sum = np.sum(center_repulsion + wall_penalty + diag_penalty)
+        g_sum = center_repulsion + np.sum(wall_penalty + diag_penalty)
         return repulsion + g_sum
 
     def find_best_config(n_starts=20):
+        from scipy.optimize import minimize
         best_result = None
         best_energy = np.inf
         for _ in range(n_starts):
@@ -147,98 +145,268 @@ def circler(marker_positions, other_positions, radius, x_axis_start=0.0, y_axis_
     return upscaler(get_points(res.x), x_axis_start, x_axis_end, y_axis_start, y_axis_end)
 
 
-def main():
+def expand_file_entry(file, root_path=None):
+    """
+    Return the (file_path, file_name) pairs for one coordinate file entry of the YAML.
+    Glob entries matching several files get the file stem appended to their name.
+    A glob also matches compressed copies of the files it names (``*.xyz`` matches
+    ``a.xyz.gz``); their stem does not include the compression suffix.
+    """
+    if "glob" in file and file["glob"]:
+        pattern = str(prepend_root_if_relative(file["path"], root_path))
+        globbed_files = glob(pattern)
+        if strip_compression_suffix(pattern) == pattern:
+            for suffix in COMPRESSION_SUFFIXES:
+                globbed_files += glob(pattern + suffix)
+        if len(globbed_files) == 1:
+            return [(globbed_files[0], file.get("name", None))]
+        return [(gfile, (file.get("name", "") or "")+os.path.splitext(os.path.basename(strip_compression_suffix(gfile)))[0])
+                for gfile in globbed_files]
+    return [(prepend_root_if_relative(file_path=file["path"], root_path=root_path), file.get("name", None))]
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("inputfile", help="Main command input file")
 
-    # Add -rp / --root-path argument (single allowed — default behavior)
-    parser.add_argument(
-        "-rp", "--root_path",
-        type=str,
-        help="Root path used for all files. If none is specified, the location of the input file is used as root path"
-    )
+COORDINATE_READERS = {"xyz": xr.XYZFile, "gaussian_out": GaussianOutFile}
+# Keys of a YAML files entry that are passed on to its reader
+READER_OPTIONS = {"xyz": ["raw_data"], "gaussian_out": [
+    "mode", "archive_fields", "frames", "raw_data"]}
 
-    args = parser.parse_args()
 
-    # --- BEGIN MOVED CODE ---
-    # The following code was previously at the top-level and is now inside main()
-    yamlparser = yr.YAMLFile()
-    yamlparser.load_file(prepend_root_if_relative(
-        file_path=args.inputfile, root_path=args.root_path))
+def expand_files(files, root_path=None):
+    """
+    Expand the YAML ``files`` section into a list of (file, file_path, file_name)
+    tuples, one per coordinate file. Other entries (constants) keep their position
+    with file_path and file_name set to None.
+    """
+    entries = []
+    for file in files:
+        if file["type"].lower() in COORDINATE_READERS:
+            entries += [(file, file_path, file_name)
+                        for file_path, file_name in expand_file_entry(file, root_path)]
+        else:
+            entries.append((file, None, None))
+    return entries
+
+
+def chunk_entries(entries, chunk_size):
+    """
+    Split expanded file entries into chunks of at most `chunk_size` coordinate files.
+    Constants entries are repeated in every chunk at their original position, so they
+    apply to the same files as in a non-chunked run.
+    """
+    coordinate_positions = [i for i, (_, file_path, _) in enumerate(
+        entries) if file_path is not None]
+    for start in range(0, len(coordinate_positions), chunk_size):
+        selected = set(coordinate_positions[start:start + chunk_size])
+        yield [entry for i, entry in enumerate(entries) if i in selected or entry[1] is None]
+
+
+def read_file_blocks(reader, **reader_args):
+    """
+    Read one file with `reader` into fresh containers and return their dataframes.
+    """
     atom_data = AtomData()
     frame_data = FrameData()
-    mesurement_data = MeasurementData()
-    yamldata = yamlparser.get_data()
+    reader(atom_data, frame_data, **reader_args)
+    return atom_data.dataframe, frame_data.dataframe
 
-    # Read files
-    for file in yamldata["files"]:
+
+def relabel_block(df, file_name, file_path):
+    """
+    Return `df`, the dataframe of one parsed file, with its file_name and file_path
+    index levels replaced. The result is a shallow copy that shares its column data
+    with `df`, so neither may be modified in place; append_blocks copies the data
+    once when it concatenates the blocks.
+    """
+    index = df.index.remove_unused_levels().set_levels(
+        [[file_name], [file_path]], level=["file_name", "file_path"])
+    relabelled = df.copy(deep=False)
+    relabelled.index = index
+    return relabelled
+
+
+def read_shared_blocks(parsed, reader, ftype, data=None, **reader_args):
+    """
+    Read one file like `read_file_blocks`, but parse files with identical content
+    only once. `parsed` maps a hash of the content, the reader type, the timestep
+    and the reader options to the blocks parsed first; later entries with the same
+    content get those blocks relabelled with their own file_name and file_path.
+    This saves parsing only: append_blocks still copies every relabelled block into
+    the loaded data.
+    """
+    if data is None:
+        data = Path(reader_args["file_path"]).read_bytes()
+    options = {name: value for name, value in reader_args.items()
+               if name not in ("file_path", "file_name")}
+    key = (ftype, hashlib.blake2b(data, digest_size=16).hexdigest(),
+           tuple(sorted((name, repr(value)) for name, value in options.items())))
+    if key not in parsed:
+        parsed[key] = read_file_blocks(reader, data=data, **reader_args)
+        return parsed[key]
+    file_path = reader_args["file_path"]
+    file_name = reader_args["file_name"] or Path(file_path).name
+    return tuple(relabel_block(df, file_name, file_path) for df in parsed[key])
+
+
+def _concat_nonempty(frames):
+    nonempty = [df for df in frames if not df.empty]
+    if not nonempty:
+        return frames[0]
+    return pd.concat(nonempty) if len(nonempty) > 1 else nonempty[0].copy()
+
+
+def append_blocks(atom_data, frame_data, blocks):
+    """
+    Append (atom dataframe, frame dataframe) blocks to `atom_data` and `frame_data`
+    with one concatenation each. The blocks themselves are not modified.
+    """
+    if not blocks:
+        return
+    atom_data.dataframe = _concat_nonempty(
+        [atom_data.dataframe] + [atom_block for atom_block, _ in blocks])
+    frame_data.dataframe = _concat_nonempty(
+        [frame_data.dataframe] + [frame_block for _, frame_block in blocks])
+
+
+def load_files(yamldata, atom_data, frame_data, root_path=None, profiler=None, entries=None, file_cache=None,
+               prefetch=0, io_workers=None, dedupe=True):
+    """
+    Read all entries of the YAML ``files`` section into `atom_data` and `frame_data`.
+    If `entries` is given (see `expand_files`), only those entries are read. With a
+    `file_cache` (see `qmanalysis.server.ParsedFileCache`), files that were parsed
+    before are taken from the cache instead of being read again.
+
+    With `prefetch` > 0, up to `prefetch` coordinate files are read ahead by
+    `io_workers` threads while the current file is parsed. Prefetching is not used
+    together with a `file_cache`, where most files are not read at all.
+
+    With `dedupe`, coordinate files with identical content (copies, or the same file
+    listed under several names) are parsed once; see `read_shared_blocks`. Only the
+    parsing is saved: every entry still gets its own rows in `atom_data` and
+    `frame_data`. Only files with the same size as another entry are hashed (see
+    `possible_duplicates`), and files read with ``mode: archive_only`` are not
+    hashed, as that would read them completely.
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+    if entries is None:
+        entries = expand_files(yamldata["files"], root_path)
+    with closing(prefetch_coordinate_files(entries, prefetch, io_workers, file_cache)) as prefetched:
+        _load_entries(atom_data, frame_data, entries, root_path,
+                      profiler, file_cache, prefetched, dedupe)
+
+
+def _prefetchable(file):
+    return file["type"].lower() in COORDINATE_READERS and file.get("mode") != "archive_only"
+
+
+def prefetch_coordinate_files(entries, prefetch=0, io_workers=None, file_cache=None):
+    """
+    Return an iterator over ``(file_path, data)`` for the coordinate entries in
+    `entries`, reading ahead in background threads if `prefetch` > 0. Without
+    prefetching, `data` is None and the readers open the files themselves.
+    Entries read with ``mode: archive_only`` are left out, as their readers only
+    read the end of the file.
+    """
+    paths = [file_path for file, file_path, _ in entries if _prefetchable(file)]
+    if prefetch and file_cache is None:
+        return iter(Prefetcher(paths, depth=prefetch, workers=io_workers))
+    return ((file_path, None) for file_path in paths)
+
+
+def possible_duplicates(entries):
+    """
+    Return the positions in `entries` of the coordinate files that have the same
+    type and size as another entry, so they may have identical content. Only these
+    are hashed; entries read with ``mode: archive_only`` are left out.
+    """
+    groups = {}
+    for position, (file, file_path, _) in enumerate(entries):
         ftype = file["type"].lower()
-        if ftype == "xyz":
-            if "glob" in file and file["glob"]:
-                from glob import glob
-                import os
-                globbed_files = list(
-                    glob(str(prepend_root_if_relative(file["path"], args.root_path))))
-                if len(globbed_files) == 1:
-                    xr.XYZFile(atom_data, frame_data, file_path=globbed_files[0],
-                               file_name=file["name"], timestep_name=file.get("timestep", None))
-                else:
-                    for gfile in globbed_files:
-                        xr.XYZFile(atom_data, frame_data, file_path=gfile,
-                                   file_name=file["name"]+os.path.splitext(os.path.basename(gfile))[0], timestep_name=file.get("timestep", None))
-            else:
-                xr.XYZFile(atom_data, frame_data, file_path=prepend_root_if_relative(
-                    file_path=file["path"], root_path=args.root_path), file_name=file["name"], timestep_name=file.get("timestep", None))
-        elif ftype == "gaussian_out":
-            if "glob" in file and file["glob"]:
-                from glob import glob
-                import os
-                globbed_files = list(
-                    glob(str(prepend_root_if_relative(file["path"], args.root_path))))
-                if len(globbed_files) == 1:
-                    GaussianOutFile(atom_data, frame_data, file_path=globbed_files[0],
-                                    file_name=file.get("name", None), timestep_name=file.get("timestep", None))
-                else:
-                    for gfile in globbed_files:
-                        GaussianOutFile(atom_data, frame_data, file_path=gfile,
-                                        file_name=(
-                                            file.get("name", "") or "")+os.path.splitext(os.path.basename(gfile))[0],
-                                        timestep_name=file.get("timestep", None))
-            else:
-                GaussianOutFile(atom_data, frame_data, file_path=prepend_root_if_relative(
-                    file_path=file["path"], root_path=args.root_path), file_name=file.get("name", None), timestep_name=file.get("timestep", None))
+        if ftype not in COORDINATE_READERS or file.get("mode") == "archive_only":
+            continue
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            # The reader reports missing files
+            continue
+        groups.setdefault((ftype, size), []).append(position)
+    return {position for group in groups.values() if len(group) > 1 for position in group}
+
 
+def _load_entries(atom_data, frame_data, entries, root_path, profiler, file_cache, prefetched, dedupe):
+    # Cached and shared blocks are collected and appended before the next constants entry
+    pending = []
+    parsed = {}
+    candidates = possible_duplicates(entries) if dedupe else set()
+    for position, (file, file_path, file_name) in enumerate(entries):
+        ftype = file["type"].lower()
+        if ftype not in COORDINATE_READERS and pending:
+            append_blocks(atom_data, frame_data, pending)
+            pending = []
+        if ftype in COORDINATE_READERS:
+            with profiler.stage("load", file_path=file_path) as record:
+                reader_args = dict(file_path=file_path, file_name=file_name,
+                                   timestep_name=file.get("timestep", None))
+                reader_args.update({option: file[option] for option in READER_OPTIONS[ftype]
+                                    if option in file})
+                _, data = next(prefetched) if _prefetchable(file) else (file_path, None)
+                reader = COORDINATE_READERS[ftype]
+                # With dedupe, all blocks are appended at once; only possible
+                # duplicates are hashed
+                blocks = dedupe and reader_args.get("mode") != "archive_only"
+                shared = position in candidates
+                if file_cache is None and not blocks:
+                    rows_before = len(atom_data.dataframe)
+                    reader(atom_data, frame_data, data=data, **reader_args)
+                    record["rows"] = len(atom_data.dataframe) - rows_before
+                else:
+                    if shared:
+                        def load():
+                            return read_shared_blocks(parsed, reader, ftype, data=data, **reader_args)
+                    else:
+                        def load():
+                            return read_file_blocks(reader, data=data, **reader_args)
+                    if file_cache is None:
+                        pending.append(load())
+                    else:
+                        key = file_cache.make_key(ftype, **reader_args)
+                        pending.append(file_cache.get_or_load(key, load))
+                    record["rows"] = len(pending[-1][0])
         elif ftype == "global_constants_csv":
             # Try to read from data directory first, then fallback to program directory
             global_constants_csv_file = prepend_root_if_relative(
-                file["path"], root_path=args.root_path)
+                file["path"], root_path=root_path)
             if not Path(global_constants_csv_file).exists():
                 global_constants_csv_file = Path(file["path"])
                 if not global_constants_csv_file.exists():
                     raise FileNotFoundError(
                         f"global_constants_csv not found in data or program directory: {file['path']}")
 
-            global_constants_df = pd.read_csv(global_constants_csv_file)
-            for _, row in global_constants_df.iterrows():
-                col_name = row['name']
-                col_value = row['value']
-                frame_data.dataframe[col_name] = col_value
+            frame_data.constants.update(
+                GlobalConstantsFile(global_constants_csv_file).constants)
 
-        elif ftype == "per_file_constants_csv":
+        elif ftype in ("per_file_constants_csv", "frame_constants_csv"):
             # Try to read from data directory first, then fallback to program directory
             frame_constants_csv_file = prepend_root_if_relative(
-                file["path"], root_path=args.root_path)
+                file["path"], root_path=root_path)
             if not Path(frame_constants_csv_file).exists():
                 frame_constants_csv_file = Path(file["path"])
                 if not Path(frame_constants_csv_file).exists():
                     raise FileNotFoundError(
-                        f"per_file_constants_csv not found in data or program directory: {file['path']}")
+                        f"{ftype} not found in data or program directory: {file['path']}")
             frame_constants_df = pd.read_csv(frame_constants_csv_file)
-            frame_data.dataframe = frame_data.dataframe.join(
-                frame_constants_df.set_index('file_name'), on='file_name', rsuffix='_perfile')
+            # Per-file constants keep existing columns and add theirs with a suffix,
+            # frame constants overwrite them for the frames they match
+            frame_data.dataframe = join_constants(
+                frame_data.dataframe, frame_constants_df,
+                rsuffix='_perfile' if ftype == "per_file_constants_csv" else None)
+    append_blocks(atom_data, frame_data, pending)
 
-    # Substitutions
+
+def apply_substitutions(yamldata, atom_data):
+    """
+    Set the alias of every atom matched by a ``substitutions`` entry to the substitution name.
+    """
     if "substitutions" in yamldata:
         for sub in yamldata["substitutions"]:
             for subfile in sub['entries']:
@@ -291,89 +459,90 @@ def main():
                             [True] * len(atom_data.dataframe), index=atom_data.dataframe.index)
                     atom_data.dataframe.loc[final_mask, "alias"] = sub["name"]
 
-    # # Global constants
-    # global_constants_csv_file = next(
-    #     (f for f in yamldata.get("files", []) if f.get(
-    #         "type", "").lower() == "global_constants_csv"), None
-    # )
-    # if global_constants_csv_file:
-    #     csv_path = prepend_root_if_relative(
-    #         file_path=global_constants_csv_file["path"], root_path=args.root_path
-    #     )
-    #     name_value_df = pd.read_csv(csv_path)
-    #     for _, row in name_value_df.iterrows():
-    #         col_name = row['name']
-    #         col_value = row['value']
-    #         frame_data.dataframe[col_name] = col_value
-
-    # Frame constants
-    # frame_constants_csv_files = [
-    #     f for f in yamldata.get("files", []) if f.get("type", "").lower() == "frame_constants_csv"
-    # ]
-    # for frame_constants_csv_file in frame_constants_csv_files:
-    #     csv_path = prepend_root_if_relative(
-    #         file_path=frame_constants_csv_file["path"], root_path=args.root_path
-    #     )
-    #     frame_constants_df = pd.read_csv(csv_path)
-    #     label_cols = [col for col in frame_constants_df.columns if col in [
-    #         "file_name", "file_path", "timestep_name"]]
-    #     value_cols = [
-    #         col for col in frame_constants_df.columns if col not in label_cols]
-    #     for _, row in frame_constants_df.iterrows():
-    #         mask = pd.Series([True] * len(frame_data.dataframe),
-    #                          index=frame_data.dataframe.index)
-    #         for label in label_cols:
-    #             val = row[label]
-    #             if pd.isna(val):
-    #                 continue
-    #             idx_vals = frame_data.dataframe.index.get_level_values(label)
-    #             if any(char in str(val) for char in ['*', '?', '[']):
-    #                 mask &= [fnmatch.fnmatch(str(idx_val), str(val))
-    #                          for idx_val in idx_vals]
-    #             else:
-    #                 mask &= [str(idx_val) == str(val) for idx_val in idx_vals]
-    #         for value_col in value_cols:
-    #             frame_data.dataframe.loc[mask, value_col] = row[value_col]
-    #     for value_col in value_cols:
-    #         if value_col not in frame_data.dataframe.columns:
-    #             frame_data.dataframe[value_col] = pd.NA
 
-    # --- Measurements ---
-    measure = mr.Measure()
+def resolve_atom(atom_data, label, timestep_name, m):
+    file_val = m
+    timestep_val = timestep_name if timestep_name is not None else None
 
-    def resolve_atom(label, timestep_name, m):
-        file_val = m
-        timestep_val = timestep_name if timestep_name is not None else None
+    def match_all(val):
+        return val is None or (isinstance(val, float) and pd.isna(val)) or (isinstance(val, str) and val.strip() == "")
+    try:
+        idx = int(label)
+        # 1-based: no adjustment needed, just match directly
+        file_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(file_val) else (
+            atom_data.dataframe.index.get_level_values("file_name") == file_val)
+        timestep_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(timestep_val) else (
+            atom_data.dataframe.index.get_level_values("timestep_name") == timestep_val)
+        atom_index_mask = (
+            atom_data.dataframe.index.get_level_values("atom_index") == idx)
+        mask = file_mask & timestep_mask & atom_index_mask
+    except ValueError:
+        file_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(file_val) else (
+            atom_data.dataframe.index.get_level_values("file_name") == file_val)
+        timestep_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(timestep_val) else (
+            atom_data.dataframe.index.get_level_values("timestep_name") == timestep_val)
+        alias_mask = (atom_data.dataframe["alias"] == str(label))
+        mask = file_mask & timestep_mask & alias_mask
+    matches = atom_data.dataframe.index[mask]
+    if len(matches) == 0:
+        print(
+            f"Could not resolve atom '{label}' for timestep '{timestep_name}' and file '{file_val}'")
+        return None
+    return matches[0]
 
-        def match_all(val):
-            return val is None or (isinstance(val, float) and pd.isna(val)) or (isinstance(val, str) and val.strip() == "")
-        try:
-            idx = int(label)
-            # 1-based: no adjustment needed, just match directly
-            file_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(file_val) else (
-                atom_data.dataframe.index.get_level_values("file_name") == file_val)
-            timestep_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(timestep_val) else (
-                atom_data.dataframe.index.get_level_values("timestep_name") == timestep_val)
-            atom_index_mask = (
-                atom_data.dataframe.index.get_level_values("atom_index") == idx)
-            mask = file_mask & timestep_mask & atom_index_mask
-        except ValueError:
-            file_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(file_val) else (
-                atom_data.dataframe.index.get_level_values("file_name") == file_val)
-            timestep_mask = np.ones(len(atom_data.dataframe), dtype=bool) if match_all(timestep_val) else (
-                atom_data.dataframe.index.get_level_values("timestep_name") == timestep_val)
-            alias_mask = (atom_data.dataframe["alias"] == str(label))
-            mask = file_mask & timestep_mask & alias_mask
-        matches = atom_data.dataframe.index[mask]
-        if len(matches) == 0:
-            print(
-                f"Could not resolve atom '{label}' for timestep '{timestep_name}' and file '{file_val}'")
-            return None
-        return matches[0]
 
+# Atom keys of every measurement type
+MEASUREMENT_ATOMS = {"distance": ("a", "b"), "angle": ("a", "b", "c"),
+                     "dihedral": ("a", "b", "c", "d")}
+
+# Whole-frame measurements: the Measure.mass_descriptors columns each one writes,
+# and the suffixes appended to the measurement name for them
+MASS_DESCRIPTORS = {
+    "center_of_mass": (["com_x", "com_y", "com_z"], ["_x", "_y", "_z"]),
+    "principal_moments": (["moment_1", "moment_2", "moment_3"], ["_1", "_2", "_3"]),
+    "radius_of_gyration": (["radius_of_gyration"], [""]),
+}
+
+
+def frame_atom_positions(atom_data, frame_index, label):
+    """
+    Return for every row of `frame_index` the position in `atom_data` of the atom
+    `label` (atom index or alias) of that frame, matched on file_name and
+    timestep_name, or -1 if the frame has no such atom. Like resolve_atom, the
+    first matching atom wins.
+    """
+    df = atom_data.dataframe
+    try:
+        mask = df.index.get_level_values("atom_index") == int(label)
+    except ValueError:
+        mask = (df["alias"] == str(label)).to_numpy(dtype=bool)
+    positions = np.flatnonzero(mask)
+    keys = df.index[positions].droplevel(
+        [name for name in df.index.names if name not in ("file_name", "timestep_name")])
+    first = ~keys.duplicated()
+    found = keys[first].get_indexer(frame_index.droplevel(
+        [name for name in frame_index.names if name not in ("file_name", "timestep_name")]))
+    # Position -1 (no matching atom) picks the appended -1
+    return np.append(positions[first], -1)[found]
+
+
+def run_measurements(yamldata, atom_data, frame_data):
+    """
+    Compute all ``measurements`` for every frame and store them as columns of `frame_data`.
+
+    The atoms of every measurement are resolved for each frame (file and
+    timestep) at once, and each measurement is computed for all frames with the
+    batch methods of Measure.
+    """
+    measure = mr.Measure()
+    batch = {"distance": measure.distances, "angle": measure.angles,
+             "dihedral": measure.dihedrals}
     if "measurements" in yamldata:
-        all_timestep_names = frame_data.dataframe.index.get_level_values(
-            "timestep_name").unique().tolist()
+        index = frame_data.dataframe.index
+        frame_files = index.get_level_values("file_name")
+        frame_timesteps = index.get_level_values("timestep_name")
+        all_timestep_names = frame_timesteps.unique().tolist()
+        xyz = atom_data.dataframe[["x", "y", "z"]].to_numpy(dtype=float)
         for mtype in ["distance", "angle", "dihedral"]:
             if mtype in yamldata["measurements"]:
                 for m in yamldata["measurements"][mtype]:
@@ -381,126 +550,335 @@ def main():
                         timestep_names = [m["timestep"]]
                     else:
                         timestep_names = all_timestep_names
-                    results = []
-                    for idx, row in frame_data.dataframe.iterrows():
-                        timestep_name = idx[frame_data.dataframe.index.names.index(
-                            "timestep_name")]
-                        if timestep_name not in timestep_names:
-                            results.append(pd.NA)
-                        else:
-                            try:
-                                if mtype == "distance":
-                                    idx_a = resolve_atom(
-                                        m["a"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_b = resolve_atom(
-                                        m["b"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    if idx_a is None or idx_b is None:
-                                        val = pd.NA
-                                    else:
-                                        val = measure.distance(
-                                            atom_data, idx_a, idx_b)
-                                elif mtype == "angle":
-                                    idx_a = resolve_atom(
-                                        m["a"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_b = resolve_atom(
-                                        m["b"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_c = resolve_atom(
-                                        m["c"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    if None in (idx_a, idx_b, idx_c):
-                                        val = pd.NA
-                                    else:
-                                        val = measure.angle(
-                                            atom_data, idx_a, idx_b, idx_c)
-                                elif mtype == "dihedral":
-                                    idx_a = resolve_atom(
-                                        m["a"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_b = resolve_atom(
-                                        m["b"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_c = resolve_atom(
-                                        m["c"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    idx_d = resolve_atom(
-                                        m["d"], None, idx[frame_data.dataframe.index.names.index("file_name")])
-                                    if None in (idx_a, idx_b, idx_c, idx_d):
-                                        val = pd.NA
-                                    else:
-                                        val = measure.dihedral(
-                                            atom_data, idx_a, idx_b, idx_c, idx_d)
-                                results.append(val)
-                            except Exception as e:
-                                print(
-                                    f"Error in measurement '{m['name']}' for name '{idx[frame_data.dataframe.index.names.index('file_name')]}': {e}")
-                                results.append(None)
+                    selected = np.flatnonzero(frame_timesteps.isin(timestep_names))
+                    labels = [m[key] for key in MEASUREMENT_ATOMS[mtype]]
+                    # (atoms, frames) positions of the atoms in every selected frame
+                    positions = np.array([frame_atom_positions(atom_data, index[selected], label)
+                                          for label in labels]).reshape(len(labels), -1)
+                    results = [pd.NA] * len(index)
+                    for k, label in zip(*np.nonzero(positions.T < 0)):
+                        print(f"Could not resolve atom '{labels[label]}' for timestep "
+                              f"'{frame_timesteps[selected[k]]}' and file '{frame_files[selected[k]]}'")
+                    resolved = (positions >= 0).all(axis=0)
+                    rows, points = selected[resolved], xyz[positions[:, resolved]]
+                    if mtype != "distance":
+                        # Coincident atoms make an angle or dihedral undefined
+                        valid = np.ones(len(rows), dtype=bool)
+                        for i, j in combinations(range(len(labels)), 2):
+                            equal = valid & (points[i] == points[j]).all(axis=1)
+                            for k in np.flatnonzero(equal):
+                                print(f"Error in measurement '{m['name']}' for name '{frame_files[rows[k]]}': "
+                                      f"Atom coordinates for atom {i} and atom {j} can not be equal")
+                                results[rows[k]] = None
+                            valid &= ~equal
+                        rows, points = rows[valid], points[:, valid]
+                    if len(rows):
+                        for i, val in zip(rows, batch[mtype](*points)):
+                            results[i] = val
                     if len(results) == 1:
                         frame_data.dataframe[m["name"]] = results[0]
                     else:
                         frame_data.dataframe[m["name"]] = results
+        requested = [(mtype, m) for mtype in MASS_DESCRIPTORS
+                     for m in yamldata["measurements"].get(mtype) or []]
+        if requested:
+            descriptors = measure.mass_descriptors(
+                atom_data).reindex(frame_data.dataframe.index)
+            for mtype, m in requested:
+                columns, suffixes = MASS_DESCRIPTORS[mtype]
+                for column, suffix in zip(columns, suffixes):
+                    frame_data.dataframe[m["name"] +
+                                         suffix] = descriptors[column].to_numpy()
 
-    # --- Calculations ---
+
+# What the deduplicate stage does with repeated geometries
+DEDUPLICATE_ACTIONS = ("drop", "flag")
+
+
+def run_deduplicate(yamldata, atom_data, frame_data, seen=None):
+    """
+    Fingerprint every frame as configured in the ``deduplicate`` section and drop
+    frames whose geometry already occurred (``action: drop``, the default) or mark
+    them in a ``duplicate`` column (``action: flag``). The fingerprints are written
+    to a ``fingerprint`` column. `seen` is a set of fingerprints of earlier chunks,
+    which counts as already occurred and is updated.
+    """
+    options = yamldata.get("deduplicate")
+    if not options:
+        return
+    if options is True:
+        options = {}
+    action = options.get("action", "drop")
+    if action not in DEDUPLICATE_ACTIONS:
+        raise ValueError(
+            f"Unknown deduplicate action '{action}', expected one of {', '.join(DEDUPLICATE_ACTIONS)}")
+    seen = set() if seen is None else seen
+    fingerprints = fingerprint.geometry_fingerprints(
+        atom_data, tolerance=options.get("tolerance", fingerprint.DEFAULT_TOLERANCE))
+    duplicate = fingerprints.duplicated().to_numpy() | fingerprints.isin(seen).to_numpy()
+    seen.update(fingerprints)
+    duplicate = pd.Series(duplicate, index=fingerprints.index)
+    frame_index = frame_data.dataframe.index
+    frame_duplicate = duplicate.reindex(frame_index, fill_value=False).to_numpy(dtype=bool)
+    frame_data.dataframe["fingerprint"] = fingerprints.reindex(frame_index).to_numpy()
+    if action == "flag":
+        frame_data.dataframe["duplicate"] = frame_duplicate
+        return
+    atom_duplicate = duplicate.reindex(
+        atom_data.dataframe.index.droplevel("atom_index"), fill_value=False).to_numpy(dtype=bool)
+    atom_data.dataframe = atom_data.dataframe[~atom_duplicate]
+    frame_data.dataframe = frame_data.dataframe[~frame_duplicate]
+    if frame_duplicate.any():
+        print(f"Dropped {frame_duplicate.sum()} frames with repeated geometries")
+
+
+def run_connectivity(yamldata, atom_data, frame_data):
+    """
+    Perceive the bonds of every frame as configured in the ``connectivity`` section
+    and add the connectivity hash, the number of bonds and the generated bond,
+    angle and torsion measurements as columns of `frame_data`.
+    """
+    options = yamldata.get("connectivity")
+    if not options:
+        return
+    if options is True:
+        options = {}
+    measurements = options.get("measurements", [])
+    if measurements is True:
+        measurements = list(connectivity.TOPOLOGY_MEASUREMENTS)
+    result = connectivity.analyze_frames(
+        atom_data, tolerance=options.get("tolerance", connectivity.BOND_TOLERANCE),
+        measurements=measurements).reindex(frame_data.dataframe.index)
+    frame_data.dataframe = pd.concat(
+        [frame_data.dataframe.drop(columns=result.columns, errors="ignore"), result], axis=1)
+
+
+def run_clustering(yamldata, atom_data, frame_data):
+    """
+    Cluster the frames on their aligned RMSD as configured in the ``clustering``
+    section and add ``cluster_id`` and ``cluster_centroid`` columns to `frame_data`.
+    """
+    options = yamldata.get("clustering")
+    if not options:
+        return
+    if "threshold" not in options:
+        raise ValueError("clustering needs a 'threshold' RMSD in Angstrom")
+    result = clustering.cluster_frames(
+        atom_data, float(options["threshold"]),
+        memory_mb=options.get("memory_mb", clustering.DEFAULT_MEMORY_MB),
+        workers=options.get("workers", 1),
+        heavy_atoms=options.get("heavy_atoms", False)).reindex(frame_data.dataframe.index)
+    frame_data.dataframe = pd.concat(
+        [frame_data.dataframe.drop(columns=result.columns, errors="ignore"), result], axis=1)
+
+
+def run_thermochemistry(yamldata, atom_data, frame_data):
+    """
+    Recompute the thermochemistry of every frame with parsed frequencies as
+    configured in the ``thermochemistry`` section and add ``zpe_correction`` and
+    the ``H_T``, ``S_T`` and ``G_T`` columns of every temperature T to `frame_data`.
+    """
+    options = yamldata.get("thermochemistry")
+    if not options:
+        return
+    if options is True:
+        options = {}
+    temperatures = options.get("temperatures", [298.15])
+    if not isinstance(temperatures, list):
+        temperatures = [temperatures]
+    descriptors = mr.Measure().mass_descriptors(atom_data)
+    result = thermochemistry.frame_thermochemistry(
+        frame_data, descriptors, temperatures, energy=options.get("energy", "HF"),
+        pressure=options.get("pressure", 1.0),
+        qrrho_cutoff=options.get("qrrho_cutoff", thermochemistry.DEFAULT_QRRHO_CUTOFF),
+        frequency_scale=options.get("frequency_scale", 1.0))
+    frame_data.dataframe = pd.concat(
+        [frame_data.dataframe.drop(columns=result.columns, errors="ignore"), result], axis=1)
+
+
+def run_spectra(yamldata, frame_data, root_path=None):
+    """
+    Broaden the normal modes of all frames into spectra for every entry of the
+    ``spectra`` section and write them with their Boltzmann-weighted ensemble
+    average to a ``.npz`` file and optionally a plot.
+    """
+    entries = yamldata.get("spectra")
+    if not entries:
+        return
+    if isinstance(entries, dict):
+        entries = [entries]
+    df = frame_data.dataframe
+    for entry in entries:
+        kind = entry.get("type", "ir").lower()
+        grid = spectra.wavenumber_grid(*entry.get("range", spectra.DEFAULT_RANGE),
+                                       step=entry.get("step", spectra.DEFAULT_STEP))
+        frames, frame_spectra = spectra.frame_spectra(
+            frame_data, kind, grid, lineshape=entry.get("lineshape", "lorentzian"),
+            fwhm=entry.get("fwhm", spectra.DEFAULT_FWHM),
+            frequency_scale=entry.get("frequency_scale", 1.0))
+        if len(frames) == 0:
+            print(f"No frames with normal modes for the {kind} spectrum")
+            continue
+        energy = entry.get("energy", "HF")
+        energies = None
+        if energy is not None:
+            if energy not in df.columns:
+                raise ValueError(f"Unknown energy column '{energy}' for the {kind} spectrum")
+            energies = pd.to_numeric(df.loc[frames, energy], errors="coerce").to_numpy(dtype=float)
+        average, weights = spectra.ensemble_average(
+            frame_spectra, energies, entry.get("temperature", 298.15))
+        if "path" in entry:
+            path = prepend_root_if_relative(entry["path"], root_path)
+            spectra.save_spectra(path, grid, frames, frame_spectra, weights, average)
+            print(f"Wrote {len(frames)} {kind} spectra to {path}")
+        if "plot" in entry:
+            spectra.plot_spectrum(prepend_root_if_relative(entry["plot"], root_path),
+                                  grid, average, kind, dpi=entry.get("dpi", 300))
+
+
+def run_aggregate(yamldata, frame_data, root_path=None):
+    """
+    Summarize groups of frames with Boltzmann-weighted statistics for every entry
+    of the ``aggregate`` section, print the summary tables and write them to the
+    CSV files given as ``path``. Returns the summary tables.
+    """
+    entries = yamldata.get("aggregate")
+    if not entries:
+        return []
+    if isinstance(entries, dict):
+        entries = [entries]
+    summaries = []
+    for entry in entries:
+        columns = entry.get("columns", [])
+        if isinstance(columns, str):
+            columns = [columns]
+        summary = aggregate.aggregate_frames(
+            frame_data, columns, by=entry.get("by"), pattern=entry.get("pattern"),
+            level=entry.get("level", "file_name"), energy=entry.get("energy", "HF"),
+            temperature=entry.get("temperature", 298.15))
+        print(summary)
+        if "path" in entry:
+            path = prepend_root_if_relative(entry["path"], root_path)
+            summary.to_csv(path)
+            print(f"Wrote summary of {len(summary)} groups to {path}")
+        summaries.append(summary)
+    return summaries
+
+
+def run_calculations(yamldata, frame_data):
+    """
+    Run the ``calc`` section on `frame_data`.
+    """
     if "calc" in yamldata:
         runner = ccr.CustomCalculationRunner(frame_data)
         runner.run(yamldata["calc"])
         print("Custom calculations complete.")
         print(frame_data.dataframe)
 
-    # --- Exporting ---
-    class FrameDataExporter:
-        def __init__(self, frame_data):
-            self.frame_data = frame_data
-
-        def export_csv_tuples(self, file_path, include_raw_data=False):
-            df = self.frame_data.dataframe.copy()
-            df = df.reset_index()
-            df['label'] = list(
-                df[self.frame_data.dataframe.index.names].apply(tuple, axis=1))
-            cols = [
-                'label'] + [col for col in df.columns if col not in self.frame_data.dataframe.index.names]
-            if not include_raw_data and 'raw_data' in cols:
-                cols.remove('raw_data')
-            df_export = df[cols]
-            df_export.to_csv(file_path, index=False)
-
-        def export_csv_multiindex(self, file_path, include_raw_data=False):
-            df = self.frame_data.dataframe.copy()
-            if not include_raw_data and 'raw_data' in df.columns:
-                df = df.drop(columns=['raw_data'])
-            df.to_csv(file_path)
-
-        def export_xls_tuples(self, file_path, include_raw_data=False):
-            df = self.frame_data.dataframe.copy()
-            df = df.reset_index()
-            df['label'] = list(
-                df[self.frame_data.dataframe.index.names].apply(tuple, axis=1))
-            cols = [
-                'label'] + [col for col in df.columns if col not in self.frame_data.dataframe.index.names]
-            if not include_raw_data and 'raw_data' in cols:
-                cols.remove('raw_data')
-            df_export = df[cols]
-            df_export.to_excel(file_path, index=False)
-
-        def export_xls_multiindex(self, file_path, include_raw_data=False):
-            df = self.frame_data.dataframe.copy()
-            if not include_raw_data and 'raw_data' in df.columns:
-                df = df.drop(columns=['raw_data'])
-            df.to_excel(file_path)
+
+def export_outputs(yamldata, frame_data, root_path=None, file_types=None, append=False, atom_data=None):
+    """
+    Write all ``file`` entries of the ``output`` section. If `file_types` is given,
+    only outputs of those types are written. `append` adds the rows to existing CSV
+    files instead of overwriting them. `atom_data` is written to Excel outputs that
+    list the ``atoms`` sheet.
+    """
     exporter = FrameDataExporter(frame_data)
     for one_output in yamldata.get('output', []):
         if 'file' in one_output:
             for file in one_output['file']:
                 file_type = file.get('type', '').lower()
+                if file_types is not None and file_type not in file_types:
+                    continue
                 file_path = prepend_root_if_relative(
-                    file_path=file['path'], root_path=args.root_path)
+                    file_path=file['path'], root_path=root_path)
                 if file_type == 'csv':
+                    # gzip/zstd compression, by default chosen by the file suffix
+                    compression = file.get('compression', None)
                     if file.get('multiindex', False):
-                        exporter.export_csv_multiindex(file_path)
+                        exporter.export_csv_multiindex(
+                            file_path, append=append, compression=compression)
                     else:
-                        exporter.export_csv_tuples(file_path)
+                        exporter.export_csv_tuples(
+                            file_path, append=append, compression=compression)
                 if file_type == 'xls' or file_type == 'xlsx':
-                    if file.get('multiindex', False):
-                        exporter.export_xls_multiindex(file_path)
-                    else:
-                        exporter.export_xls_tuples(file_path)
+                    exporter.export_workbook(
+                        file_path, sheets=file.get('sheets', ['frames']), atom_data=atom_data,
+                        measurements=yamldata.get('measurements'),
+                        multiindex=file.get('multiindex', False))
 
-    # --- Plotting ---
+
+def run_streaming(yamldata, root_path=None, chunk_size=100, profiler=None, prefetch=0, io_workers=None,
+                  dedupe=True):
+    """
+    Run loading, substitutions, measurements and calculations on chunks of at most
+    `chunk_size` input files and append the per-frame results of every chunk to the
+    CSV outputs. Atom coordinates and ``raw_data`` are dropped after each chunk, so
+    peak memory is bounded by the chunk size and not by the number of input files.
+    Excel outputs are written once at the end. Returns a FrameData holding the
+    per-frame results of all chunks.
+
+    Calculations only see the frames of their own chunk, so ``pivot`` must refer to
+    a file in the same chunk. Clustering also groups the frames of each chunk
+    separately.
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+    entries = expand_files(yamldata["files"], root_path)
+    results = []
+    columns = None
+    # Fingerprints of all chunks so far, so repeats across chunks are found too
+    seen_fingerprints = set()
+    for chunk_index, chunk in enumerate(chunk_entries(entries, chunk_size)):
+        with profiler.stage("chunk") as record:
+            atom_data = AtomData()
+            frame_data = FrameData()
+            load_files(yamldata, atom_data, frame_data, root_path=root_path,
+                       profiler=profiler, entries=chunk, prefetch=prefetch, io_workers=io_workers,
+                       dedupe=dedupe)
+            apply_substitutions(yamldata, atom_data)
+            run_deduplicate(yamldata, atom_data, frame_data, seen=seen_fingerprints)
+            run_connectivity(yamldata, atom_data, frame_data)
+            run_measurements(yamldata, atom_data, frame_data)
+            run_clustering(yamldata, atom_data, frame_data)
+            run_thermochemistry(yamldata, atom_data, frame_data)
+            run_calculations(yamldata, frame_data)
+            del atom_data
+            chunk_df = frame_data.dataframe.drop(
+                columns=["raw_data"], errors="ignore")
+            # Appended CSV rows must line up with the header of the first chunk
+            if columns is None:
+                columns = chunk_df.columns
+            missing = chunk_df.columns.difference(columns)
+            if len(missing) > 0:
+                print(
+                    f"Columns {list(missing)} are not in the first chunk and are not written to CSV outputs")
+            frame_data.dataframe = chunk_df.reindex(columns=columns)
+            export_outputs(yamldata, frame_data, root_path=root_path,
+                           file_types={"csv"}, append=chunk_index > 0)
+            results.append(chunk_df)
+            constants = frame_data.constants
+            record["rows"] = len(chunk_df)
+    frame_data = FrameData()
+    if results:
+        frame_data.dataframe = pd.concat(results)
+        # Every chunk reads the same global constants
+        frame_data.constants = constants
+    export_outputs(yamldata, frame_data, root_path=root_path,
+                   file_types={"xls", "xlsx"})
+    # Spectra and summaries cover the frames of all chunks
+    run_spectra(yamldata, frame_data, root_path=root_path)
+    run_aggregate(yamldata, frame_data, root_path=root_path)
+    return frame_data
+
+
+def plot_outputs(yamldata, frame_data, root_path=None):
+    """
+    Draw all ``graph`` entries of the ``output`` section.
+    """
+    if not any('graph' in one_output for one_output in yamldata.get('output', [])):
+        return
+    import matplotlib.pyplot as plt
     for one_output in yamldata.get('output', []):
         if 'graph' in one_output:
             for graph in one_output['graph']:
@@ -768,7 +1146,7 @@ def main():
 
                         # fig.tight_layout()
                     file_base = prepend_root_if_relative(
-                        file_path=graph['file'], root_path=args.root_path)
+                        file_path=graph['file'], root_path=root_path)
                     file_formats = graph.get("file_format", "tiff")
                     if isinstance(file_formats, list):
                         formats_list = file_formats
@@ -781,6 +1159,190 @@ def main():
                             file_out += ext
                         fig.savefig(file_out, dpi=graph.get(
                             "dpi", 300), format=fmt)
+                    plt.close(fig)
+
+
+def run_in_memory(yamldata, root_path=None, profiler=None, file_cache=None, prefetch=0, io_workers=None,
+                  dedupe=True):
+    """
+    Run all stages up to export on the complete dataset at once and return the
+    resulting FrameData.
+    """
+    if profiler is None:
+        profiler = StageProfiler(enabled=False)
+    atom_data = AtomData()
+    frame_data = FrameData()
+    mesurement_data = MeasurementData()
+
+    # Read files
+    with profiler.stage("load_files") as record:
+        load_files(yamldata, atom_data, frame_data, root_path=root_path,
+                   profiler=profiler, file_cache=file_cache, prefetch=prefetch, io_workers=io_workers,
+                   dedupe=dedupe)
+        record["rows"] = len(frame_data.dataframe)
+
+    # Substitutions
+    with profiler.stage("substitutions") as record:
+        apply_substitutions(yamldata, atom_data)
+        record["rows"] = len(atom_data.dataframe)
+
+    # --- Deduplication ---
+    with profiler.stage("deduplicate") as record:
+        run_deduplicate(yamldata, atom_data, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Connectivity ---
+    with profiler.stage("connectivity") as record:
+        run_connectivity(yamldata, atom_data, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Measurements ---
+    with profiler.stage("measurements") as record:
+        run_measurements(yamldata, atom_data, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Clustering ---
+    with profiler.stage("clustering") as record:
+        run_clustering(yamldata, atom_data, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Thermochemistry ---
+    with profiler.stage("thermochemistry") as record:
+        run_thermochemistry(yamldata, atom_data, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Calculations ---
+    with profiler.stage("calc") as record:
+        run_calculations(yamldata, frame_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Spectra ---
+    with profiler.stage("spectra") as record:
+        run_spectra(yamldata, frame_data, root_path=root_path)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Ensemble summaries ---
+    with profiler.stage("aggregate") as record:
+        run_aggregate(yamldata, frame_data, root_path=root_path)
+        record["rows"] = len(frame_data.dataframe)
+
+    # --- Exporting ---
+    with profiler.stage("export") as record:
+        export_outputs(yamldata, frame_data,
+                       root_path=root_path, atom_data=atom_data)
+        record["rows"] = len(frame_data.dataframe)
+
+    return frame_data
+
+
+def run_job(job, file_cache=None):
+    """
+    Run one job submitted to the server. `job` holds the ``inputfile`` and the
+    ``root_path`` sent by the client; parsed input files are reused from `file_cache`.
+    """
+    root_path = job.get("root_path")
+    yamlparser = yr.YAMLFile()
+    yamlparser.load_file(prepend_root_if_relative(
+        file_path=job["inputfile"], root_path=root_path))
+    yamldata = yamlparser.get_data()
+    frame_data = run_in_memory(
+        yamldata, root_path=root_path, file_cache=file_cache)
+    plot_outputs(yamldata, frame_data, root_path=root_path)
+
+
+def serve_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="qmanalysis serve", description="Keep parsed input files in memory and run YAML jobs submitted over a Unix socket.")
+    parser.add_argument("--socket", default=str(server.DEFAULT_SOCKET),
+                        help="Path of the Unix socket to listen on")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="Maximum number of parsed input files kept in memory")
+    args = parser.parse_args(argv)
+    server.serve(args.socket, run_job, cache_size=args.cache_size)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        return serve_main(argv[1:])
+    if argv and argv[0] == "submit":
+        return server.client_main(argv[1:])
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputfile", help="Main command input file")
+
+    # Add -rp / --root-path argument (single allowed — default behavior)
+    parser.add_argument(
+        "-rp", "--root_path",
+        type=str,
+        help="Root path used for all files. If none is specified, the location of the input file is used as root path"
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        metavar="REPORT",
+        help="Record wall time, CPU time, peak RSS and row counts for every pipeline stage and input file and write them to REPORT (.json or .csv)"
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        type=str,
+        metavar="DIR",
+        help="Dump cProfile statistics for every pipeline stage into DIR; enables profiling, the report is only written with --profile"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        metavar="N",
+        help="Streaming mode: process the input files in chunks of N files and append the results of each chunk to the CSV outputs, keeping only per-frame results in memory"
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Read up to K input files ahead in background threads while the current file is parsed"
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        metavar="N",
+        help="Number of threads reading files ahead with --prefetch (defaults to K)"
+    )
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Parse every input file, even if another input file has identical content"
+    )
+
+    args = parser.parse_args(argv)
+    profiler = StageProfiler(enabled=bool(args.profile or args.profile_cprofile),
+                             cprofile_dir=args.profile_cprofile)
+
+    yamlparser = yr.YAMLFile()
+    yamlparser.load_file(prepend_root_if_relative(
+        file_path=args.inputfile, root_path=args.root_path))
+    yamldata = yamlparser.get_data()
+
+    if args.chunk_size:
+        frame_data = run_streaming(yamldata, root_path=args.root_path,
+                                   chunk_size=args.chunk_size, profiler=profiler,
+                                   prefetch=args.prefetch, io_workers=args.io_workers,
+                                   dedupe=not args.no_dedupe)
+    else:
+        frame_data = run_in_memory(
+            yamldata, root_path=args.root_path, profiler=profiler,
+            prefetch=args.prefetch, io_workers=args.io_workers,
+            dedupe=not args.no_dedupe)
+
+    # --- Plotting ---
+    with profiler.stage("plotting") as record:
+        plot_outputs(yamldata, frame_data, root_path=args.root_path)
+        record["rows"] = len(frame_data.dataframe)
+
+    if args.profile:
+        profiler.write_report(prepend_root_if_relative(
+            file_path=args.profile, root_path=args.root_path))
 
     #     # Place beep at the very end, after all processing and exporting
     # if yamldata.get('ping', False):
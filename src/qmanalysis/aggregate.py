@@ -0,0 +1,110 @@
+import re
+import numpy as np
+import pandas as pd
+from qmanalysis import thermochemistry
+
+# Name of the only group when frames are not grouped
+ALL_FRAMES = "all"
+
+
+def group_frames(index, by=None, pattern=None, level="file_name"):
+    """
+    Return an integer group code for every frame of the FrameData `index` (-1
+    for frames in no group) and the group labels.
+
+    `by` is an index level or a list of levels whose values form the groups.
+    `pattern` is a regular expression matched against the values of `level`:
+    frames are grouped by its first group, or by the whole match if it has no
+    groups, and frames it does not match are left out. Without either, all
+    frames form one group.
+    """
+    if by is not None and pattern is not None:
+        raise ValueError("aggregate takes either 'by' or 'pattern', not both")
+    if pattern is not None:
+        regex = re.compile(pattern)
+        values = index.get_level_values(level).astype(str)
+
+        def key(value):
+            match = regex.search(value)
+            if match is None:
+                return None
+            return match.group(1) if regex.groups else match.group(0)
+        # Every distinct value is matched once
+        uniques, inverse = np.unique(np.asarray(values), return_inverse=True)
+        keys = pd.Index([key(value) for value in uniques], dtype=object)[inverse]
+        codes, labels = pd.factorize(keys)
+        return codes, pd.Index(labels, name=level)
+    if by is None:
+        labels = [ALL_FRAMES] if len(index) else []
+        return np.zeros(len(index), dtype=np.int64), pd.Index(labels, name="group", dtype=object)
+    levels = [by] if isinstance(by, str) else list(by)
+    for name in levels:
+        if name not in index.names:
+            raise ValueError(
+                f"Unknown index level '{name}' to aggregate by, expected one of {', '.join(index.names)}")
+    keys = index.droplevel([name for name in index.names if name not in levels])
+    codes, labels = keys.factorize()
+    labels.names = levels
+    return codes, labels
+
+
+def aggregate_frames(frame_data, columns, by=None, pattern=None, level="file_name", energy="HF",
+                     temperature=298.15):
+    """
+    Boltzmann-weighted statistics of `columns` over groups of frames (see
+    group_frames).
+
+    The weights come from the `energy` column (Hartree) at `temperature` (K)
+    and are normalized within every group; with `energy` None, the frames of a
+    group weigh equally. Returns a dataframe with one row per group and the
+    columns ``n_frames``, ``<column>_mean`` and ``<column>_std`` (weighted),
+    ``<column>_min`` and ``<column>_max`` for every column and, with an
+    `energy`, ``best_weight`` and the index levels of the lowest-energy frame
+    as ``best_file_name``, ``best_file_path`` and ``best_timestep_name``.
+    """
+    df = frame_data.dataframe
+    missing = [col for col in list(columns) + ([energy] if energy else []) if col not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns to aggregate: {', '.join(map(str, missing))}")
+    codes, labels = group_frames(df.index, by, pattern, level)
+    grouped = codes >= 0
+    df, codes = df[grouped], codes[grouped]
+    n_groups = len(labels)
+    if energy:
+        energies = pd.to_numeric(df[energy], errors="coerce").to_numpy(dtype=float)
+        weights = thermochemistry.boltzmann_weights(energies, temperature, codes)
+    else:
+        weights = 1.0 / np.bincount(codes, minlength=n_groups)[codes]
+
+    values = df[list(columns)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    # Missing values drop out and the weights of the others are renormalized
+    known = np.isfinite(values) & np.isfinite(weights)[:, None]
+    w = np.where(known, weights[:, None], 0.0)
+    filled = np.where(known, values, 0.0)
+
+    def group_sums(array):
+        return pd.DataFrame(array).groupby(codes).sum().reindex(range(n_groups)).to_numpy()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        totals = group_sums(w)
+        means = group_sums(w * filled) / totals
+        deviations = np.where(known, filled - means[codes], 0.0)
+        stds = np.sqrt(group_sums(w * deviations ** 2) / totals)
+    extremes = pd.DataFrame(values).groupby(codes).agg(["min", "max"]).reindex(range(n_groups))
+
+    summary = {"n_frames": np.bincount(codes, minlength=n_groups)}
+    for k, col in enumerate(columns):
+        summary[f"{col}_mean"] = means[:, k]
+        summary[f"{col}_std"] = stds[:, k]
+        summary[f"{col}_min"] = extremes[(k, "min")].to_numpy()
+        summary[f"{col}_max"] = extremes[(k, "max")].to_numpy()
+    if energy:
+        # Lowest energy first within every group; unknown energies sort last
+        order = np.lexsort((np.where(np.isnan(energies), np.inf, energies), codes))
+        best = order[np.searchsorted(codes[order], np.arange(n_groups))]
+        has_energy = np.isfinite(energies[best])
+        summary["best_weight"] = np.where(has_energy, weights[best], np.nan)
+        for name in df.index.names:
+            best_values = df.index.get_level_values(name).to_numpy()[best]
+            summary[f"best_{name}"] = np.where(has_energy, best_values, None)
+    return pd.DataFrame(summary, index=labels)
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from qmanalysis import elements
+
+# Approximate bytes needed per structure pair in one RMSD block (3x3 correlation
+# matrix, its singular values and temporaries)
+BYTES_PER_PAIR = 400
+DEFAULT_MEMORY_MB = 256
+
+
+def frame_coordinates(atom_data, heavy_atoms=False):
+    """
+    Return the frames of `atom_data` grouped by their element sequence, as a list
+    of (frame index, (frames, atoms, 3) coordinate array) pairs. Only frames with
+    the same atoms in the same order can be compared. With `heavy_atoms`,
+    hydrogens are left out.
+    """
+    df = atom_data.dataframe
+    if heavy_atoms:
+        df = df[elements.numbers_from_symbols(df["element"].to_numpy()) != 1]
+    frame_ids, frames = df.index.droplevel("atom_index").factorize()
+    frames.names = df.index.names[:-1]
+    order = np.argsort(frame_ids, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(frame_ids, minlength=len(frames)))])
+    symbols = df["element"].to_numpy()[order]
+    coords = df[["x", "y", "z"]].to_numpy(dtype=float)[order]
+    groups = {}
+    for frame in range(len(frames)):
+        atoms = slice(bounds[frame], bounds[frame + 1])
+        groups.setdefault(tuple(symbols[atoms]), []).append(frame)
+    return [(frames[group], np.stack([coords[bounds[f]:bounds[f + 1]] for f in group]))
+            for group in groups.values()]
+
+
+def block_rmsd(a, b):
+    """
+    Return the (p, q) RMSDs after optimal superposition (Kabsch) of every centred
+    structure in `a` (p, n, 3) onto every centred structure in `b` (q, n, 3).
+    """
+    p, n, _ = a.shape
+    q = len(b)
+    # Correlation matrices H = a^T b of all pairs with one matrix product
+    h = (a.transpose(0, 2, 1).reshape(p * 3, n) @ b.transpose(1, 0, 2).reshape(n, q * 3))
+    h = h.reshape(p, 3, q, 3).transpose(0, 2, 1, 3)
+    singular = np.linalg.svd(h, compute_uv=False)
+    # A reflection is not a rotation: flip the smallest singular value
+    singular[..., 2] *= np.where(np.linalg.det(h) < 0, -1.0, 1.0)
+    squares = (a ** 2).sum(axis=(1, 2))[:, None] + (b ** 2).sum(axis=(1, 2))[None, :]
+    return np.sqrt(np.maximum(squares - 2 * singular.sum(axis=-1), 0.0) / n)
+
+
+_worker_coords = None
+
+
+def _init_worker(coords):
+    global _worker_coords
+    _worker_coords = coords
+
+
+def _neighbour_block(task):
+    (start1, stop1), (start2, stop2), threshold = task
+    rmsd = block_rmsd(_worker_coords[start1:stop1], _worker_coords[start2:stop2])
+    i, j = np.nonzero(rmsd <= threshold)
+    i, j = i + start1, j + start2
+    keep = i < j
+    return np.stack([i[keep], j[keep]], axis=1)
+
+
+def block_size(memory_mb=DEFAULT_MEMORY_MB):
+    """Number of structures per side of an RMSD block that fits into `memory_mb`."""
+    return max(1, int(np.sqrt(memory_mb * 1024 ** 2 / BYTES_PER_PAIR)))
+
+
+def rmsd_neighbours(coords, threshold, memory_mb=DEFAULT_MEMORY_MB, workers=1):
+    """
+    Return all pairs ``(i, j)``, ``i < j``, of the (frames, atoms, 3) `coords`
+    whose aligned RMSD is at most `threshold`.
+
+    The RMSD matrix is never held in full: it is computed in square blocks sized
+    to `memory_mb` per worker, spread over `workers` processes (1 computes in this
+    process), and only the pairs below the threshold are kept.
+    """
+    coords = coords - coords.mean(axis=1, keepdims=True)
+    size = block_size(memory_mb)
+    ranges = [(start, min(start + size, len(coords))) for start in range(0, len(coords), size)]
+    tasks = [(first, second, threshold)
+             for k, first in enumerate(ranges) for second in ranges[k:]]
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(coords,)) as executor:
+            blocks = list(executor.map(_neighbour_block, tasks))
+    else:
+        _init_worker(coords)
+        try:
+            blocks = [_neighbour_block(task) for task in tasks]
+        finally:
+            _init_worker(None)
+    return np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=int)
+
+
+def butina(n, pairs):
+    """
+    Cluster `n` items with the Butina algorithm from the neighbour `pairs`: going
+    through the items by decreasing number of neighbours, every item that is not
+    yet assigned becomes a centroid and takes its unassigned neighbours into its
+    cluster. Returns the cluster id of every item, numbered in the order the
+    clusters are created, and a mask of the centroids.
+    """
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    both = both[np.argsort(both[:, 0], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(np.bincount(both[:, 0], minlength=n))])
+    neighbours = both[:, 1]
+    counts = np.diff(starts)
+    cluster_ids = np.full(n, -1)
+    centroids = np.zeros(n, dtype=bool)
+    cluster = 0
+    # Most neighbours first, ties by position
+    for item in np.argsort(-counts, kind="stable"):
+        if cluster_ids[item] >= 0:
+            continue
+        members = neighbours[starts[item]:starts[item + 1]]
+        members = members[cluster_ids[members] < 0]
+        cluster_ids[item] = cluster
+        cluster_ids[members] = cluster
+        centroids[item] = True
+        cluster += 1
+    return cluster_ids, centroids
+
+
+def cluster_frames(atom_data, threshold, memory_mb=DEFAULT_MEMORY_MB, workers=1, heavy_atoms=False):
+    """
+    Butina clustering of all frames of `atom_data` on their aligned RMSD.
+
+    Returns a dataframe indexed like FrameData with ``cluster_id`` and
+    ``cluster_centroid`` (True for the representative of each cluster). Frames
+    with different atoms never share a cluster.
+    """
+    results = []
+    offset = 0
+    for frames, coords in frame_coordinates(atom_data, heavy_atoms):
+        pairs = rmsd_neighbours(coords, threshold, memory_mb, workers)
+        cluster_ids, centroids = butina(len(frames), pairs)
+        results.append(pd.DataFrame({"cluster_id": cluster_ids + offset,
+                                     "cluster_centroid": centroids}, index=frames))
+        offset += cluster_ids.max() + 1 if len(cluster_ids) else 0
+    if not results:
+        return pd.DataFrame(columns=["cluster_id", "cluster_centroid"])
+    return pd.concat(results)
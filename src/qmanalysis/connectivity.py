@@ -0,0 +1,169 @@
+import hashlib
+import itertools
+import numpy as np
+import pandas as pd
+from qmanalysis import elements, kernels
+
+# Two atoms are bonded if they are closer than the sum of their covalent radii
+# plus BOND_TOLERANCE (Å), but not closer than MIN_BOND_LENGTH
+BOND_TOLERANCE = 0.45
+MIN_BOND_LENGTH = 0.4
+
+# Measurements that can be generated from a topology
+TOPOLOGY_MEASUREMENTS = ("bonds", "angles", "torsions")
+
+_CELL_OFFSETS = np.array(list(itertools.product((-1, 0, 1), repeat=3)))
+
+
+def neighbour_pairs(coords, cutoff):
+    """
+    Return all pairs ``(i, j)``, ``i < j``, of the (n, 3) `coords` closer than
+    `cutoff` and their distances.
+
+    Atoms are sorted into cubic cells of edge `cutoff`, so only atoms in the same
+    or adjacent cells are compared and the work grows linearly with n.
+    """
+    n = len(coords)
+    if n < 2 or not np.isfinite(cutoff) or cutoff <= 0:
+        return np.empty((0, 2), dtype=int), np.empty(0)
+    cells = np.floor((coords - coords.min(axis=0)) / cutoff).astype(np.int64) + 1
+    # One empty layer of cells on every side for the neighbour offsets
+    dims = cells.max(axis=0) + 2
+    keys = np.ravel_multi_index(cells.T, dims)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    pairs = []
+    for offset in _CELL_OFFSETS:
+        neighbour_keys = np.ravel_multi_index((cells + offset).T, dims)
+        start = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        counts = np.searchsorted(sorted_keys, neighbour_keys, side="right") - start
+        first = np.repeat(np.arange(n), counts)
+        # Position of every candidate in the sorted atoms
+        positions = np.repeat(start - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        second = order[positions]
+        keep = first < second
+        pairs.append(np.stack([first[keep], second[keep]], axis=1))
+    pairs = np.concatenate(pairs)
+    distances = np.linalg.norm(coords[pairs[:, 0]] - coords[pairs[:, 1]], axis=1)
+    close = distances < cutoff
+    return pairs[close], distances[close]
+
+
+def perceive_bonds(numbers, coords, tolerance=BOND_TOLERANCE):
+    """
+    Return the bonds of one structure as a sorted (bonds, 2) array of atom
+    positions, perceived from the covalent radii of the atomic `numbers`. Atoms of
+    unknown element get no bonds.
+    """
+    radii = elements.covalent_radii(numbers)
+    if not np.isfinite(radii).any():
+        return np.empty((0, 2), dtype=int)
+    cutoff = 2 * np.nanmax(radii) + tolerance
+    pairs, distances = neighbour_pairs(np.asarray(coords, dtype=float), cutoff)
+    limit = radii[pairs[:, 0]] + radii[pairs[:, 1]] + tolerance
+    bonds = pairs[(distances > MIN_BOND_LENGTH) & (distances < limit)]
+    return bonds[np.lexsort((bonds[:, 1], bonds[:, 0]))]
+
+
+def connectivity_hash(numbers, bonds):
+    """
+    Return a hex digest identifying the elements and bonds of a structure.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(numbers, dtype=np.int64).tobytes())
+    digest.update(b"|")
+    digest.update(np.asarray(bonds, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+class Topology:
+    """
+    Bonds, bond angles and proper torsions of one connectivity as arrays of atom
+    positions, shaped (bonds, 2), (angles, 3) and (torsions, 4).
+    """
+
+    def __init__(self, bonds, n_atoms):
+        self.bonds = np.asarray(bonds, dtype=int).reshape(-1, 2)
+        neighbours = [[] for _ in range(n_atoms)]
+        for i, j in self.bonds:
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+        neighbours = [sorted(atoms) for atoms in neighbours]
+        self.angles = np.array([(i, j, k) for j in range(n_atoms)
+                                for i, k in itertools.combinations(neighbours[j], 2)],
+                               dtype=int).reshape(-1, 3)
+        self.torsions = np.array([(i, j, k, l) for j, k in self.bonds
+                                  for i in neighbours[j] if i != k
+                                  for l in neighbours[k] if l != j and l != i],
+                                 dtype=int).reshape(-1, 4)
+
+    def atoms(self, kind):
+        return {"bonds": self.bonds, "angles": self.angles, "torsions": self.torsions}[kind]
+
+
+def _measure(kind, coords, atoms):
+    # coords: (frames, n, 3); one kernel call for every frame and bond/angle/torsion
+    points = [coords[:, atoms[:, k]].reshape(-1, 3) for k in range(atoms.shape[1])]
+    kernel = {"bonds": kernels.distances, "angles": kernels.angles,
+              "torsions": kernels.dihedrals}[kind]
+    return kernel(*points).reshape(len(coords), len(atoms))
+
+
+def _column_names(kind, atoms, labels):
+    prefix = {"bonds": "bond", "angles": "angle", "torsions": "torsion"}[kind]
+    return ["_".join([prefix] + [str(labels[a]) for a in row]) for row in atoms]
+
+
+def analyze_frames(atom_data, tolerance=BOND_TOLERANCE, measurements=(), cache=None):
+    """
+    Perceive the bonds of every frame in `atom_data`.
+
+    Returns a dataframe indexed like FrameData with the columns
+    ``connectivity_hash`` and ``n_bonds`` and, for every kind listed in
+    `measurements` (``bonds``, ``angles``, ``torsions``), one column per bond
+    length, bond angle or torsion named after the atom indices, e.g. ``bond_1_2``
+    or ``torsion_1_2_3_4``. Frames sharing a connectivity hash share one
+    Topology from `cache` (a dict, filled as needed) and are measured together.
+    """
+    for kind in measurements:
+        if kind not in TOPOLOGY_MEASUREMENTS:
+            raise ValueError(
+                f"Unknown connectivity measurement '{kind}', expected one of {', '.join(TOPOLOGY_MEASUREMENTS)}")
+    cache = {} if cache is None else cache
+    df = atom_data.dataframe
+    frame_ids, frames = df.index.droplevel("atom_index").factorize()
+    frames.names = df.index.names[:-1]
+    order = np.argsort(frame_ids, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(frame_ids, minlength=len(frames)))])
+    numbers = elements.numbers_from_symbols(df["element"].to_numpy())[order]
+    coords = df[["x", "y", "z"]].to_numpy(dtype=float)[order]
+    labels = df.index.get_level_values("atom_index").to_numpy()[order]
+
+    hashes, n_bonds, groups = [], [], {}
+    for frame in range(len(frames)):
+        atoms = slice(bounds[frame], bounds[frame + 1])
+        bonds = perceive_bonds(numbers[atoms], coords[atoms], tolerance)
+        key = connectivity_hash(numbers[atoms], bonds)
+        if key not in cache:
+            cache[key] = Topology(bonds, atoms.stop - atoms.start)
+        hashes.append(key)
+        n_bonds.append(len(bonds))
+        groups.setdefault(key, []).append(frame)
+
+    blocks = [pd.DataFrame({"connectivity_hash": hashes, "n_bonds": n_bonds}, index=frames)]
+    if measurements:
+        measured = []
+        for key, group in groups.items():
+            topology = cache[key]
+            first = bounds[group[0]]
+            n_atoms = bounds[group[0] + 1] - first
+            group_coords = np.stack([coords[bounds[f]:bounds[f] + n_atoms] for f in group])
+            group_labels = labels[first:first + n_atoms]
+            columns = {}
+            for kind in measurements:
+                atoms = topology.atoms(kind)
+                values = _measure(kind, group_coords, atoms)
+                columns.update(zip(_column_names(kind, atoms, group_labels), values.T))
+            measured.append(pd.DataFrame(columns, index=frames[group]))
+        blocks.append(pd.concat(measured).reindex(frames))
+    return pd.concat(blocks, axis=1)
@@ -0,0 +1,126 @@
+import fnmatch
+import re
+import numpy as np
+import pandas as pd
+
+GLOB_CHARS = ('*', '?', '[')
+
+
+def is_glob(pattern):
+    return any(char in pattern for char in GLOB_CHARS)
+
+
+def _match_level(index, level, patterns):
+    """
+    Return a (len(patterns), len(index)) boolean array telling which rows of `index`
+    match each pattern on `level`. Patterns are compared to the unique values of the
+    level only and the result is expanded to the rows through the level codes.
+    Missing patterns (NaN) match every row.
+    """
+    level_num = index.names.index(level)
+    uniques = np.array([str(value) for value in index.levels[level_num]], dtype=object)
+    codes = index.codes[level_num]
+    compiled = {}
+    matches = np.ones((len(patterns), len(index)), dtype=bool)
+    for k, pattern in enumerate(patterns):
+        if pd.isna(pattern):
+            continue
+        pattern = str(pattern)
+        if is_glob(pattern):
+            if pattern not in compiled:
+                regex = re.compile(fnmatch.translate(pattern))
+                compiled[pattern] = np.fromiter(
+                    (regex.match(value) is not None for value in uniques), dtype=bool, count=len(uniques))
+            unique_match = compiled[pattern]
+        else:
+            unique_match = uniques == pattern
+        # Code -1 marks a missing level value, which matches no pattern
+        matches[k] = np.append(unique_match, False)[codes]
+    return matches
+
+
+def _string_codes(index, level):
+    """
+    Return the unique values of `level` as strings and, for every row of `index`,
+    the position of its value among them (-1 for a missing value).
+    """
+    level_num = index.names.index(level)
+    codes, uniques = pd.factorize(
+        np.array([str(value) for value in index.levels[level_num]], dtype=object))
+    # Code -1 marks a missing level value and stays -1
+    return pd.Index(uniques), np.append(codes, -1)[index.codes[level_num]]
+
+
+def match_constants(index, constants_df, label_cols):
+    """
+    Return for every row of `index` the position of the last row of `constants_df`
+    whose `label_cols` all match it, or -1 if none does.
+
+    Rows whose keys are exact values or empty are resolved with a hash lookup on
+    the codes of the levels they give, one lookup for every combination of given
+    levels. Only rows with a glob pattern are compared to every frame.
+    """
+    index = index.remove_unused_levels()
+    keys = constants_df[label_cols].reset_index(drop=True)
+    given = keys.notna().to_numpy()
+    exact = ~keys.map(lambda key: isinstance(key, str) and is_glob(key)).any(axis=1).to_numpy() \
+        & given.any(axis=1)
+    winner = np.full(len(index), -1)
+
+    levels = {level: _string_codes(index, level) for level in label_cols}
+    for combination in np.unique(given[exact], axis=0):
+        rows = np.flatnonzero(exact & (given == combination).all(axis=1))
+        key_levels = [level for level, used in zip(label_cols, combination) if used]
+        key_codes = np.array([levels[level][0].get_indexer(keys[level].iloc[rows].astype(str))
+                              for level in key_levels])
+        # Keys with a value that is not in the index match nothing
+        known = (key_codes >= 0).all(axis=0)
+        lookup = pd.MultiIndex.from_arrays(list(key_codes[:, known]))
+        # The last of several rows with the same key wins
+        last = ~lookup.duplicated(keep="last")
+        position = lookup[last].get_indexer(
+            pd.MultiIndex.from_arrays([levels[level][1] for level in key_levels]))
+        # Position -1 (no match) picks the appended -1
+        winner = np.maximum(winner, np.append(rows[known][last], -1)[position])
+
+    glob_rows = np.flatnonzero(~exact)
+    if len(glob_rows):
+        matches = np.ones((len(glob_rows), len(index)), dtype=bool)
+        for level in label_cols:
+            matches &= _match_level(index, level, keys[level].iloc[glob_rows].tolist())
+        # Last matching glob row, compared with the exact matches by position
+        last_match = len(glob_rows) - 1 - matches[::-1].argmax(axis=0)
+        winner = np.maximum(winner, np.where(matches.any(axis=0), glob_rows[last_match], -1))
+    return winner
+
+
+def join_constants(frame_df, constants_df, rsuffix=None):
+    """
+    Assign the value columns of `constants_df` to the rows of `frame_df` they match.
+
+    Columns of `constants_df` named like an index level of `frame_df` (file_name,
+    file_path, timestep_name, ...) are keys. A key is an exact value, a glob pattern
+    (``*``, ``?``, ``[``) or empty, which matches everything. If several constants
+    rows match a frame, the last one wins. Frames without a match get NA.
+
+    Existing columns of `frame_df` are overwritten where a constants row matches,
+    unless `rsuffix` is given, in which case the constants column is added with
+    `rsuffix` appended to its name. Returns a new dataframe.
+    """
+    label_cols = [col for col in constants_df.columns if col in frame_df.index.names]
+    if not label_cols:
+        raise ValueError(
+            f"Constants need at least one key column out of {', '.join(frame_df.index.names)}")
+    value_cols = [col for col in constants_df.columns if col not in label_cols]
+    winner = match_constants(frame_df.index, constants_df, label_cols)
+    values = constants_df[value_cols].reset_index(drop=True).reindex(winner)
+    values.index = frame_df.index
+    matched = winner >= 0
+    overlap = [col for col in value_cols if col in frame_df.columns]
+    if rsuffix is not None:
+        values = values.rename(columns={col: col + rsuffix for col in overlap})
+        return pd.concat([frame_df, values], axis=1)
+    result = frame_df.copy()
+    if overlap:
+        result[overlap] = values[overlap].where(matched[:, None], frame_df[overlap])
+    return pd.concat([result, values.drop(columns=overlap)], axis=1)
@@ -15,6 +15,9 @@ class FrameData:
             'file_name', 'file_path', 'timestep_name'))
         self.dataframe = pd.DataFrame(index=idx,
                                       columns=["raw_data", "Energy", "zero-point energy", "file_comment"])
+        # Scalar constants shared by all frames (e.g. from a global_constants_csv).
+        # They are available in calculations and only become columns on export.
+        self.constants = {}
 
 
 class MeasurementData:
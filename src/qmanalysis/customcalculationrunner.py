@@ -1,14 +1,49 @@
 # --- Custom Calculation Section ---
 
+import ast
+import importlib
+import re
 import numpy as np
 import pandas as pd
-import scipy    # Import scipy if needed, otherwise it will be optional
+
+# Modules that are only imported when an expression refers to them
+LAZY_MODULES = {"scipy": "scipy"}
+
+# Lookups of other frames' values that are resolved once per expression
+PIVOT_FUNCTIONS = ("pivot", "pivot_timestep")
+
+
+class _PivotResolver(ast.NodeTransformer):
+    """
+    Replaces ``pivot('file', 'column')`` and ``pivot_timestep('file', 'column')``
+    calls with literal arguments by the names ``__pivot_0``, ``__pivot_1``, ...
+    and records the calls in `calls`.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if (isinstance(node.func, ast.Name) and node.func.id in PIVOT_FUNCTIONS
+                and len(node.args) == 2 and not node.keywords
+                and all(isinstance(arg, ast.Constant) and isinstance(arg.value, str)
+                        for arg in node.args)):
+            name = f"__pivot_{len(self.calls)}"
+            self.calls.append((name, node.func.id, node.args[0].value, node.args[1].value))
+            if node.func.id == "pivot_timestep":
+                # One value per frame, looked up like a column
+                return ast.Subscript(value=ast.Name(id="row", ctx=ast.Load()),
+                                     slice=ast.Constant(value=name), ctx=ast.Load())
+            return ast.Name(id=name, ctx=ast.Load())
+        return node
 
 
 class CustomCalculationRunner:
     """
     Runs user-defined calculations on frame_data using numpy, scipy, and user-supplied values.
-    Stores results in new columns as specified in the YAML input.
+    Stores results in new columns as specified in the YAML input. The scalar constants
+    in ``frame_data.constants`` can be used by name in expressions.
     """
 
     def __init__(self, frame_data, extra_globals=None):
@@ -29,30 +64,107 @@ class CustomCalculationRunner:
             "str": str
         }
 
-        # Optionally add scipy if needed
+        self.safe_globals["pivot"] = self.pivot
+        self.safe_globals["pivot_timestep"] = self.pivot_timestep
+
+        if extra_globals:
+            self.safe_globals.update(extra_globals)
+
+    def pivot(self, file_name, col_name):
+        """
+        Return `col_name` of the first frame of `file_name`, or None if there is none.
+        """
         try:
-            self.safe_globals["scipy"] = scipy
-        except ImportError:
-            pass
+            df = self.frame_data.dataframe.xs(file_name, level="file_name")
+            return df.iloc[0][col_name]
+        except Exception as e:
+            print(f"pivot error: {e}")
+            return None
 
-        def pivot(file_name, col_name):
-            # Find the row with the given file_name in the MultiIndex
-            # Assumes file_name is in the first level of the MultiIndex
-            try:
-                # Get all rows with the given file_name
-                df = self.frame_data.dataframe.xs(file_name, level="file_name")
-                # If multiple rows, you may need to further filter by other index levels
-                # For now, just take the first match
-                value = df.iloc[0][col_name]
-                return value
-            except Exception as e:
-                print(f"pivot error: {e}")
-                return None
+    def pivot_timestep(self, file_name, col_name):
+        """
+        Return `col_name` of the frame of `file_name` with the same timestep_name as
+        each frame, as a Series aligned with the frames (NaN where `file_name` has no
+        such timestep).
+        """
+        df = self.frame_data.dataframe
+        try:
+            reference = df.xs(file_name, level="file_name")[col_name].droplevel("file_path")
+        except Exception as e:
+            print(f"pivot error: {e}")
+            return pd.Series(np.nan, index=df.index)
+        reference = reference[~reference.index.duplicated()]
+        values = reference.reindex(df.index.get_level_values("timestep_name")).to_numpy()
+        return pd.Series(values, index=df.index)
+
+    def _substitute_columns(self, expr, columns):
+        """
+        Replace the column names in `expr` that are not inside quotes with
+        ``row["column"]``.
+        """
+        for col in columns:
+            def replacer(match):
+                # If odd number of quotes before, we're inside quotes
+                before = expr[:match.start()]
+                if before.count("'") % 2 == 1 or before.count('"') % 2 == 1:
+                    return match.group(0)
+                return f'row["{col}"]'
+            expr = re.sub(rf'\b{re.escape(col)}\b', replacer, expr)
+        return expr
 
-        self.safe_globals["pivot"] = pivot
+    def _resolve_pivots(self, expr):
+        """
+        Replace pivot calls with literal arguments in `expr` by precomputed values.
 
-        if extra_globals:
-            self.safe_globals.update(extra_globals)
+        Returns the rewritten expression, the scalar values of ``pivot`` calls by
+        name, the aligned Series of ``pivot_timestep`` calls by name, and whether
+        the expression refers to frame columns. An expression that does not parse is
+        returned unchanged.
+        """
+        try:
+            tree = ast.parse(expr, mode="eval")
+        except SyntaxError:
+            return expr, {}, {}, True
+        resolver = _PivotResolver()
+        tree = resolver.visit(tree)
+        scalars, vectors = {}, {}
+        for name, function, file_name, col_name in resolver.calls:
+            if function == "pivot":
+                scalars[name] = self.pivot(file_name, col_name)
+            else:
+                vectors[name] = self.pivot_timestep(file_name, col_name)
+        uses_rows = any(isinstance(node, ast.Name) and node.id == "row" for node in ast.walk(tree))
+        return ast.unparse(tree), scalars, vectors, uses_rows
+
+    def _evaluate_vectorized(self, expr, local_vars, columns, uses_rows):
+        """
+        Evaluate `expr` on whole columns at once. Returns the values for all frames,
+        or None if the expression does not work on columns or does not give one
+        value per frame; it is then evaluated row by row.
+        """
+        df = self.frame_data.dataframe
+        try:
+            with np.errstate(all="ignore"):
+                result = eval(expr, self.safe_globals, {"row": columns, **local_vars})
+        except Exception:
+            return None
+        if isinstance(result, pd.Series):
+            return result if result.index.equals(df.index) else None
+        if isinstance(result, np.ndarray) and result.ndim > 0:
+            return result if result.shape == (len(df),) else None
+        # Reductions like max(column) give one value, rows give one per frame
+        if not uses_rows and np.ndim(result) == 0:
+            return result
+        return None
+
+    def _import_lazy_modules(self, expr):
+        for name, module in LAZY_MODULES.items():
+            if name not in self.safe_globals and re.search(rf'\b{name}\b', expr):
+                try:
+                    self.safe_globals[name] = importlib.import_module(module)
+                except ImportError:
+                    print(
+                        f"Module '{module}' is not installed, '{name}' is not available in calculations")
 
     def run(self, calculations):
         """
@@ -63,40 +175,44 @@ class CustomCalculationRunner:
         for calc in calculations:
             name = calc["name"]
             expr = calc["expr"]
-            # Prepare local variables: all columns as Series
-            local_vars = {
-                col: self.frame_data.dataframe[col] for col in self.frame_data.dataframe.columns}
+            self._import_lazy_modules(expr)
+            # Prepare local variables: global constants and all columns as Series
+            local_vars = dict(getattr(self.frame_data, "constants", {}))
+            local_vars.update({
+                col: self.frame_data.dataframe[col] for col in self.frame_data.dataframe.columns})
             # Allow user-supplied values
             if "values" in calc:
                 local_vars.update(calc["values"])
+            # Column names become row["column"]; pivot calls with literal arguments
+            # are looked up once instead of for every row
+            expr_safe = self._substitute_columns(expr, self.frame_data.dataframe.columns)
+            expr_safe, scalars, vectors, uses_rows = self._resolve_pivots(expr_safe)
+            local_vars.update(scalars)
+            df = self.frame_data.dataframe
+            columns = {**{col: df[col] for col in df.columns}, **vectors}
+            rows = df.assign(**vectors) if vectors else df
+
+            def safe_eval(row):
+                try:
+                    return eval(expr_safe, self.safe_globals, {"row": row, **local_vars})
+                except Exception as e:
+                    print(
+                        f"Error in custom calculation '{name}' for row: {e}")
+                    return np.nan
+            result = self._evaluate_vectorized(expr_safe, local_vars, columns, uses_rows)
+            if result is not None:
+                if np.ndim(result) > 0:
+                    # Division by zero gives ±inf on columns but raises on the Python
+                    # floats of a row, which gives NaN; those rows are evaluated again
+                    infinite = pd.Series(np.asarray(result)).isin([np.inf, -np.inf]).to_numpy()
+                    if infinite.any():
+                        result = pd.Series(np.asarray(result), index=df.index)
+                        result[infinite] = rows[infinite].apply(safe_eval, axis=1).to_numpy()
+                self.frame_data.dataframe[name] = result
+                continue
             # Evaluate the expression for each row
             try:
-                import re
-
-                def safe_eval(row):
-                    # Replace column names in expr with their values from the row, using bracket notation
-                    expr_safe = expr
-                    for col in self.frame_data.dataframe.columns:
-                        # Only replace if col is in expr as a variable (not inside quotes)
-                        # This regex matches col name not inside single or double quotes
-                        def replacer(match):
-                            # Check if match is inside quotes
-                            before = expr_safe[:match.start()]
-                            num_single = before.count("'")
-                            num_double = before.count('"')
-                            # If odd number of quotes before, we're inside quotes
-                            if num_single % 2 == 1 or num_double % 2 == 1:
-                                return match.group(0)
-                            return f'row["{col}"]'
-                        expr_safe = re.sub(
-                            rf'\b{re.escape(col)}\b', replacer, expr_safe)
-                    try:
-                        return eval(expr_safe, self.safe_globals, {"row": row, **local_vars})
-                    except Exception as e:
-                        print(
-                            f"Error in custom calculation '{name}' for row: {e}")
-                        return np.nan
-                self.frame_data.dataframe[name] = self.frame_data.dataframe.apply(
+                self.frame_data.dataframe[name] = rows.apply(
                     safe_eval, axis=1)
             except Exception as e:
                 print(f"Error in custom calculation '{name}': {e}")
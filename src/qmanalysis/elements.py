@@ -0,0 +1,106 @@
+"""
+Element properties indexed by atomic number.
+
+``SYMBOLS``, ``MASSES`` and ``COVALENT_RADII`` are NumPy arrays whose entry Z
+belongs to the element with atomic number Z; entry 0 is the ghost atom ``Bq``.
+Masses are standard atomic weights (mass number of the most stable isotope for
+elements without one) in u, covalent radii are those of Cordero et al., Dalton
+Trans. 2008, 2832 in Å (NaN beyond curium).
+"""
+
+import re
+import numpy as np
+
+SYMBOLS = np.array([
+    "Bq", "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne", "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar", "K",
+    "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn", "Ga", "Ge", "As", "Se", "Br", "Kr", "Rb", "Sr",
+    "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn", "Sb", "Te", "I", "Xe", "Cs", "Ba", "La",
+    "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb", "Lu", "Hf", "Ta", "W", "Re", "Os",
+    "Ir", "Pt", "Au", "Hg", "Tl", "Pb", "Bi", "Po", "At", "Rn", "Fr", "Ra", "Ac", "Th", "Pa", "U", "Np", "Pu", "Am",
+    "Cm", "Bk", "Cf", "Es", "Fm", "Md", "No", "Lr", "Rf", "Db", "Sg", "Bh", "Hs", "Mt", "Ds", "Rg", "Cn", "Nh", "Fl",
+    "Mc", "Lv", "Ts", "Og"
+], dtype=object)
+
+MASSES = np.array([
+    0.0, 1.008, 4.0026, 6.94, 9.0122, 10.81, 12.011, 14.007, 15.999, 18.998, 20.180,
+    22.990, 24.305, 26.982, 28.085, 30.974, 32.06, 35.45, 39.948, 39.098, 40.078,
+    44.956, 47.867, 50.942, 51.996, 54.938, 55.845, 58.933, 58.693, 63.546, 65.38,
+    69.723, 72.630, 74.922, 78.971, 79.904, 83.798, 85.468, 87.62, 88.906, 91.224,
+    92.906, 95.95, 98.0, 101.07, 102.91, 106.42, 107.87, 112.41, 114.82, 118.71,
+    121.76, 127.60, 126.90, 131.29, 132.91, 137.33, 138.91, 140.12, 140.91, 144.24,
+    145.0, 150.36, 151.96, 157.25, 158.93, 162.50, 164.93, 167.26, 168.93, 173.05,
+    174.97, 178.49, 180.95, 183.84, 186.21, 190.23, 192.22, 195.08, 196.97, 200.59,
+    204.38, 207.2, 208.98, 209.0, 210.0, 222.0, 223.0, 226.0, 227.0, 232.04,
+    231.04, 238.03, 237.0, 244.0, 243.0, 247.0, 247.0, 251.0, 252.0, 257.0,
+    258.0, 259.0, 266.0, 267.0, 268.0, 269.0, 270.0, 277.0, 278.0, 281.0,
+    282.0, 285.0, 286.0, 289.0, 290.0, 293.0, 294.0, 294.0
+])
+
+COVALENT_RADII = np.concatenate([np.array([
+    0.0, 0.31, 0.28, 1.28, 0.96, 0.84, 0.76, 0.71, 0.66, 0.57, 0.58,
+    1.66, 1.41, 1.21, 1.11, 1.07, 1.05, 1.02, 1.06, 2.03, 1.76,
+    1.70, 1.60, 1.53, 1.39, 1.39, 1.32, 1.26, 1.24, 1.32, 1.22,
+    1.22, 1.20, 1.19, 1.20, 1.20, 1.16, 2.20, 1.95, 1.90, 1.75,
+    1.64, 1.54, 1.47, 1.46, 1.42, 1.39, 1.45, 1.44, 1.42, 1.39,
+    1.39, 1.38, 1.39, 1.40, 2.44, 2.15, 2.07, 2.04, 2.03, 2.01,
+    1.99, 1.98, 1.98, 1.96, 1.94, 1.92, 1.92, 1.89, 1.90, 1.87,
+    1.87, 1.75, 1.70, 1.62, 1.51, 1.44, 1.41, 1.36, 1.36, 1.32,
+    1.45, 1.46, 1.48, 1.40, 1.50, 1.50, 2.60, 2.21, 2.15, 2.06,
+    2.00, 1.96, 1.90, 1.87, 1.80, 1.69
+]), np.full(118 - 96, np.nan)])
+
+_NUMBER_OF_SYMBOL = {symbol.lower(): number for number, symbol in enumerate(SYMBOLS)}
+# Leading letters of an element label, e.g. "C" of "C12" or "Cl" of "Cl_a"
+_SYMBOL_REGEX = re.compile(r'[A-Za-z]+')
+
+
+def _symbol_to_number(symbol):
+    match = _SYMBOL_REGEX.match(str(symbol).strip())
+    if match is None:
+        return -1
+    return _NUMBER_OF_SYMBOL.get(match.group(0).lower(), -1)
+
+
+def numbers_from_symbols(symbols):
+    """
+    Return the atomic numbers of `symbols` as an int array, -1 for unknown symbols.
+
+    Symbols are matched case-insensitively on their leading letters, so "CL",
+    "Cl" and "Cl3" all give 17. Every distinct symbol is looked up once.
+    """
+    symbols = np.asarray(symbols, dtype=object)
+    if symbols.size == 0:
+        return np.zeros(symbols.shape, dtype=int)
+    uniques, inverse = np.unique(symbols.astype(str), return_inverse=True)
+    numbers = np.array([_symbol_to_number(symbol) for symbol in uniques], dtype=int)
+    return numbers[inverse].reshape(symbols.shape)
+
+
+def symbols_from_numbers(numbers):
+    """
+    Return the element symbols of the atomic `numbers` as an object array;
+    numbers outside the table give ``El<number>``.
+    """
+    numbers = np.asarray(numbers, dtype=int)
+    known = (numbers >= 0) & (numbers < len(SYMBOLS))
+    symbols = SYMBOLS[np.where(known, numbers, 0)]
+    if not known.all():
+        symbols = symbols.copy()
+        symbols[~known] = [f"El{number}" for number in numbers[~known]]
+    return symbols
+
+
+def _lookup(table, numbers):
+    numbers = np.asarray(numbers, dtype=int)
+    known = (numbers >= 0) & (numbers < len(table))
+    return np.where(known, table[np.where(known, numbers, 0)], np.nan)
+
+
+def masses(numbers):
+    """Atomic masses in u of the atomic `numbers`, NaN for unknown numbers."""
+    return _lookup(MASSES, numbers)
+
+
+def covalent_radii(numbers):
+    """Covalent radii in Å of the atomic `numbers`, NaN for unknown numbers."""
+    return _lookup(COVALENT_RADII, numbers)
@@ -0,0 +1,171 @@
+import gzip
+import io
+import lzma
+from pathlib import Path
+
+# Compression formats by file suffix and by the magic bytes the file starts with
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def _zstd_reader(fileobj):
+    try:
+        from compression import zstd
+        return zstd.ZstdFile(fileobj)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Reading .zst files requires Python 3.14 or the 'zstandard' package")
+    return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True)
+
+
+def _zstd_writer(file_path, mode):
+    try:
+        from compression import zstd
+        return zstd.open(file_path, mode, newline='')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Writing .zst files requires Python 3.14 or the 'zstandard' package")
+    return zstandard.open(file_path, mode, newline='')
+
+
+def _decompressing_reader(fileobj, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj)
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj)
+    if compression == "zstd":
+        return _zstd_reader(fileobj)
+    return fileobj
+
+
+def detect_compression(file_path, head=None):
+    """
+    Return the compression format of a file ("gzip", "xz", "zstd") or None.
+
+    The suffix of `file_path` is checked first; otherwise the magic bytes at the start
+    of the file (or of `head`, if given) decide.
+    """
+    compression = COMPRESSION_SUFFIXES.get(Path(file_path).suffix.lower())
+    if compression:
+        return compression
+    if head is None:
+        try:
+            with Path(file_path).open('rb') as f:
+                head = f.read(6)
+        except OSError:
+            return None
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def strip_compression_suffix(file_path):
+    """
+    Return `file_path` without a trailing compression suffix ("a.out.gz" -> "a.out").
+    """
+    path = str(file_path)
+    for suffix in COMPRESSION_SUFFIXES:
+        if path.lower().endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def open_text_output(file_path, append=False, compression=None):
+    """
+    Open an output file for writing text, compressed with `compression` ("gzip" or
+    "zstd"), or as given by the suffix of `file_path` if `compression` is None.
+    With `append`, text is added to an existing file; compressed files then get a
+    new gzip member or zstd frame, which readers decompress as one stream.
+    """
+    mode = 'at' if append else 'wt'
+    if compression is None:
+        compression = COMPRESSION_SUFFIXES.get(Path(file_path).suffix.lower())
+    if compression == "gzip":
+        return gzip.open(file_path, mode, newline='')
+    if compression == "zstd":
+        return _zstd_writer(file_path, mode)
+    if compression == "xz":
+        return lzma.open(file_path, mode, newline='')
+    if compression is not None:
+        raise ValueError(f"{file_path}: Unknown compression '{compression}'")
+    return Path(file_path).open(mode[0], newline='')
+
+
+def open_binary(file_path):
+    """
+    Open `file_path` for reading bytes, decompressing it on the fly if it is compressed.
+    """
+    compression = detect_compression(file_path)
+    return _decompressing_reader(Path(file_path).open('rb'), compression)
+
+
+def open_text(file_path, data=None):
+    """
+    Open an input file for reading text line by line.
+
+    Compressed files (.gz, .xz, .zst, or detected by their magic bytes) are
+    decompressed while reading. If `data` is given (the file's content as bytes or
+    str, e.g. read ahead by a `qmanalysis.prefetch.Prefetcher`), it is used instead
+    of reading `file_path`.
+    """
+    if data is None:
+        if detect_compression(file_path) is None:
+            return Path(file_path).open('r')
+        return io.TextIOWrapper(open_binary(file_path))
+    if isinstance(data, str):
+        return io.StringIO(data, newline=None)
+    compression = detect_compression(file_path, head=data[:6])
+    return io.TextIOWrapper(_decompressing_reader(io.BytesIO(data), compression))
+
+
+# How readers store the raw_data column: "lazy" stores a RawText, "eager" the text
+RAW_DATA_MODES = ("lazy", "eager")
+
+
+class RawText:
+    """
+    Text of an input file, or of the byte range `start`:`stop` of it, read from disk
+    only when it is needed. Readers store it in the ``raw_data`` column instead of
+    the text itself; ``str(raw_text)`` returns the text, with line endings
+    translated to ``\n`` like the text the readers parse.
+    """
+
+    __slots__ = ("file_path", "start", "stop")
+
+    def __init__(self, file_path, start=0, stop=None):
+        self.file_path = file_path
+        self.start = start
+        self.stop = stop
+
+    def read(self):
+        with open_binary(self.file_path) as f:
+            if self.start:
+                f.seek(self.start)
+            data = f.read() if self.stop is None else f.read(self.stop - self.start)
+        return data.decode(errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+    def __str__(self):
+        return self.read()
+
+    def __repr__(self):
+        return f"RawText({str(self.file_path)!r}, {self.start}, {self.stop})"
+
+
+def materialize_raw_text(value):
+    """
+    Return the text of `value` if it is a RawText, otherwise `value` unchanged.
+    """
+    return value.read() if isinstance(value, RawText) else value
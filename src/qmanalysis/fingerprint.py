@@ -0,0 +1,94 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from qmanalysis import elements
+
+# Distances are rounded to multiples of this (Å) before hashing
+DEFAULT_TOLERANCE = 0.01
+# Upper bound for the distance matrices held at once while fingerprinting
+FINGERPRINT_CHUNK_BYTES = 64 * 1024 ** 2
+# Principal moments closer than this (relative to the largest) count as equal,
+# and chirality products smaller than this (relative to their magnitude) as zero
+CHIRALITY_TOLERANCE = 1e-3
+
+
+def _digest(numbers, quantized, chirality):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(numbers.tobytes())
+    digest.update(b"|")
+    digest.update(quantized.tobytes())
+    digest.update(b"|")
+    digest.update(int(chirality).to_bytes(1, "little", signed=True))
+    return digest.hexdigest()
+
+
+def chirality_signs(xyz, numbers):
+    """
+    Return the handedness of every structure in the (frames, atoms, 3) `xyz` as
+    +1 or -1, or 0 if it cannot be told apart from its mirror image this way.
+
+    The atoms, weighted by atomic number, are put into their right-handed
+    principal axes frame, where the sign of the weighted sum of ``x * y * z``
+    does not change under rotation or renumbering but flips under reflection.
+    Achiral structures with a mirror plane or an inversion centre give 0.
+    Structures with two equal principal moments (linear molecules, symmetric
+    tops) have no unique axes and also give 0, so their enantiomers are not
+    told apart.
+    """
+    weights = np.maximum(numbers, 1).astype(float)
+    total = weights.sum(axis=1)[:, None, None]
+    centred = xyz - (weights[:, :, None] * xyz).sum(axis=1, keepdims=True) / total
+    weighted = weights[:, :, None] * centred
+    second = np.einsum("fni,fnj->fij", weighted, centred)
+    inertia = np.trace(second, axis1=1, axis2=2)[:, None, None] * np.eye(3) - second
+    moments, axes = np.linalg.eigh(inertia)
+    # Right-handed axes; the remaining sign choices are rotations by 180°
+    axes[:, :, 2] *= np.sign(np.linalg.det(axes))[:, None]
+    product = np.prod(np.einsum("fni,fij->fnj", centred, axes), axis=2)
+    chirality = (weights * product).sum(axis=1)
+    magnitude = (weights * np.abs(product)).sum(axis=1)
+    gaps = np.diff(moments, axis=1).min(axis=1)
+    distinct = gaps > CHIRALITY_TOLERANCE * np.maximum(moments[:, 2], 1e-12)
+    chiral = distinct & (np.abs(chirality) > CHIRALITY_TOLERANCE * magnitude)
+    return np.where(chiral, np.sign(chirality), 0).astype(np.int8)
+
+
+def geometry_fingerprints(atom_data, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return a fingerprint for every frame of `atom_data` as a Series of hex digests
+    indexed like FrameData.
+
+    The fingerprint hashes the sorted atomic numbers and the sorted interatomic
+    distances rounded to multiples of `tolerance`, so it does not change when a
+    structure is translated, rotated or its atoms are renumbered. Geometries that
+    differ by less than `tolerance` usually get the same fingerprint, except when a
+    distance lies close to a rounding boundary. Distances alone are the same for
+    both enantiomers of a chiral structure, so the fingerprint also hashes the
+    handedness from chirality_signs.
+    """
+    df = atom_data.dataframe
+    frame_ids, frames = df.index.droplevel("atom_index").factorize()
+    frames.names = df.index.names[:-1]
+    order = np.argsort(frame_ids, kind="stable")
+    sizes = np.bincount(frame_ids, minlength=len(frames))
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    numbers = elements.numbers_from_symbols(df["element"].to_numpy())[order]
+    coords = df[["x", "y", "z"]].to_numpy(dtype=float)[order]
+    fingerprints = np.empty(len(frames), dtype=object)
+    # Frames with the same number of atoms are fingerprinted together
+    for n_atoms in np.unique(sizes):
+        group = np.flatnonzero(sizes == n_atoms)
+        upper = np.triu_indices(n_atoms, k=1)
+        # Differences (3 values) and distances (1) of every atom pair
+        step = max(1, FINGERPRINT_CHUNK_BYTES // max(1, n_atoms * n_atoms * 32))
+        for start in range(0, len(group), step):
+            chunk = group[start:start + step]
+            atoms = bounds[chunk][:, None] + np.arange(n_atoms)
+            xyz = coords[atoms]
+            distances = np.linalg.norm(xyz[:, :, None] - xyz[:, None], axis=-1)[:, upper[0], upper[1]]
+            quantized = np.sort(np.rint(distances / tolerance).astype(np.int64), axis=1)
+            sorted_numbers = np.sort(numbers[atoms], axis=1).astype(np.int64)
+            signs = chirality_signs(xyz, numbers[atoms])
+            for frame, frame_numbers, frame_distances, sign in zip(chunk, sorted_numbers, quantized, signs):
+                fingerprints[frame] = _digest(frame_numbers, frame_distances, sign)
+    return pd.Series(fingerprints, index=frames, name="fingerprint")
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from qmanalysis.fileopener import materialize_raw_text, open_text_output
+
+# Number of frames converted and written at a time by the CSV exporters
+CSV_CHUNK_ROWS = 10000
+
+
+def tuple_labels(index):
+    """
+    Return the rows of `index` as ``str(tuple)`` labels, e.g. ``('a', 'a.xyz', nan)``.
+
+    The repr of every distinct level value is computed once and the labels are put
+    together from the level codes, instead of building a tuple per row.
+    """
+    index = index.remove_unused_levels()
+    labels = None
+    for level_num, level in enumerate(index.levels):
+        # Code -1 is a missing value, shown as nan like in a tuple of the reset index
+        reprs = np.array([repr(value) for value in level] + ["nan"], dtype=object)
+        part = reprs[index.codes[level_num]]
+        labels = part if labels is None else labels + ", " + part
+    if labels is None:
+        return np.array([], dtype=object)
+    if index.nlevels == 1:
+        labels = labels + ","
+    return "(" + labels + ")"
+
+
+class FrameDataExporter:
+    def __init__(self, frame_data, chunk_rows=CSV_CHUNK_ROWS):
+        self.frame_data = frame_data
+        self.chunk_rows = chunk_rows
+
+    def _constants(self, df):
+        # Global constants are kept as scalars and only written out as columns here
+        return {name: value for name, value in getattr(self.frame_data, "constants", {}).items()
+                if name not in df.columns}
+
+    def _frame_with_constants(self):
+        df = self.frame_data.dataframe
+        return df.assign(**self._constants(df))
+
+    @staticmethod
+    def _read_raw_data(df):
+        # raw_data holds RawText objects unless files were read with raw_data: eager
+        if 'raw_data' in df.columns:
+            df = df.assign(raw_data=df['raw_data'].map(materialize_raw_text))
+        return df
+
+    def _iter_chunks(self, include_raw_data):
+        """
+        Yield the frames in slices of at most `chunk_rows` rows with the global
+        constants added and raw_data read or dropped. Only one slice is copied at a
+        time.
+        """
+        df = self.frame_data.dataframe
+        constants = self._constants(df)
+        columns = [col for col in df.columns
+                   if include_raw_data or col != 'raw_data']
+        for start in range(0, max(len(df), 1), self.chunk_rows):
+            chunk = df.iloc[start:start + self.chunk_rows][columns]
+            yield self._read_raw_data(chunk.assign(**constants))
+
+    def export_csv_tuples(self, file_path, include_raw_data=False, append=False, compression=None):
+        with open_text_output(file_path, append=append, compression=compression) as f:
+            for i, chunk in enumerate(self._iter_chunks(include_raw_data)):
+                label = tuple_labels(chunk.index)
+                # The label is written before and after the value columns
+                chunk = pd.concat([pd.DataFrame({'label': label}, index=chunk.index), chunk,
+                                   pd.DataFrame({'label': label}, index=chunk.index)], axis=1)
+                chunk.to_csv(f, index=False, header=(i == 0 and not append))
+
+    def export_csv_multiindex(self, file_path, include_raw_data=False, append=False, compression=None):
+        with open_text_output(file_path, append=append, compression=compression) as f:
+            for i, chunk in enumerate(self._iter_chunks(include_raw_data)):
+                chunk.to_csv(f, header=(i == 0 and not append))
+
+    def _frame_sheet_chunks(self, include_raw_data, multiindex):
+        for chunk in self._iter_chunks(include_raw_data):
+            if multiindex:
+                yield chunk.reset_index()
+            else:
+                label = tuple_labels(chunk.index)
+                yield pd.concat([pd.DataFrame({'label': label}, index=chunk.index), chunk,
+                                 pd.DataFrame({'label': label}, index=chunk.index)], axis=1)
+
+    def export_xls_tuples(self, file_path, include_raw_data=False):
+        self.export_workbook(file_path, include_raw_data=include_raw_data)
+
+    def export_xls_multiindex(self, file_path, include_raw_data=False):
+        self.export_workbook(
+            file_path, multiindex=True, include_raw_data=include_raw_data)
+
+    def export_workbook(self, file_path, sheets=("frames",), atom_data=None, measurements=None,
+                        multiindex=False, include_raw_data=False):
+        """
+        Write an Excel workbook with one sheet per entry of `sheets`:
+
+        - ``frames``: the frame data, like the CSV outputs
+        - ``atoms``: the coordinates and labels of every atom in `atom_data`
+        - ``measurements``: the measurement definitions of the YAML ``measurements``
+          section given as `measurements`
+
+        Rows are streamed into a write-only workbook chunk by chunk, so memory does
+        not grow with the number of frames.
+        """
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        for sheet in sheets:
+            if sheet == "frames":
+                chunks = self._frame_sheet_chunks(include_raw_data, multiindex)
+            elif sheet == "atoms":
+                if atom_data is None:
+                    print(f"{file_path}: No atom data available, sheet 'atoms' is not written")
+                    continue
+                df = atom_data.dataframe
+                chunks = (df.iloc[start:start + self.chunk_rows].reset_index()
+                          for start in range(0, max(len(df), 1), self.chunk_rows))
+            elif sheet == "measurements":
+                chunks = [measurement_definitions(measurements or {})]
+            else:
+                raise ValueError(
+                    f"{file_path}: Unknown sheet '{sheet}', expected frames, atoms or measurements")
+            _write_sheet(workbook.create_sheet(sheet), chunks)
+        workbook.save(file_path)
+
+
+def measurement_definitions(measurements):
+    """
+    Return the YAML ``measurements`` section as a table with one row per measurement.
+    """
+    rows = [{"type": kind, **definition}
+            for kind, definitions in measurements.items() for definition in definitions or []]
+    return pd.DataFrame(rows, columns=None if rows else ["type", "name"])
+
+
+def _excel_values(column):
+    """
+    Return the values of `column` as an object array openpyxl can write: missing
+    values become None and anything that is not a number or string its str().
+    """
+    original = column.to_numpy(dtype=object)
+    values = original.copy()
+    if column.dtype == object:
+        values[:] = [value if isinstance(value, (str, int, float)) else
+                     value.item() if isinstance(value, np.generic) else str(value)
+                     for value in original]
+    # Element-wise, so tuples and other containers are not treated as missing
+    missing = np.fromiter((value is None or (np.ndim(value) == 0 and pd.isna(value))
+                           for value in original), dtype=bool, count=len(original))
+    values[missing] = None
+    return values
+
+
+def _write_sheet(worksheet, chunks):
+    """
+    Append the header of the first chunk and the rows of all chunks to `worksheet`.
+    """
+    header_written = False
+    for chunk in chunks:
+        if not header_written:
+            worksheet.append([str(col) for col in chunk.columns])
+            header_written = True
+        columns = [_excel_values(chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+        for row in zip(*columns):
+            worksheet.append(row)
@@ -1,95 +1,326 @@
+import io
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
+from qmanalysis.elements import symbols_from_numbers
+from qmanalysis.fileopener import RAW_DATA_MODES, RawText, detect_compression, open_text
+
+
+ORIENTATION_REGEX = re.compile(r'(Standard|Input|Z-Matrix) orientation:')
+DASH_REGEX = re.compile(r'\s*-{5,}')
+ARCHIVE_START_REGEX = re.compile(r'^\s{1}1\\1\\')
+SCF_DONE_REGEX = re.compile(r'SCF Done:\s+E\(\S+\)\s+=\s+(\S+)')
+# Rows of the normal mode tables of a frequency job; the HPModes table ("Frequencies ---")
+# is skipped as the standard table repeats its values
+MODE_ROW_REGEX = re.compile(r'^\s*(Frequencies|Red\. masses|IR Inten|Raman Activ)\s+--\s(.*)')
+HARMONIC_HEADER_REGEX = re.compile(r'^\s*Harmonic frequencies \(cm\*\*-1\)')
+SYMMETRY_NUMBER_REGEX = re.compile(r'Rotational symmetry number\s+(\d+)')
+
+# Frame columns holding the arrays of the normal mode table rows, one value per mode
+MODE_COLUMNS = {"Frequencies": "frequencies", "Red. masses": "reduced_masses",
+                "IR Inten": "ir_intensities", "Raman Activ": "raman_activities"}
+
+# Reading modes: "full" scans the whole log, "archive_only" only its end
+READ_MODES = ("full", "archive_only")
+# First block read from the end of the file in archive_only mode
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def is_plausible(val):
+    # Check for plausible float values
+    if val is pd.NA or val is None:
+        return False
+    try:
+        fval = float(val)
+        if not (-1e10 < fval < 1e10):
+            return False
+        if str(val).lower() in ['nan', 'inf', '-inf', '']:
+            return False
+        if re.match(r'.*e-$', str(val)):
+            return False
+        return True
+    except Exception:
+        return False
+
+
+def parse_archive_fields(split_block):
+    """
+    Map the ``key=value`` fields of an archive block, split on backslashes, to their
+    values. Keys are lower case; the first occurrence of a key wins.
+    """
+    fields = {}
+    for token in split_block:
+        key, sep, value = token.partition('=')
+        if sep:
+            fields.setdefault(key.strip().lower(), value.strip())
+    return fields
+
+
+def convert_archive_value(value):
+    """
+    Convert an archive field value to a float, a tuple of floats for comma separated
+    arrays (e.g. Quadrupole), or keep it as string (e.g. Version, PG).
+    """
+    if value is None:
+        return pd.NA
+    parts = value.replace(' ', '').split(',')
+    if all(is_plausible(part) for part in parts):
+        floats = tuple(float(part) for part in parts)
+        return floats[0] if len(floats) == 1 else floats
+    return value
+
+
+def parse_orientation_table(block_lines):
+    """
+    Return the atomic numbers and an (n, 3) array of the coordinates in the lines of
+    one orientation block, starting with its header line.
+    """
+    numbers = []
+    coords = []
+    for line in block_lines[5:]:
+        if DASH_REGEX.match(line) or not line.strip():
+            break
+        tokens = line.split()
+        if len(tokens) < 6:
+            continue
+        try:
+            atomic_num = int(tokens[1])
+            xyz = (float(tokens[3]), float(tokens[4]), float(tokens[5]))
+        except Exception:
+            continue
+        numbers.append(atomic_num)
+        coords.append(xyz)
+    return numbers, np.array(coords, dtype=float).reshape(-1, 3)
+
+
+def parse_mode_values(text):
+    """
+    Return the numbers of one normal mode table row as floats; fields Gaussian
+    could not print (``****``) become NaN.
+    """
+    values = []
+    for token in text.split():
+        try:
+            values.append(float(token))
+        except ValueError:
+            values.append(np.nan)
+    return values
+
+
+def parse_frame_selection(frames):
+    """
+    Turn the ``frames`` option into a slice over the geometries of a log, or None
+    for the default ``last``. Accepts ``all`` or ``start:stop:stride``. A bare
+    integer is rejected, as it could mean a single geometry or the first ones.
+    """
+    if frames is None or frames == "last":
+        return None
+    if frames == "all":
+        return slice(None)
+    parts = str(frames).split(':')
+    if len(parts) == 1:
+        raise ValueError(
+            f"Invalid frames selection '{frames}', use 'start:stop' (e.g. '5:6' for a single geometry)")
+    if len(parts) > 3:
+        raise ValueError(f"Invalid frames selection '{frames}'")
+    try:
+        return slice(*(int(part) if part.strip() else None for part in parts))
+    except ValueError:
+        raise ValueError(
+            f"Invalid frames selection '{frames}', expected 'last', 'all' or 'start:stop:stride'")
 
 
 class GaussianOutFile:
-    def __init__(self, atom_data, frame_data, file_path, file_name=None, timestep_name=None):
+    def __init__(self, atom_data, frame_data, file_path, file_name=None, timestep_name=None, data=None,
+                 mode="full", archive_fields=None, frames="last", raw_data="lazy"):
         self.atom_data = atom_data
         self.frame_data = frame_data
         self.file_path = file_path
         self.path = Path(self.file_path)
         self.file_name = file_name if file_name else self.path.name
         self.timestep_name = timestep_name
+        # Content of the file if it was already read, e.g. by a Prefetcher
+        self.data = data
+        if mode not in READ_MODES:
+            raise ValueError(
+                f"{self.file_path}: Unknown mode '{mode}', expected one of {', '.join(READ_MODES)}")
+        self.mode = mode
+        if raw_data not in RAW_DATA_MODES:
+            raise ValueError(
+                f"{self.file_path}: Unknown raw_data '{raw_data}', expected one of {', '.join(RAW_DATA_MODES)}")
+        self.raw_data = raw_data
+        # Archive keys stored as extra columns in addition to the standard ones
+        self.archive_fields = list(archive_fields) if archive_fields else []
+        # Geometries read as separate timesteps, None for only the last one
+        try:
+            self.frames = parse_frame_selection(frames)
+        except ValueError as e:
+            raise ValueError(f"{self.file_path}: {e}")
+        if self.frames is not None and mode == "archive_only":
+            raise ValueError(
+                f"{self.file_path}: frames '{frames}' needs the whole log and cannot be used with mode archive_only")
         self._read_gaussian_out()
 
-    def _read_gaussian_out(self):
-        # --- Optimized single-pass reading ---
-        orientation_regex = re.compile(
-            r'(Standard|Input|Z-Matrix) orientation:')
-        dash_regex = re.compile(r'-{5,}')
-        archive_start_regex = re.compile(r'^\s{1}1\\1\\')
+    @staticmethod
+    def _scan_lines(lines, collect_steps=False, keep_lines=True):
+        """
+        Return all lines (an empty list unless `keep_lines`), the lines of the last
+        orientation block, the lines of the last archive block in `lines` and the
+        normal modes of the last frequency table as a dict of MODE_COLUMNS names to
+        lists, plus ``symmetry_number`` if it was printed.
+
+        With `collect_steps`, also return every orientation block as a
+        ``[kind, atomic numbers, coordinates, SCF energy]`` list. Blocks are parsed
+        into arrays as soon as they end, so their lines are not kept.
+        """
         raw_lines = []
         last_orientation_lines = []
         last_archive_lines = []
+        steps = []
+        modes = {}
+        # Steps before this index already have their SCF energy
+        energy_pending_from = 0
         in_orientation = False
         in_archive = False
         orientation_dash_found = False
-        with self.path.open('r') as f:
-            for line in f:
-                line = line.rstrip('\n')
+        # Set once the header of a normal mode table was seen
+        in_modes = False
+
+        def finish_orientation():
+            kind = ORIENTATION_REGEX.search(last_orientation_lines[0]).group(1)
+            numbers, coords = parse_orientation_table(last_orientation_lines)
+            steps.append([kind, numbers, coords, np.nan])
+
+        for line in lines:
+            line = line.rstrip('\n')
+            if keep_lines:
                 raw_lines.append(line)
-                # Orientation block detection
-                if orientation_regex.search(line):
-                    in_orientation = True
-                    last_orientation_lines = [line]
-                    orientation_dash_found = False
-                    continue
-                if in_orientation:
-                    last_orientation_lines.append(line)
-                    if dash_regex.match(line):
-                        orientation_dash_found = True
-                    elif orientation_dash_found and not line.strip():
-                        in_orientation = False
-                # Archive block detection
-                if archive_start_regex.match(line):
-                    in_archive = True
-                    last_archive_lines = [line]
-                    continue
-                if in_archive:
-                    last_archive_lines.append(line)
-                    if line.strip() == '':
-                        in_archive = False
-        # --- Atom block processing ---
-        atoms = []
-        # Find atom table start (5 lines after orientation header)
-        atom_table_start = None
-        for i, line in enumerate(last_orientation_lines):
-            if orientation_regex.search(line):
-                atom_table_start = i + 5
-                break
-        if atom_table_start is None:
-            raise ValueError(f"{self.file_path}: No orientation block found.")
-        for line in last_orientation_lines[atom_table_start:]:
-            if dash_regex.match(line) or not line.strip():
-                break
-            tokens = line.split()
-            if len(tokens) < 6:
+            # Orientation block detection
+            if ORIENTATION_REGEX.search(line):
+                if collect_steps and in_orientation:
+                    finish_orientation()
+                in_orientation = True
+                last_orientation_lines = [line]
+                orientation_dash_found = False
                 continue
-            try:
-                atomic_num = int(tokens[1])
-                x, y, z = float(tokens[3]), float(tokens[4]), float(tokens[5])
-            except Exception:
+            if in_orientation:
+                last_orientation_lines.append(line)
+                if DASH_REGEX.match(line):
+                    orientation_dash_found = True
+                elif orientation_dash_found and not line.strip():
+                    in_orientation = False
+                    if collect_steps:
+                        finish_orientation()
+            if collect_steps:
+                scf_match = SCF_DONE_REGEX.search(line)
+                if scf_match:
+                    for step in steps[energy_pending_from:]:
+                        step[3] = float(scf_match.group(1))
+                    energy_pending_from = len(steps)
+            # Normal modes, three or five per table row, only after a frequency header;
+            # the substring checks skip the regular expressions for most lines
+            mode_match = in_modes and " -- " in line and MODE_ROW_REGEX.match(line)
+            if mode_match:
+                modes.setdefault(MODE_COLUMNS[mode_match.group(1)], []).extend(
+                    parse_mode_values(mode_match.group(2)))
+            elif "Harmonic frequencies" in line and HARMONIC_HEADER_REGEX.match(line):
+                # Only the last frequency calculation is kept
+                modes = {}
+                in_modes = True
+            elif "symmetry number" in line:
+                symmetry_match = SYMMETRY_NUMBER_REGEX.search(line)
+                if symmetry_match:
+                    modes["symmetry_number"] = int(symmetry_match.group(1))
+            # Archive block detection
+            if ARCHIVE_START_REGEX.match(line):
+                in_archive = True
+                last_archive_lines = [line]
                 continue
-            element = self._atomic_number_to_symbol(atomic_num)
-            atom_index = len(atoms) + 1
-            alias = str(atom_index)
-            charge = None
-            atoms.append((element, x, y, z, alias, charge))
-            self.atom_data.dataframe.loc[(self.file_name, self.file_path, self.timestep_name, atom_index)] = {
-                "element": element,
-                "x": x,
-                "y": y,
-                "z": z,
-                "alias": alias,
-                "charge": charge
-            }
+            if in_archive:
+                last_archive_lines.append(line)
+                if line.strip() == '':
+                    in_archive = False
+        if collect_steps:
+            if in_orientation:
+                finish_orientation()
+            return raw_lines, last_orientation_lines, last_archive_lines, modes, steps
+        return raw_lines, last_orientation_lines, last_archive_lines, modes
+
+    def _open_seekable(self):
+        """
+        Return an uncompressed binary file object that can be read from the end, or
+        None if the input is compressed.
+        """
+        if self.data is None:
+            if detect_compression(self.path) is not None:
+                return None
+            return self.path.open('rb')
+        data = self.data.encode() if isinstance(self.data, str) else self.data
+        if detect_compression(self.path, head=data[:6]) is not None:
+            return None
+        return io.BytesIO(data)
+
+    def _read_tail_lines(self, f):
+        """
+        Read `f` backwards in growing blocks until the read part contains both an
+        orientation header and an archive block start. Return its lines and the byte
+        range they were read from.
+        """
+        f.seek(0, io.SEEK_END)
+        size = f.tell()
+        block_size = TAIL_BLOCK_SIZE
+        while True:
+            start = max(0, size - block_size)
+            f.seek(start)
+            data = f.read(size - start)
+            if start > 0:
+                # The first line may start before the block
+                cut = data.find(b'\n') + 1
+                data = data[cut:]
+                start += cut
+            lines = data.decode(errors='replace').splitlines()
+            if start == 0 or (any(ARCHIVE_START_REGEX.match(line) for line in lines)
+                              and any(ORIENTATION_REGEX.search(line) for line in lines)):
+                return lines, start, size
+            block_size *= 2
+
+    def _read_gaussian_out(self):
+        f = self._open_seekable() if self.mode == "archive_only" else None
+        eager = self.raw_data == "eager"
+        if f is not None:
+            # Only the end of the log is read, so raw_data covers the end only
+            with f:
+                tail_lines, start, stop = self._read_tail_lines(f)
+            _, last_orientation_lines, last_archive_lines, modes = self._scan_lines(
+                tail_lines, keep_lines=False)
+            raw_data = '\n'.join(tail_lines) if eager else RawText(
+                self.file_path, start, stop)
+        else:
+            # Compressed files cannot be read backwards and are scanned fully
+            with open_text(self.path, self.data) as f:
+                if self.frames is None:
+                    raw_lines, last_orientation_lines, last_archive_lines, modes = self._scan_lines(
+                        f, keep_lines=eager)
+                else:
+                    raw_lines, last_orientation_lines, last_archive_lines, modes, steps = self._scan_lines(
+                        f, collect_steps=True, keep_lines=eager)
+            raw_data = '\n'.join(raw_lines) if eager else RawText(self.file_path)
+        # --- Atom block processing ---
+        if self.frames is not None:
+            # All geometries are added as timesteps after the archive block is read
+            if not steps:
+                raise ValueError(
+                    f"{self.file_path}: No orientation block found.")
+            steps = self._select_steps(steps)
+        else:
+            self._add_last_orientation(last_orientation_lines)
         # --- Archive block processing ---
         archive_block = ''
         archive_start = None
         archive_end = None
         for i, line in enumerate(last_archive_lines):
-            if archive_start_regex.match(line):
+            if ARCHIVE_START_REGEX.match(line):
                 archive_start = i
             if archive_start is not None and line.strip() == '':
                 archive_end = i
@@ -101,11 +332,9 @@ class GaussianOutFile:
             split_block = archive_block.split('\\')
         else:
             split_block = []
+        # Tokenized once; values are looked up by key below
+        archive_values = parse_archive_fields(split_block)
 
-        # Process archive block fields
-        archive_fields = []
-        for line in last_archive_lines:
-            archive_fields.extend(line.split('\\'))
         # Extract comment and charge/multiplicity from split_block
         file_comment = split_block[13] if len(split_block) > 13 else None
         charge_multiplicity = split_block[15] if len(
@@ -119,27 +348,11 @@ class GaussianOutFile:
         else:
             charge, multiplicity = (pd.NA, pd.NA)
 
-        def is_plausible(val, key=None):
-            # Check for plausible float values
-            if val is pd.NA or val is None:
-                return False
-            try:
-                fval = float(val)
-                if not (-1e10 < fval < 1e10):
-                    return False
-                if str(val).lower() in ['nan', 'inf', '-inf', '']:
-                    return False
-                if re.match(r'.*e-$', str(val)):
-                    return False
-                return True
-            except Exception:
-                return False
-
-        def extract_archive_value(key, block, is_tuple=False):
-            m = re.search(rf'{key}=([^\\]*)', block, re.IGNORECASE)
-            if not m:
+        def extract_archive_value(key, is_tuple=False):
+            val = archive_values.get(key.lower())
+            if val is None:
                 return pd.NA if not is_tuple else (pd.NA, pd.NA, pd.NA)
-            val = m.group(1).replace('\n', '').replace(' ', '').strip()
+            val = val.replace(' ', '')
             if is_tuple:
                 vals = [v.strip() for v in val.split(',')]
                 tup = tuple(float(v) if is_plausible(v) else pd.NA for v in vals[:3]) if len(
@@ -147,7 +360,7 @@ class GaussianOutFile:
                 return tup
             try:
                 fval = float(val)
-                return fval if is_plausible(fval, key) else pd.NA
+                return fval if is_plausible(fval) else pd.NA
             except Exception:
                 return pd.NA
         # DEBUG: Print the archive block (commented out)
@@ -162,22 +375,22 @@ class GaussianOutFile:
         debug_print('Charge', charge)
         debug_print('Multiplicity', multiplicity)
 
-        zeropoint = extract_archive_value('ZeroPoint', archive_block)
+        zeropoint = extract_archive_value('ZeroPoint')
         debug_print('ZeroPoint', zeropoint)
-        zpe = extract_archive_value('ZPE', archive_block)
+        zpe = extract_archive_value('ZPE')
         debug_print('ZPE', zpe)
-        hf = extract_archive_value('HF', archive_block)
+        hf = extract_archive_value('HF')
         debug_print('HF', hf)
-        thermal = extract_archive_value('Thermal', archive_block)
+        thermal = extract_archive_value('Thermal')
         debug_print('Thermal', thermal)
-        rmsd = extract_archive_value('RMSD', archive_block)
+        rmsd = extract_archive_value('RMSD')
         debug_print('RMSD', rmsd)
-        rmsf = extract_archive_value('RMSF', archive_block)
+        rmsf = extract_archive_value('RMSF')
         debug_print('RMSF', rmsf)
-        dipole = extract_archive_value('Dipole', archive_block, is_tuple=True)
+        dipole = extract_archive_value('Dipole', is_tuple=True)
         dipole_x, dipole_y, dipole_z = dipole
         debug_print('Dipole', dipole)
-        nimag = extract_archive_value('NImag', archive_block)
+        nimag = extract_archive_value('NImag')
         # Store NImag as integer if possible
         try:
             nimag = int(
@@ -187,7 +400,7 @@ class GaussianOutFile:
         debug_print('NIMag', nimag)
         # Save to frame_data.dataframe
         row = {
-            "raw_data": '\n'.join(raw_lines),
+            "raw_data": raw_data,
             "energy": pd.NA,
             "zero-point energy": zeropoint,
             "file_comment": file_comment,
@@ -204,29 +417,124 @@ class GaussianOutFile:
             "dipole_z": dipole_z,
             "nimag": nimag
         }
+        # Optional archive fields (Version, State, PG, Quadrupole, ...) as extra columns
+        extra_cols = [key for key in self.archive_fields if key not in row]
+        for key in extra_cols:
+            row[key] = convert_archive_value(archive_values.get(key.lower()))
+        # Normal modes of a frequency job as one array per table row
+        mode_cols = [col for col in modes if col not in row]
+        for col in mode_cols:
+            row[col] = np.array(modes[col]) if col in MODE_COLUMNS.values() else modes[col]
+        extra_cols += mode_cols
         # print(
         #    f"Saving row for {self.file_name}, {self.file_path}, {self.timestep_name}: {row}")
 
         expected_cols = ["raw_data", "energy", "zero-point energy",
                          "file_comment", "charge", "multiplicity", "HF", "ZPE", "Thermal", "RMSD", "RMSF", "dipole", "dipole_x", "dipole_y", "dipole_z", "nimag"]
+        # Extra columns of files read before are kept
+        expected_cols += [col for col in self.frame_data.dataframe.columns
+                          if col not in expected_cols]
+        expected_cols += [col for col in extra_cols if col not in expected_cols]
         self.frame_data.dataframe = self.frame_data.dataframe.reindex(
             columns=expected_cols)
+        if self.frames is not None:
+            self._add_steps(steps, row)
+            return
         self.frame_data.dataframe.loc[(
             self.file_name, self.file_path, self.timestep_name)] = row
 
-    @staticmethod
-    def _atomic_number_to_symbol(num):
-        # Complete periodic table up to uranium (Z=92)
-        periodic_table = {
-            1: 'H', 2: 'He', 3: 'Li', 4: 'Be', 5: 'B', 6: 'C', 7: 'N', 8: 'O', 9: 'F', 10: 'Ne',
-            11: 'Na', 12: 'Mg', 13: 'Al', 14: 'Si', 15: 'P', 16: 'S', 17: 'Cl', 18: 'Ar', 19: 'K', 20: 'Ca',
-            21: 'Sc', 22: 'Ti', 23: 'V', 24: 'Cr', 25: 'Mn', 26: 'Fe', 27: 'Co', 28: 'Ni', 29: 'Cu', 30: 'Zn',
-            31: 'Ga', 32: 'Ge', 33: 'As', 34: 'Se', 35: 'Br', 36: 'Kr', 37: 'Rb', 38: 'Sr', 39: 'Y', 40: 'Zr',
-            41: 'Nb', 42: 'Mo', 43: 'Tc', 44: 'Ru', 45: 'Rh', 46: 'Pd', 47: 'Ag', 48: 'Cd', 49: 'In', 50: 'Sn',
-            51: 'Sb', 52: 'Te', 53: 'I', 54: 'Xe', 55: 'Cs', 56: 'Ba', 57: 'La', 58: 'Ce', 59: 'Pr', 60: 'Nd',
-            61: 'Pm', 62: 'Sm', 63: 'Eu', 64: 'Gd', 65: 'Tb', 66: 'Dy', 67: 'Ho', 68: 'Er', 69: 'Tm', 70: 'Yb',
-            71: 'Lu', 72: 'Hf', 73: 'Ta', 74: 'W', 75: 'Re', 76: 'Os', 77: 'Ir', 78: 'Pt', 79: 'Au', 80: 'Hg',
-            81: 'Tl', 82: 'Pb', 83: 'Bi', 84: 'Po', 85: 'At', 86: 'Rn', 87: 'Fr', 88: 'Ra', 89: 'Ac', 90: 'Th',
-            91: 'Pa', 92: 'U'
-        }
-        return periodic_table.get(num, f'El{num}')
+    def _add_last_orientation(self, last_orientation_lines):
+        """
+        Add the atoms of the last orientation block under this file's timestep.
+        """
+        atoms = []
+        # Find atom table start (5 lines after orientation header)
+        atom_table_start = None
+        for i, line in enumerate(last_orientation_lines):
+            if ORIENTATION_REGEX.search(line):
+                atom_table_start = i + 5
+                break
+        if atom_table_start is None:
+            raise ValueError(f"{self.file_path}: No orientation block found.")
+        for line in last_orientation_lines[atom_table_start:]:
+            if DASH_REGEX.match(line) or not line.strip():
+                break
+            tokens = line.split()
+            if len(tokens) < 6:
+                continue
+            try:
+                atomic_num = int(tokens[1])
+                x, y, z = float(tokens[3]), float(tokens[4]), float(tokens[5])
+            except Exception:
+                continue
+            element = symbols_from_numbers([atomic_num])[0]
+            atom_index = len(atoms) + 1
+            alias = str(atom_index)
+            charge = None
+            atoms.append((element, x, y, z, alias, charge))
+            self.atom_data.dataframe.loc[(self.file_name, self.file_path, self.timestep_name, atom_index)] = {
+                "element": element,
+                "x": x,
+                "y": y,
+                "z": z,
+                "alias": alias,
+                "charge": charge
+            }
+
+    def _select_steps(self, steps):
+        """
+        Keep one orientation kind (Standard if present, as Gaussian also prints the
+        Input orientation of every step), number the steps from 1 and apply the
+        frames selection. Returns a list of (step number, numbers, coords, energy).
+        """
+        kinds = {step[0] for step in steps}
+        kind = "Standard" if "Standard" in kinds else steps[0][0]
+        numbered = [(number, numbers, coords, energy) for number, (_, numbers, coords, energy)
+                    in enumerate((step for step in steps if step[0] == kind), start=1)]
+        self.last_step = len(numbered)
+        return numbered[self.frames]
+
+    def _step_name(self, number):
+        return f"{self.timestep_name}_step{number:04d}" if self.timestep_name else f"step{number:04d}"
+
+    def _add_steps(self, steps, row):
+        """
+        Add every selected geometry as its own timestep. Values from the archive block
+        describe the final geometry and are only set on its row; all rows get their
+        SCF energy as ``energy``.
+        """
+        if not steps:
+            return
+        archive_cols = [col for col in row
+                        if col not in ("raw_data", "energy", "file_comment", "charge", "multiplicity")]
+        names = [self._step_name(number) for number, _, _, _ in steps]
+        atom_counts = [len(numbers) for _, numbers, _, _ in steps]
+        atom_index = pd.MultiIndex.from_tuples(
+            [(self.file_name, self.file_path, name, i)
+             for name, count in zip(names, atom_counts) for i in range(1, count + 1)],
+            names=self.atom_data.dataframe.index.names)
+        numbers = np.concatenate([np.asarray(n, dtype=int) for _, n, _, _ in steps])
+        coords = np.concatenate([c for _, _, c, _ in steps])
+        atoms = pd.DataFrame({
+            "element": symbols_from_numbers(numbers),
+            "alias": [str(i) for count in atom_counts for i in range(1, count + 1)],
+            "charge": None,
+            "x": coords[:, 0],
+            "y": coords[:, 1],
+            "z": coords[:, 2],
+        }, index=atom_index)
+        rows = []
+        for number, _, _, energy in steps:
+            step_row = dict(row)
+            step_row["energy"] = energy
+            if number != self.last_step:
+                step_row.update({col: pd.NA for col in archive_cols})
+            rows.append(step_row)
+        frames = pd.DataFrame(rows, index=pd.MultiIndex.from_tuples(
+            [(self.file_name, self.file_path, name) for name in names],
+            names=self.frame_data.dataframe.index.names),
+            columns=self.frame_data.dataframe.columns)
+        self.atom_data.dataframe = pd.concat(
+            [df for df in (self.atom_data.dataframe, atoms) if not df.empty])
+        self.frame_data.dataframe = pd.concat(
+            [df for df in (self.frame_data.dataframe, frames) if not df.empty])
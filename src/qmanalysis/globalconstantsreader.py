@@ -16,6 +16,8 @@ class GlobalConstantsFile:
         self.df = read_df.set_index(
             "name").T.reset_index(drop=True)
         self.df.columns.name = None
+        # name -> value, as stored in FrameData.constants
+        self.constants = dict(zip(read_df["name"], read_df["value"]))
         # pivot(
         #  columns="name", values="value")
 
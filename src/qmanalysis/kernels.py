@@ -0,0 +1,267 @@
+"""
+Geometry and label layout kernels.
+
+Every kernel has a NumPy implementation and, if Numba is installed, a compiled
+loop that works without the O(n²) temporaries of the broadcasts. The Numba
+kernels are used automatically when Numba can be imported; set the environment
+variable ``QMANALYSIS_KERNELS`` to ``numpy`` or call ``set_backend("numpy")`` to
+use the NumPy kernels anyway. Numba kernels are compiled on first use.
+"""
+
+import os
+import numpy as np
+
+KERNEL_BACKENDS = ("numba", "numpy")
+
+_backend = None
+_numba_kernels = None
+
+
+def numba_available():
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def set_backend(name=None):
+    """
+    Select the kernel backend, ``"numba"`` or ``"numpy"``. None chooses
+    ``QMANALYSIS_KERNELS`` if it is set, else Numba if it is installed.
+    """
+    global _backend
+    if name is None:
+        name = os.environ.get("QMANALYSIS_KERNELS") or (
+            "numba" if numba_available() else "numpy")
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(
+            f"Unknown kernel backend '{name}', expected one of {', '.join(KERNEL_BACKENDS)}")
+    if name == "numba" and not numba_available():
+        raise ImportError("The numba kernel backend requires the 'numba' package")
+    _backend = name
+    return name
+
+
+def get_backend():
+    """Return the name of the kernel backend in use."""
+    return _backend if _backend is not None else set_backend()
+
+
+def _kernel(name):
+    if get_backend() == "numba":
+        return _compile_numba()[name]
+    return _NUMPY_KERNELS[name]
+
+
+def _as_points(points):
+    return np.ascontiguousarray(points, dtype=np.float64)
+
+
+# --- NumPy kernels ---
+
+def _normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def _plane_normals(a, b, c):
+    # Normal of the plane through a, b, c like Measure.plane_normal
+    return _normalize(np.cross(_normalize(c - b), _normalize(a - b)))
+
+
+def _distances_numpy(a, b):
+    return np.linalg.norm(a - b, axis=1)
+
+
+def _angles_numpy(a, b, c):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dot = np.einsum("ij,ij->i", _normalize(a - b), _normalize(c - b))
+        return np.degrees(np.arccos(np.clip(dot, -1.0, 1.0)))
+
+
+def _dihedrals_numpy(a, b, c, d):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dot = np.einsum("ij,ij->i", _plane_normals(a, b, c), _plane_normals(b, c, d))
+        return np.degrees(np.arccos(np.clip(dot, -1.0, 1.0)))
+
+
+def _pair_repulsion_numpy(points):
+    diff = points[:, np.newaxis, :] - points[np.newaxis, :, :]
+    # add eye to avoid zero division
+    dists = np.linalg.norm(diff, axis=-1) + np.eye(len(points))
+    mask = ~np.eye(len(points), dtype=bool)
+    return np.sum(1.0 / (dists[mask]**2 + 1e-9))
+
+
+def _center_repulsion_numpy(points, centers, strength):
+    total = np.zeros(len(points))
+    for cx, cy in centers:
+        d = np.sqrt((points[:, 0] - cx)**2 + (points[:, 1] - cy)**2)
+        total += strength / (d**6 + 1e-9)
+    return np.sum(total)
+
+
+def _prune_close_numpy(positions, threshold):
+    used = np.ones(len(positions), dtype=bool)
+    for i in range(len(positions)):
+        if used[i]:
+            close = np.linalg.norm(positions - positions[i], axis=1) < threshold
+            close[i] = False
+            used[close] = False
+    return used
+
+
+_NUMPY_KERNELS = {
+    "distances": _distances_numpy,
+    "angles": _angles_numpy,
+    "dihedrals": _dihedrals_numpy,
+    "pair_repulsion": _pair_repulsion_numpy,
+    "center_repulsion": _center_repulsion_numpy,
+    "prune_close": _prune_close_numpy,
+}
+
+
+# --- Numba kernels ---
+
+def _compile_numba():
+    global _numba_kernels
+    if _numba_kernels is not None:
+        return _numba_kernels
+    from numba import njit as _njit
+
+    def njit(function):
+        # NumPy's error model: zero-length vectors give NaN like the NumPy kernels
+        # instead of raising ZeroDivisionError
+        return _njit(error_model="numpy")(function)
+
+    @njit
+    def unit(x, y, z):
+        n = np.sqrt(x * x + y * y + z * z)
+        return x / n, y / n, z / n
+
+    @njit
+    def plane_normal(a, b, c):
+        ux, uy, uz = unit(c[0] - b[0], c[1] - b[1], c[2] - b[2])
+        vx, vy, vz = unit(a[0] - b[0], a[1] - b[1], a[2] - b[2])
+        return unit(uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+
+    @njit
+    def degrees_of_cosine(dot):
+        # min/max would turn NaN into a bound, np.clip in the NumPy kernels keeps it
+        if np.isnan(dot):
+            return np.nan
+        return np.degrees(np.arccos(min(1.0, max(-1.0, dot))))
+
+    @njit
+    def distances(a, b):
+        out = np.empty(len(a))
+        for i in range(len(a)):
+            dx = a[i, 0] - b[i, 0]
+            dy = a[i, 1] - b[i, 1]
+            dz = a[i, 2] - b[i, 2]
+            out[i] = np.sqrt(dx * dx + dy * dy + dz * dz)
+        return out
+
+    @njit
+    def angles(a, b, c):
+        out = np.empty(len(a))
+        for i in range(len(a)):
+            ux, uy, uz = unit(a[i, 0] - b[i, 0], a[i, 1] - b[i, 1], a[i, 2] - b[i, 2])
+            vx, vy, vz = unit(c[i, 0] - b[i, 0], c[i, 1] - b[i, 1], c[i, 2] - b[i, 2])
+            out[i] = degrees_of_cosine(ux * vx + uy * vy + uz * vz)
+        return out
+
+    @njit
+    def dihedrals(a, b, c, d):
+        out = np.empty(len(a))
+        for i in range(len(a)):
+            n1 = plane_normal(a[i], b[i], c[i])
+            n2 = plane_normal(b[i], c[i], d[i])
+            out[i] = degrees_of_cosine(n1[0] * n2[0] + n1[1] * n2[1] + n1[2] * n2[2])
+        return out
+
+    @njit
+    def pair_repulsion(points):
+        total = 0.0
+        for i in range(len(points)):
+            for j in range(len(points)):
+                if i != j:
+                    dx = points[i, 0] - points[j, 0]
+                    dy = points[i, 1] - points[j, 1]
+                    total += 1.0 / (dx * dx + dy * dy + 1e-9)
+        return total
+
+    @njit
+    def center_repulsion(points, centers, strength):
+        total = 0.0
+        for i in range(len(points)):
+            for k in range(len(centers)):
+                dx = points[i, 0] - centers[k, 0]
+                dy = points[i, 1] - centers[k, 1]
+                d2 = dx * dx + dy * dy
+                total += strength / (d2 * d2 * d2 + 1e-9)
+        return total
+
+    @njit
+    def prune_close(positions, threshold):
+        used = np.ones(len(positions), dtype=np.bool_)
+        for i in range(len(positions)):
+            if not used[i]:
+                continue
+            for j in range(len(positions)):
+                if j != i and used[j]:
+                    d2 = 0.0
+                    for k in range(positions.shape[1]):
+                        diff = positions[i, k] - positions[j, k]
+                        d2 += diff * diff
+                    if np.sqrt(d2) < threshold:
+                        used[j] = False
+        return used
+
+    _numba_kernels = {
+        "distances": distances,
+        "angles": angles,
+        "dihedrals": dihedrals,
+        "pair_repulsion": pair_repulsion,
+        "center_repulsion": center_repulsion,
+        "prune_close": prune_close,
+    }
+    return _numba_kernels
+
+
+# --- Public kernels ---
+
+def distances(a, b):
+    """Distances between the rows of the (n, 3) coordinate arrays `a` and `b`."""
+    return _kernel("distances")(_as_points(a), _as_points(b))
+
+
+def angles(a, b, c):
+    """Angles a-b-c in degrees for (n, 3) coordinate arrays."""
+    return _kernel("angles")(_as_points(a), _as_points(b), _as_points(c))
+
+
+def dihedrals(a, b, c, d):
+    """
+    Angles in degrees between the planes a-b-c and b-c-d for (n, 3) coordinate
+    arrays, between 0 and 180 like Measure.dihedral.
+    """
+    return _kernel("dihedrals")(_as_points(a), _as_points(b), _as_points(c), _as_points(d))
+
+
+def pair_repulsion(points):
+    """Sum of 1 / d² over all ordered pairs of distinct (n, 2) `points`."""
+    return _kernel("pair_repulsion")(_as_points(points))
+
+
+def center_repulsion(points, centers, strength):
+    """Sum of ``strength / d⁶`` between all `points` and all `centers`."""
+    return _kernel("center_repulsion")(_as_points(points), _as_points(centers), float(strength))
+
+
+def prune_close(positions, threshold):
+    """
+    Return a boolean mask of the `positions` to keep: going through them in
+    order, every position closer than `threshold` to a kept one is dropped.
+    """
+    return _kernel("prune_close")(_as_points(positions), float(threshold))
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 from itertools import combinations
+from qmanalysis import elements, kernels
 
 
 class Measure:
@@ -66,3 +67,55 @@ class Measure:
         angle_deg = np.degrees(angle_rad)
 
         return angle_deg
+
+    # Batch versions for many frames at once: every argument is an (n, 3) array
+    # holding the coordinates of one atom in n frames. They use the compiled
+    # kernels of qmanalysis.kernels if Numba is installed.
+
+    def distances(self, coords1, coords2):
+        return kernels.distances(coords1, coords2)
+
+    def angles(self, coords1, coords2, coords3):
+        return kernels.angles(coords1, coords2, coords3)
+
+    def dihedrals(self, coords1, coords2, coords3, coords4):
+        return kernels.dihedrals(coords1, coords2, coords3, coords4)
+
+    def mass_descriptors(self, atom_data):
+        """
+        Mass (u), centre of mass, principal moments of inertia (ascending, u Å²) and
+        radius of gyration (Å) of every frame in `atom_data`, computed for all frames
+        in one pass over the atoms. Returns a dataframe indexed like FrameData with
+        the columns ``mass``, ``com_x``, ``com_y``, ``com_z``, ``moment_1``,
+        ``moment_2``, ``moment_3`` and ``radius_of_gyration``. Frames with atoms of unknown
+        element are NaN.
+        """
+        df = atom_data.dataframe
+        frame_ids, frames = df.index.droplevel("atom_index").factorize()
+        frames.names = df.index.names[:-1]
+        n_frames = len(frames)
+        mass = elements.masses(elements.numbers_from_symbols(df["element"].to_numpy()))
+        coords = df[["x", "y", "z"]].to_numpy(dtype=float)
+
+        def frame_sum(values):
+            return np.bincount(frame_ids, weights=values, minlength=n_frames)
+
+        total_mass = frame_sum(mass)
+        com = np.stack([frame_sum(mass * coords[:, k]) for k in range(3)], axis=1) / total_mass[:, None]
+        r = coords - com[frame_ids]
+        # Second moments sum(m r_i r_j) of every frame
+        second = np.empty((n_frames, 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                second[:, i, j] = second[:, j, i] = frame_sum(mass * r[:, i] * r[:, j])
+        trace = np.trace(second, axis1=1, axis2=2)
+        inertia = trace[:, None, None] * np.eye(3) - second
+        moments = np.full((n_frames, 3), np.nan)
+        finite = np.isfinite(inertia).all(axis=(1, 2))
+        moments[finite] = np.linalg.eigvalsh(inertia[finite])
+        return pd.DataFrame({
+            "mass": total_mass,
+            "com_x": com[:, 0], "com_y": com[:, 1], "com_z": com[:, 2],
+            "moment_1": moments[:, 0], "moment_2": moments[:, 1], "moment_3": moments[:, 2],
+            "radius_of_gyration": np.sqrt(trace / total_mass),
+        }, index=frames)
@@ -0,0 +1,53 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def read_bytes(file_path):
+    return Path(file_path).read_bytes()
+
+
+class Prefetcher:
+    """
+    Reads input files ahead in a thread pool, so disk or network reads of the next
+    files overlap with parsing the current one.
+
+    Iterating yields ``(file_path, data)`` in the order of `file_paths`. At most
+    `depth` files are read ahead, which bounds the memory held by the prefetcher.
+
+    Parameters
+    ----------
+    file_paths : iterable
+        Paths of the files to read.
+    depth : int
+        Number of files read ahead of the one being consumed.
+    workers : int, optional
+        Number of reader threads. Defaults to `depth`.
+    read : callable, optional
+        Function returning the content of one path. Defaults to reading raw bytes.
+    """
+
+    def __init__(self, file_paths, depth=4, workers=None, read=read_bytes):
+        if depth < 1:
+            raise ValueError(f"Prefetch depth must be at least 1, got {depth}")
+        self.file_paths = list(file_paths)
+        self.depth = depth
+        self.workers = workers if workers else depth
+        self.read = read
+
+    def __iter__(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            paths = iter(self.file_paths)
+            for file_path in paths:
+                pending.append(
+                    (file_path, executor.submit(self.read, file_path)))
+                if len(pending) > self.depth:
+                    break
+            while pending:
+                file_path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(
+                        (next_path, executor.submit(self.read, next_path)))
+                yield file_path, future.result()
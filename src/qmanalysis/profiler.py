@@ -0,0 +1,99 @@
+import cProfile
+import csv
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the current process in MiB,
+    or None if the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak RSS and row counts for pipeline stages.
+
+    A disabled profiler still yields a record for every stage, so callers can
+    set ``rows`` unconditionally, but nothing is timed or stored.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether stages are timed and recorded.
+    cprofile_dir : str or Path, optional
+        If given, every top-level stage is additionally run under cProfile and
+        its statistics are dumped to ``<cprofile_dir>/<nnn>_<stage>.prof``.
+    """
+
+    REPORT_FIELDS = ["stage", "file_path", "wall_s",
+                     "cpu_s", "peak_rss_mb", "rows"]
+
+    def __init__(self, enabled=True, cprofile_dir=None):
+        self.enabled = enabled
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        self.records = []
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name, file_path=None):
+        record = {"stage": name, "file_path": str(file_path) if file_path is not None else None,
+                  "wall_s": None, "cpu_s": None, "peak_rss_mb": None, "rows": None}
+        if not self.enabled:
+            yield record
+            return
+
+        # cProfile cannot be nested, so only the outermost stage is profiled
+        profile = None
+        if self.cprofile_dir is not None and self._depth == 0:
+            profile = cProfile.Profile()
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.process_time() - cpu_start
+            record["peak_rss_mb"] = peak_rss_mb()
+            self._depth -= 1
+            self.records.append(record)
+            if profile is not None:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(
+                    self.cprofile_dir / f"{len(self.records):03d}_{name}.prof")
+
+    def write_report(self, file_path):
+        """
+        Write the recorded stages to `file_path`. A ``.csv`` suffix writes one
+        row per stage, anything else writes JSON.
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() == ".csv":
+            with file_path.open("w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=self.REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with file_path.open("w") as f:
+                json.dump({"stages": self.records}, f, indent=2)
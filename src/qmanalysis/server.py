@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import traceback
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from pathlib import Path
+
+DEFAULT_SOCKET = Path(tempfile.gettempdir()) / \
+    f"qmanalysis-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock"
+
+
+class ParsedFileCache:
+    """
+    LRU cache of parsed input files.
+
+    Every entry holds the AtomData and FrameData dataframes of one file as read by
+    its reader. Entries are keyed on the reader type, the resolved path, the file's
+    modification time and size and the labels and reader options it was read with,
+    so a file that changes on disk is parsed again. Cached dataframes are never handed out for
+    modification; callers concatenate copies into their own containers.
+
+    Parameters
+    ----------
+    max_entries : int
+        Number of files kept in memory before the least recently used is dropped.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(ftype, file_path, file_name=None, timestep_name=None, **options):
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        options = tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                               for name, value in options.items()))
+        return (ftype, str(path), stat.st_mtime_ns, stat.st_size, file_name, timestep_name, options)
+
+    def get_or_load(self, key, load):
+        """
+        Return the cached value for `key`, calling `load()` to create it on a miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        value = load()
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _SocketWriter:
+    """File-like object that forwards written text to the client as output messages."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        if text:
+            _send(self.wfile, {"type": "output", "text": text})
+        return len(text)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def _send(wfile, message):
+    wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def serve(socket_path, run_job, cache_size=256):
+    """
+    Listen on the Unix socket `socket_path` and run one job per connection.
+
+    A client sends a single JSON line describing the job. ``run_job(job, cache)`` is
+    called with that dictionary and the shared ParsedFileCache; everything it prints
+    is streamed back as ``{"type": "output"}`` messages, followed by a final
+    ``{"type": "done"}`` or ``{"type": "error"}`` message. Jobs run one at a time.
+    """
+    cache = ParsedFileCache(cache_size)
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                job = json.loads(self.rfile.readline().decode("utf-8"))
+                with redirect_stdout(_SocketWriter(self.wfile)):
+                    run_job(job, cache)
+                _send(self.wfile, {"type": "done", "returncode": 0,
+                                   "cache_entries": len(cache), "cache_hits": cache.hits})
+            except BrokenPipeError:
+                pass
+            except Exception as e:
+                _send(self.wfile, {"type": "error", "returncode": 1,
+                                   "message": f"{e}\n{traceback.format_exc()}"})
+
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+    with socketserver.UnixStreamServer(str(socket_path), JobHandler) as server:
+        print(f"qmanalysis server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+
+
+def submit(socket_path, job, out=None):
+    """
+    Send `job` to the server at `socket_path`, write its output to `out` (stdout by
+    default) as it arrives and return the job's return code.
+    """
+    out = out if out is not None else sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(os.fspath(socket_path))
+        sock.sendall((json.dumps(job) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as rfile:
+            for line in rfile:
+                message = json.loads(line.decode("utf-8"))
+                if message["type"] == "output":
+                    out.write(message["text"])
+                    out.flush()
+                elif message["type"] == "error":
+                    print(message["message"], file=sys.stderr)
+                    return message["returncode"]
+                else:
+                    return message["returncode"]
+    print("qmanalysis server closed the connection without a result", file=sys.stderr)
+    return 1
+
+
+def client_main(argv=None):
+    """
+    Command line client for ``qmanalysis submit``. Only uses the standard library,
+    so submitting a job does not pay for importing pandas and numpy.
+    """
+    parser = argparse.ArgumentParser(
+        prog="qmanalysis submit", description="Run a YAML job on a running qmanalysis server.")
+    parser.add_argument("inputfile", help="Main command input file")
+    parser.add_argument(
+        "-rp", "--root_path",
+        type=str,
+        help="Root path used for all files. If none is specified, the current directory is used as root path"
+    )
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET),
+                        help="Path of the server's Unix socket")
+    args = parser.parse_args(argv)
+    # The server has its own working directory, so send absolute paths
+    root_path = os.path.abspath(args.root_path or os.getcwd())
+    job = {"inputfile": os.path.join(root_path, args.inputfile),
+           "root_path": root_path}
+    sys.exit(submit(args.socket, job))
+
+
+if __name__ == "__main__":
+    client_main()
@@ -0,0 +1,155 @@
+"""
+Broadened IR and Raman spectra of many frames on a shared wavenumber grid.
+
+The modes of all frames are binned onto the grid as sticks with one weighted
+bincount, then convolved with the line shape for all frames at once as a
+product of real FFTs along the grid axis. The cost grows with
+frames × grid points × log(grid points), not with the number of modes.
+"""
+
+import numpy as np
+from qmanalysis import thermochemistry
+from qmanalysis.thermochemistry import pad_modes
+
+# Frame column with the intensities of every spectrum type
+SPECTRUM_TYPES = {"ir": "ir_intensities", "raman": "raman_activities"}
+LINESHAPES = ("lorentzian", "gaussian")
+DEFAULT_RANGE = (0.0, 4000.0)
+DEFAULT_STEP = 1.0
+DEFAULT_FWHM = 10.0
+# Upper bound for the FFTs of the spectra held at once
+SPECTRA_CHUNK_BYTES = 64 * 1024 ** 2
+
+
+def wavenumber_grid(start=DEFAULT_RANGE[0], stop=DEFAULT_RANGE[1], step=DEFAULT_STEP):
+    """Evenly spaced wavenumbers from `start` to `stop` (inclusive) in cm^-1."""
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def stick_spectra(positions, intensities, grid):
+    """
+    Bin the (frames, modes) `positions` with their `intensities` onto the evenly
+    spaced `grid` and return a (frames, points) array. Every stick is split
+    between its two neighbouring grid points by linear interpolation; NaN and
+    out-of-grid sticks are left out.
+    """
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    intensities = np.atleast_2d(np.asarray(intensities, dtype=float))
+    n_frames, n_points = len(positions), len(grid)
+    step = grid[1] - grid[0] if n_points > 1 else 1.0
+    offset = (positions - grid[0]) / step
+    keep = np.isfinite(offset) & np.isfinite(intensities) & (offset >= 0) & (offset <= n_points - 1)
+    frame = np.broadcast_to(np.arange(n_frames)[:, None], positions.shape)[keep]
+    offset, intensity = offset[keep], intensities[keep]
+    lower = np.minimum(np.floor(offset).astype(np.int64), n_points - 1)
+    fraction = offset - lower
+    upper = np.minimum(lower + 1, n_points - 1)
+    bins = np.concatenate([frame * n_points + lower, frame * n_points + upper])
+    weights = np.concatenate([intensity * (1 - fraction), intensity * fraction])
+    return np.bincount(bins, weights=weights, minlength=n_frames * n_points).reshape(n_frames, n_points)
+
+
+def lineshape_kernel(lineshape, fwhm, step, n_points):
+    """
+    Line shape of unit area with full width at half maximum `fwhm`, sampled
+    every `step` from ``-(n_points - 1) * step`` to ``(n_points - 1) * step``, so
+    the tails reach across the whole grid.
+    """
+    if lineshape not in LINESHAPES:
+        raise ValueError(f"Unknown lineshape '{lineshape}', expected one of {', '.join(LINESHAPES)}")
+    x = step * np.arange(-(n_points - 1), n_points)
+    if lineshape == "lorentzian":
+        gamma = fwhm / 2
+        return gamma / np.pi / (x ** 2 + gamma ** 2)
+    sigma = fwhm / (2 * np.sqrt(2 * np.log(2)))
+    return np.exp(-0.5 * (x / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+
+
+def broaden(sticks, lineshape="lorentzian", fwhm=DEFAULT_FWHM, step=DEFAULT_STEP):
+    """
+    Convolve every row of the (frames, points) `sticks` with the line shape,
+    with one FFT for as many frames as fit into SPECTRA_CHUNK_BYTES. Returns
+    intensity per cm^-1 on the same grid.
+    """
+    n_frames, n_points = sticks.shape
+    kernel = lineshape_kernel(lineshape, fwhm, step, n_points)
+    # Long enough for the linear convolution, so nothing wraps around
+    size = 1 << int(np.ceil(np.log2(n_points + len(kernel) - 1)))
+    kernel_fft = np.fft.rfft(kernel, size)
+    spectra = np.empty((n_frames, n_points))
+    # Padded input, its transform and the inverse transform of every frame
+    chunk = max(1, SPECTRA_CHUNK_BYTES // (size * 32))
+    for start in range(0, n_frames, chunk):
+        block = np.fft.irfft(np.fft.rfft(sticks[start:start + chunk], size, axis=1) * kernel_fft,
+                             size, axis=1)
+        # The kernel is centred on its index n_points - 1
+        spectra[start:start + chunk] = block[:, n_points - 1:2 * n_points - 1]
+    return spectra
+
+
+def frame_spectra(frame_data, kind="ir", grid=None, lineshape="lorentzian", fwhm=DEFAULT_FWHM,
+                  frequency_scale=1.0):
+    """
+    Broadened spectra of the frames of `frame_data` that have normal modes.
+
+    Returns the index of those frames and a (frames, points) array on `grid`
+    (see wavenumber_grid). `kind` is ``ir`` (IR intensities) or ``raman``
+    (Raman activities).
+    """
+    if kind not in SPECTRUM_TYPES:
+        raise ValueError(f"Unknown spectrum type '{kind}', expected one of {', '.join(SPECTRUM_TYPES)}")
+    grid = wavenumber_grid() if grid is None else grid
+    df = frame_data.dataframe
+    column = SPECTRUM_TYPES[kind]
+    if "frequencies" not in df.columns or column not in df.columns:
+        return df.index[:0], np.empty((0, len(grid)))
+    has_modes = df[column].map(lambda value: isinstance(value, np.ndarray)).to_numpy(dtype=bool) \
+        & df["frequencies"].map(lambda value: isinstance(value, np.ndarray)).to_numpy(dtype=bool)
+    frames = df.index[has_modes]
+    positions = pad_modes(df["frequencies"][has_modes]) * frequency_scale
+    intensities = pad_modes(df[column][has_modes])
+    sticks = stick_spectra(positions, intensities, grid)
+    step = grid[1] - grid[0] if len(grid) > 1 else DEFAULT_STEP
+    return frames, broaden(sticks, lineshape, fwhm, step)
+
+
+def ensemble_average(spectra, energies=None, temperature=298.15):
+    """
+    Boltzmann-weighted average of the (frames, points) `spectra` from the
+    `energies` (Hartree) of the frames at `temperature`; equal weights without
+    `energies`. Returns the average and the weights.
+    """
+    if energies is None:
+        weights = np.full(len(spectra), 1.0 / len(spectra)) if len(spectra) else np.empty(0)
+    else:
+        weights = thermochemistry.boltzmann_weights(energies, temperature)
+    return weights @ spectra if len(spectra) else np.zeros(spectra.shape[1]), weights
+
+
+def save_spectra(path, grid, frames, spectra, weights, average):
+    """
+    Write the spectra to a compressed ``.npz`` file: ``wavenumbers``,
+    ``spectra`` (frames, points) as float32, the Boltzmann ``weights``, the
+    ensemble ``average`` and the ``file_name``, ``file_path`` and
+    ``timestep_name`` of every row (empty if missing).
+    """
+    labels = {name: np.asarray(frames.get_level_values(name).fillna("").astype(str), dtype=str)
+              for name in frames.names}
+    np.savez_compressed(path, wavenumbers=grid, spectra=spectra.astype(np.float32),
+                        weights=weights, average=average, **labels)
+
+
+def plot_spectrum(path, grid, average, kind="ir", dpi=300):
+    """
+    Plot the ensemble average spectrum to `path` with decreasing wavenumbers,
+    as usual for vibrational spectra.
+    """
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.plot(grid, average, color="black", linewidth=1.0)
+    ax.set_xlim(grid[-1], grid[0])
+    ax.set_xlabel("Wavenumber (cm$^{-1}$)")
+    ax.set_ylabel("IR intensity" if kind == "ir" else "Raman activity")
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
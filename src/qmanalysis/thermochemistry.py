@@ -0,0 +1,212 @@
+"""
+Ideal gas, rigid rotor and (quasi-)harmonic oscillator thermochemistry.
+
+All frames and temperatures are computed together: frequencies are a
+(frames, modes) array padded with NaN, temperatures a 1D grid, and every term
+is evaluated on the broadcast (frames, temperatures, modes) array. Energies are
+in Hartree per molecule like Gaussian's thermochemistry output, entropies in
+cal/(mol K).
+
+With a ``qrrho_cutoff``, the vibrational entropy of low-frequency modes is
+interpolated towards that of a free rotor (Grimme, Chem. Eur. J. 2012, 18,
+9955), which removes the divergence of the harmonic entropy for frequencies
+close to zero. Imaginary frequencies (negative values) are left out.
+"""
+
+import numpy as np
+import pandas as pd
+
+# CODATA 2018 constants in SI units
+PLANCK = 6.62607015e-34
+BOLTZMANN = 1.380649e-23
+AVOGADRO = 6.02214076e23
+SPEED_OF_LIGHT = 2.99792458e10  # cm/s, as frequencies are in cm^-1
+HARTREE = 4.3597447222071e-18
+AMU = 1.66053906660e-27
+ATMOSPHERE = 101325.0
+CALORIE = 4.184
+
+# Default Grimme cutoff (cm^-1) and averaged moment of inertia (kg m²) of the free rotor
+DEFAULT_QRRHO_CUTOFF = 100.0
+FREE_ROTOR_MOMENT = 1e-44
+# Principal moments (u Å²) below this are zero, e.g. the axis of a linear molecule
+ZERO_MOMENT = 1e-3
+
+# Entropy in J/K per molecule to cal/(mol K)
+_ENTROPY_UNIT = AVOGADRO / CALORIE
+
+
+def pad_modes(arrays):
+    """
+    Stack per-frame arrays of different length into a (frames, modes) float
+    array padded with NaN. Missing values (None, NaN) give an all-NaN row.
+    """
+    arrays = [np.atleast_1d(np.asarray(a, dtype=float)) if isinstance(a, (list, tuple, np.ndarray))
+              else np.empty(0) for a in arrays]
+    width = max((len(a) for a in arrays), default=0)
+    padded = np.full((len(arrays), width), np.nan)
+    for row, values in zip(padded, arrays):
+        row[:len(values)] = values
+    return padded
+
+
+def _free_rotor_entropy(frequencies, temperatures):
+    # Entropy (J/K) of a free rotor with the moment of inertia of a mode's frequency
+    moment = PLANCK / (8 * np.pi ** 2 * SPEED_OF_LIGHT * frequencies)
+    moment = moment * FREE_ROTOR_MOMENT / (moment + FREE_ROTOR_MOMENT)
+    return BOLTZMANN * (0.5 + np.log(np.sqrt(
+        8 * np.pi ** 3 * moment * BOLTZMANN * temperatures / PLANCK ** 2)))
+
+
+def thermochemistry(frequencies, temperatures, masses, moments, symmetry_numbers=1,
+                    multiplicities=1, pressure=1.0, qrrho_cutoff=DEFAULT_QRRHO_CUTOFF,
+                    frequency_scale=1.0):
+    """
+    Thermal corrections of every frame at every temperature.
+
+    `frequencies` is a (frames, modes) array in cm^-1 padded with NaN, see
+    pad_modes. `masses` (u), `symmetry_numbers` and `multiplicities` have one
+    value per frame, `moments` are the (frames, 3) principal moments of inertia
+    in u Å². `pressure` is in atm. A `qrrho_cutoff` of None or 0 gives the plain
+    harmonic oscillator entropy.
+
+    Returns a dict with ``zpe`` (frames,) and ``enthalpy``, ``entropy`` and
+    ``free_energy`` (frames, temperatures). ``enthalpy`` and ``free_energy`` are
+    corrections to the electronic energy including the zero-point energy.
+    """
+    frequencies = np.atleast_2d(np.asarray(frequencies, dtype=float)) * frequency_scale
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+    masses = np.asarray(masses, dtype=float).reshape(-1, 1)
+    moments = np.sort(np.asarray(moments, dtype=float).reshape(-1, 3), axis=1)
+    symmetry_numbers = np.broadcast_to(np.asarray(symmetry_numbers, dtype=float), masses.shape[:1])[:, None]
+    multiplicities = np.broadcast_to(np.asarray(multiplicities, dtype=float), masses.shape[:1])[:, None]
+    kt = BOLTZMANN * temperatures[None, :]
+
+    # Vibrations on (frames, temperatures, modes); padding and imaginary modes drop out
+    real = np.isfinite(frequencies) & (frequencies > 0)
+    nu = np.where(real, frequencies, 1.0)[:, None, :]
+    quantum = PLANCK * SPEED_OF_LIGHT * nu
+    x = quantum / kt[:, :, None]
+    zpe = 0.5 * np.where(real, PLANCK * SPEED_OF_LIGHT * frequencies, 0.0).sum(axis=1)
+    with np.errstate(over="ignore"):
+        thermal = quantum / np.expm1(x)
+        harmonic = BOLTZMANN * (x / np.expm1(x) - np.log1p(-np.exp(-x)))
+    if qrrho_cutoff:
+        weight = 1.0 / (1.0 + (qrrho_cutoff / nu) ** 4)
+        harmonic = weight * harmonic + (1 - weight) * _free_rotor_entropy(
+            nu, temperatures[None, :, None])
+    e_vib = zpe[:, None] + np.where(real[:, None, :], thermal, 0.0).sum(axis=2)
+    s_vib = np.where(real[:, None, :], harmonic, 0.0).sum(axis=2)
+
+    # Translation of an ideal gas
+    mass = masses * AMU
+    s_trans = BOLTZMANN * (np.log((2 * np.pi * mass * kt / PLANCK ** 2) ** 1.5
+                                  * kt / (pressure * ATMOSPHERE)) + 2.5)
+
+    # Rigid rotor: atoms do not rotate, linear molecules have two rotational degrees
+    rotating = moments > ZERO_MOMENT
+    n_rotating = rotating.sum(axis=1, keepdims=True)
+    rotational_temperatures = PLANCK ** 2 / (
+        8 * np.pi ** 2 * np.where(rotating, moments, 1.0) * AMU * 1e-20 * BOLTZMANN)
+    temperature = temperatures[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s_linear = BOLTZMANN * (np.log(temperature / (
+            symmetry_numbers * rotational_temperatures[:, 2:3])) + 1)
+        s_nonlinear = BOLTZMANN * (np.log(np.sqrt(np.pi) / symmetry_numbers * temperature ** 1.5
+                                          / np.sqrt(rotational_temperatures.prod(axis=1, keepdims=True))) + 1.5)
+    s_rot = np.select([n_rotating == 3, n_rotating == 2], [s_nonlinear, s_linear], 0.0)
+    e_rot = 0.5 * n_rotating * kt
+
+    s_elec = BOLTZMANN * np.log(multiplicities)
+
+    enthalpy = e_vib + 1.5 * kt + e_rot + kt
+    entropy = s_vib + s_trans + s_rot + s_elec
+    # Frames without a mass (unknown elements) have no result
+    missing = ~np.isfinite(masses) | ~np.isfinite(moments).all(axis=1, keepdims=True)
+    return {
+        "zpe": np.where(missing[:, 0], np.nan, zpe) / HARTREE,
+        "enthalpy": np.where(missing, np.nan, enthalpy) / HARTREE,
+        "entropy": np.where(missing, np.nan, entropy) * _ENTROPY_UNIT,
+        "free_energy": np.where(missing, np.nan, enthalpy - temperature * entropy) / HARTREE,
+    }
+
+
+def boltzmann_weights(energies, temperature=298.15, groups=None):
+    """
+    Boltzmann populations of the `energies` (Hartree) at `temperature` (K),
+    normalized to sum to one, or to one within every group if `groups` gives
+    an integer group code per energy. Missing (NaN) energies get a weight of 0;
+    in a group without known energies, all weights are NaN.
+    """
+    energies = np.asarray(energies, dtype=float)
+    groups = np.zeros(energies.shape, dtype=np.int64) if groups is None else np.asarray(groups)
+    n_groups = groups.max() + 1 if groups.size else 0
+    known = np.isfinite(energies)
+    # Energies relative to the lowest one of their group, so exp does not underflow
+    lowest = np.full(n_groups, np.inf)
+    np.minimum.at(lowest, groups[known], energies[known])
+    relative = np.where(known, energies - lowest[groups], 0.0) * HARTREE / (BOLTZMANN * temperature)
+    weights = np.where(known, np.exp(-relative), 0.0)
+    totals = np.bincount(groups, weights=weights, minlength=n_groups)
+    with np.errstate(invalid="ignore"):
+        return weights / totals[groups]
+
+
+def temperature_label(temperature):
+    """Column suffix of `temperature`, e.g. ``298.15`` or ``300``."""
+    return f"{float(temperature):g}"
+
+
+def frame_thermochemistry(frame_data, descriptors, temperatures, energy="HF", **options):
+    """
+    Thermochemistry of every frame of `frame_data` from its ``frequencies``
+    column and the ``mass`` and ``moment_1`` to ``moment_3`` columns of
+    `descriptors` (see Measure.mass_descriptors), with the rotational symmetry
+    number and multiplicity of the frame if known.
+
+    Returns a dataframe indexed like `frame_data` with ``zpe_correction`` and,
+    for every temperature T, ``H_T``, ``S_T`` and ``G_T``. H and G include the
+    electronic energy of the `energy` column; with `energy` None they are the
+    thermal corrections only. Frames without frequencies are NaN. `options` are
+    passed on to thermochemistry.
+    """
+    df = frame_data.dataframe
+    descriptors = descriptors.reindex(df.index)
+    column = df["frequencies"] if "frequencies" in df.columns else pd.Series(None, index=df.index)
+    has_modes = column.map(lambda value: isinstance(value, (list, tuple, np.ndarray))).to_numpy(dtype=bool)
+    frames = np.flatnonzero(has_modes)
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+
+    def per_frame(name, default):
+        if name not in df.columns:
+            return np.full(len(frames), default, dtype=float)
+        values = pd.to_numeric(df[name].iloc[frames], errors="coerce").to_numpy(dtype=float)
+        return np.where(np.isnan(values), default, values)
+
+    result = thermochemistry(
+        pad_modes(column.iloc[frames]), temperatures,
+        descriptors["mass"].to_numpy(dtype=float)[frames],
+        descriptors[["moment_1", "moment_2", "moment_3"]].to_numpy(dtype=float)[frames],
+        symmetry_numbers=per_frame("symmetry_number", 1),
+        multiplicities=per_frame("multiplicity", 1), **options)
+    electronic = 0.0
+    if energy is not None:
+        electronic = pd.to_numeric(df[energy], errors="coerce").to_numpy(dtype=float)[frames, None] \
+            if energy in df.columns else np.nan
+
+    def expand(values):
+        # Frames without frequencies are NaN
+        full = np.full((len(df),) + values.shape[1:], np.nan)
+        full[frames] = values
+        return full
+
+    columns = {"zpe_correction": expand(result["zpe"])}
+    enthalpy = expand(result["enthalpy"] + electronic)
+    entropy = expand(result["entropy"])
+    free_energy = expand(result["free_energy"] + electronic)
+    for k, temperature in enumerate(temperatures):
+        label = temperature_label(temperature)
+        columns[f"H_{label}"] = enthalpy[:, k]
+        columns[f"S_{label}"] = entropy[:, k]
+        columns[f"G_{label}"] = free_energy[:, k]
+    return pd.DataFrame(columns, index=df.index)
@@ -1,5 +1,6 @@
 import pandas as pd
 from pathlib import Path
+from qmanalysis.fileopener import RAW_DATA_MODES, RawText, open_text
 
 
 # class AtomData:
@@ -18,7 +19,8 @@ from pathlib import Path
 #             columns=["raw_data", "energy", "zero-point energy", "file_comment"])
 
 class XYZFile:
-    def __init__(self, atom_data, frame_data, file_path, file_name=None, timestep_name=None):
+    def __init__(self, atom_data, frame_data, file_path, file_name=None, timestep_name=None, data=None,
+                 raw_data="lazy"):
         self.atom_data = atom_data
         self.timestep_data = frame_data
         self.file_path = file_path
@@ -28,12 +30,19 @@ class XYZFile:
         else:
             self.file_name = self.path.name
         self.timestep_name = timestep_name
+        # Content of the file if it was already read, e.g. by a Prefetcher
+        self.data = data
+        if raw_data not in RAW_DATA_MODES:
+            raise ValueError(
+                f"{self.file_path}: Unknown raw_data '{raw_data}', expected one of {', '.join(RAW_DATA_MODES)}")
+        self.raw_data = raw_data
 
         self._read_xyz()
 
     def _read_xyz(self):
-        with self.path.open('r') as f:
-            lines = [line.strip() for line in f if line.strip()]
+        with open_text(self.path, self.data) as f:
+            text = f.read()
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
 
         if len(lines) < 2:
             raise ValueError(
@@ -59,7 +68,7 @@ class XYZFile:
         # Add entry to timestep_data
 
         self.timestep_data.dataframe.loc[(self.file_name, self.file_path, self.timestep_name)] = {
-            "raw_data": "\n".join(lines),
+            "raw_data": text if self.raw_data == "eager" else RawText(self.file_path),
             "energy": pd.NA,
             "zero-point energy": pd.NA,
             "file_comment": comment
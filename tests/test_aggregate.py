@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis import thermochemistry as th
+from qmanalysis.aggregate import aggregate_frames, group_frames
+
+
+class DummyFrameData:
+    pass
+
+
+@pytest.fixture
+def frame_data():
+    frame_data = DummyFrameData()
+    index = pd.MultiIndex.from_tuples(
+        [("molA_c1", "a1.out", None), ("molA_c2", "a2.out", None),
+         ("molB_c1", "b1.out", None), ("solvent", "s.xyz", None)],
+        names=["file_name", "file_path", "timestep_name"])
+    frame_data.dataframe = pd.DataFrame({
+        "HF": [-1.0, -1.001, -2.0, np.nan],
+        "d": [1.0, 2.0, 3.0, 4.0],
+        "q": [np.nan, 5.0, 6.0, 7.0]}, index=index)
+    return frame_data
+
+
+def test_pattern_groups_with_boltzmann_weights(frame_data):
+    summary = aggregate_frames(frame_data, ["d", "q"], pattern=r"(mol\w)_c\d")
+    assert list(summary.index) == ["molA", "molB"]
+    assert summary.index.name == "file_name"
+    molA = summary.loc["molA"]
+    low, high = th.boltzmann_weights([-1.001, -1.0])
+    assert molA["n_frames"] == 2
+    assert molA["d_mean"] == pytest.approx(2.0 * low + 1.0 * high)
+    assert molA["d_std"] == pytest.approx(np.sqrt(low * high))
+    assert (molA["d_min"], molA["d_max"]) == (1.0, 2.0)
+    # A missing value leaves the other frame with all the weight
+    assert (molA["q_mean"], molA["q_std"]) == (5.0, 0.0)
+    assert molA["best_file_name"] == "molA_c2"
+    assert molA["best_weight"] == pytest.approx(low)
+
+
+def test_group_by_levels_and_all_frames(frame_data):
+    summary = aggregate_frames(frame_data, ["d"], by="file_path")
+    assert summary.index.name == "file_path"
+    # No energy, no weight and no best frame
+    assert np.isnan(summary.loc["s.xyz", "d_mean"]) and summary.loc["s.xyz", "best_file_name"] is None
+    assert summary.loc["s.xyz", "d_max"] == 4.0
+    summary = aggregate_frames(frame_data, ["d"], by=["file_name", "file_path"])
+    assert summary.index.names == ["file_name", "file_path"] and len(summary) == 4
+    summary = aggregate_frames(frame_data, ["d"], energy=None)
+    assert summary.loc["all", "d_mean"] == 2.5
+    assert "best_weight" not in summary.columns
+
+
+def test_invalid_options(frame_data):
+    with pytest.raises(ValueError):
+        aggregate_frames(frame_data, ["missing"])
+    with pytest.raises(ValueError):
+        aggregate_frames(frame_data, ["d"], by="conformer")
+    with pytest.raises(ValueError):
+        group_frames(frame_data.dataframe.index, by="file_name", pattern="mol")
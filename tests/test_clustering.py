@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis.clustering import block_rmsd, block_size, butina, cluster_frames, rmsd_neighbours
+
+
+def random_rotations(n, rng):
+    q, _ = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    # Proper rotations only
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+@pytest.fixture
+def conformers():
+    # Three base structures, each copied five times with a random rotation,
+    # translation and a little noise
+    rng = np.random.default_rng(0)
+    bases = rng.normal(scale=2.0, size=(3, 8, 3))
+    copies = np.repeat(bases, 5, axis=0)
+    rotated = np.einsum("pij,pnj->pni", random_rotations(len(copies), rng), copies)
+    return rotated + rng.normal(size=(len(copies), 1, 3)) + rng.normal(scale=0.01, size=copies.shape)
+
+
+def kabsch_rmsd(x, y):
+    from scipy.spatial.transform import Rotation
+    x, y = x - x.mean(0), y - y.mean(0)
+    rotation, _ = Rotation.align_vectors(x, y)
+    return np.sqrt(((x - rotation.apply(y)) ** 2).sum(1).mean())
+
+
+def test_block_rmsd_matches_kabsch(conformers):
+    centred = conformers - conformers.mean(axis=1, keepdims=True)
+    rmsd = block_rmsd(centred[:6], centred[4:])
+    expected = [[kabsch_rmsd(x, y) for y in conformers[4:]] for x in conformers[:6]]
+    np.testing.assert_allclose(rmsd, expected, atol=1e-6)
+
+
+def test_blocked_neighbours_do_not_depend_on_block_size(conformers):
+    full = rmsd_neighbours(conformers, 0.1)
+    assert block_size(0.0001) == 1
+    small = rmsd_neighbours(conformers, 0.1, memory_mb=0.0001)
+    assert sorted(map(tuple, full)) == sorted(map(tuple, small))
+    pooled = rmsd_neighbours(conformers, 0.1, memory_mb=0.0001, workers=2)
+    assert sorted(map(tuple, full)) == sorted(map(tuple, pooled))
+    assert len(full) == 3 * 10
+
+
+def test_butina():
+    # 0-1-2 chain and 3-4 pair: 1 has most neighbours and takes 0 and 2
+    cluster_ids, centroids = butina(6, [(0, 1), (1, 2), (3, 4)])
+    assert list(cluster_ids) == [0, 0, 0, 1, 1, 2]
+    assert list(centroids) == [False, True, False, True, False, True]
+
+
+def test_cluster_frames(conformers):
+    class DummyAtomData:
+        pass
+    atom_data = DummyAtomData()
+    n_frames, n_atoms = conformers.shape[:2]
+    index = pd.MultiIndex.from_tuples(
+        [(f"c{f}", f"c{f}.xyz", None, a) for f in range(n_frames) for a in range(1, n_atoms + 1)],
+        names=["file_name", "file_path", "timestep_name", "atom_index"])
+    atom_data.dataframe = pd.DataFrame(conformers.reshape(-1, 3), columns=["x", "y", "z"], index=index)
+    atom_data.dataframe["element"] = "C"
+    result = cluster_frames(atom_data, 0.1)
+    assert list(result["cluster_id"]) == [0] * 5 + [1] * 5 + [2] * 5
+    assert result["cluster_centroid"].sum() == 3
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis.connectivity import (Topology, analyze_frames, connectivity_hash, neighbour_pairs,
+                                     perceive_bonds)
+
+# Ethane-like chain H-C-C-H with one extra H on each carbon
+ELEMENTS = ["H", "C", "C", "H", "H", "H"]
+COORDS = np.array([[-1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.5, 0.0, 0.0],
+                   [2.5, 0.0, 0.0], [0.0, 1.0, 0.0], [1.5, 0.0, 1.0]])
+
+
+def test_neighbour_pairs_match_all_pairs():
+    coords = np.random.default_rng(0).uniform(0.0, 10.0, (300, 3))
+    pairs, distances = neighbour_pairs(coords, 1.5)
+    full = np.linalg.norm(coords[:, None] - coords[None], axis=-1)
+    i, j = np.nonzero(np.triu(full < 1.5, 1))
+    assert set(map(tuple, pairs)) == set(zip(i, j))
+    np.testing.assert_allclose(distances, full[pairs[:, 0], pairs[:, 1]])
+
+
+def test_perceive_bonds_and_topology():
+    numbers = [1, 6, 6, 1, 1, 1]
+    bonds = perceive_bonds(numbers, COORDS)
+    assert bonds.tolist() == [[0, 1], [1, 2], [1, 4], [2, 3], [2, 5]]
+    topology = Topology(bonds, len(numbers))
+    assert len(topology.angles) == 6
+    assert sorted(map(tuple, topology.torsions)) == [(0, 1, 2, 3), (0, 1, 2, 5), (4, 1, 2, 3), (4, 1, 2, 5)]
+    assert connectivity_hash(numbers, bonds) != connectivity_hash(numbers, bonds[:-1])
+
+
+def atom_data_for(frames):
+    class DummyAtomData:
+        pass
+    atom_data = DummyAtomData()
+    rows, index = [], []
+    for name, coords in frames:
+        for i, (element, xyz) in enumerate(zip(ELEMENTS, coords), start=1):
+            index.append((name, f"{name}.xyz", None, i))
+            rows.append((element, *xyz))
+    atom_data.dataframe = pd.DataFrame(rows, columns=["element", "x", "y", "z"], index=pd.MultiIndex.from_tuples(
+        index, names=["file_name", "file_path", "timestep_name", "atom_index"]))
+    return atom_data
+
+
+def test_analyze_frames_shares_topologies():
+    stretched = COORDS.copy()
+    stretched[3, 0] = 2.6
+    broken = COORDS.copy()
+    broken[3, 0] = 5.0
+    cache = {}
+    result = analyze_frames(atom_data_for([("a", COORDS), ("b", stretched), ("c", broken)]),
+                            measurements=["bonds", "torsions"], cache=cache)
+    assert len(cache) == 2
+    assert result["connectivity_hash"].iloc[0] == result["connectivity_hash"].iloc[1]
+    assert list(result["n_bonds"]) == [5, 5, 4]
+    assert list(result["bond_3_4"].iloc[:2]) == pytest.approx([1.0, 1.1])
+    assert pd.isna(result["bond_3_4"].iloc[2])
+    assert result["torsion_5_2_3_6"].iloc[0] == pytest.approx(90.0)
+    with pytest.raises(ValueError):
+        analyze_frames(atom_data_for([("a", COORDS)]), measurements=["rings"])
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis.constantsjoin import join_constants, match_constants
+
+
+@pytest.fixture
+def frame_df():
+    index = pd.MultiIndex.from_tuples([
+        ("Li", "/d/Li.out", "opt"),
+        ("Na", "/d/Na.out", "opt"),
+        ("Na", "/d/Na.out", "freq"),
+        ("K", "/e/K.out", None),
+    ], names=("file_name", "file_path", "timestep_name"))
+    return pd.DataFrame({"HF": [-1.0, -2.0, -3.0, -4.0]}, index=index)
+
+
+def test_exact_keys_match_like_a_join(frame_df):
+    constants = pd.DataFrame({"file_name": ["Na", "Li"], "radius": [1.18, 0.92],
+                              "HF": [9.0, 8.0]})
+    result = join_constants(frame_df, constants, rsuffix="_perfile")
+    expected = frame_df.join(constants.set_index("file_name"), on="file_name", rsuffix="_perfile")
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_glob_keys_on_several_levels_last_match_wins(frame_df):
+    constants = pd.DataFrame({
+        "file_path": ["/d/*", "/d/*", np.nan],
+        "timestep_name": [np.nan, "fr?q", "opt"],
+        "weight": [1.0, 2.0, 3.0],
+    })
+    result = join_constants(frame_df, constants)
+    assert result["weight"].tolist() == [3.0, 3.0, 2.0, pytest.approx(np.nan, nan_ok=True)]
+
+
+def test_overwrite_keeps_unmatched_values(frame_df):
+    constants = pd.DataFrame({"file_name": ["K"], "HF": [0.5]})
+    result = join_constants(frame_df, constants)
+    assert list(result.columns) == ["HF"]
+    assert result["HF"].tolist() == [-1.0, -2.0, -3.0, 0.5]
+
+
+def test_exact_and_glob_rows_last_match_wins(frame_df):
+    constants = pd.DataFrame({
+        "file_name": ["Na", "*", "Na", "Xe", "K"],
+        "timestep_name": ["opt", "opt", "opt", "opt", np.nan],
+    })
+    assert match_constants(frame_df.index, constants, ["file_name", "timestep_name"]).tolist() == [1, 2, -1, 4]
+
+
+def test_missing_level_value_only_matches_empty_key(frame_df):
+    constants = pd.DataFrame({"timestep_name": ["*"], "x": [1]})
+    assert match_constants(frame_df.index, constants, ["timestep_name"]).tolist() == [0, 0, 0, -1]
+
+
+def test_constants_need_a_key_column(frame_df):
+    with pytest.raises(ValueError):
+        join_constants(frame_df, pd.DataFrame({"x": [1]}))
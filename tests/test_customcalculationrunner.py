@@ -52,3 +52,73 @@ def test_run_invalid_expression(frame_data):
     calc = [{"name": "fail", "expr": "not_a_column * 2"}]
     with pytest.raises(Exception):
         runner.run(calc)
+
+
+def test_scipy_is_imported_on_demand(frame_data):
+    runner = CustomCalculationRunner(frame_data)
+    assert "scipy" not in runner.safe_globals
+    runner.run([{"name": "c", "expr": "scipy.special.cbrt(pi)"}])
+    assert "scipy" in runner.safe_globals
+    assert frame_data.dataframe["c"].iloc[0] == pytest.approx(3.1415 ** (1 / 3))
+
+
+def test_global_constants_are_available(frame_data):
+    frame_data.constants = {"Hartree_kcal_mol": 627.509}
+    runner = CustomCalculationRunner(frame_data)
+    runner.run([{"name": "kcal", "expr": "böp * Hartree_kcal_mol"}])
+    assert list(frame_data.dataframe["kcal"]) == pytest.approx([5.0 * 627.509, 6.0 * 627.509])
+    assert "Hartree_kcal_mol" not in frame_data.dataframe.columns
+
+
+@pytest.fixture
+def multi_frame_data():
+    class DummyFrameData:
+        pass
+    index = pd.MultiIndex.from_tuples(
+        [("ref", "/d/ref.out", "s1"), ("ref", "/d/ref.out", "s2"),
+         ("a", "/d/a.out", "s1"), ("a", "/d/a.out", "s2"), ("a", "/d/a.out", "s3")],
+        names=["file_name", "file_path", "timestep_name"])
+    frame_data = DummyFrameData()
+    frame_data.dataframe = pd.DataFrame({"Energy": [-1.0, -2.0, -1.5, -2.5, -3.0]}, index=index)
+    return frame_data
+
+
+def test_pivot_is_resolved_once(multi_frame_data):
+    runner = CustomCalculationRunner(multi_frame_data)
+    calls = []
+    pivot = runner.pivot
+    runner.pivot = lambda *args: calls.append(args) or pivot(*args)
+    runner.run([{"name": "rel", "expr": "(Energy - pivot('ref', 'Energy')) * 2"}])
+    assert calls == [("ref", "Energy")]
+    assert list(multi_frame_data.dataframe["rel"]) == pytest.approx([0.0, -2.0, -1.0, -3.0, -4.0])
+
+
+def test_pivot_timestep_aligns_on_timestep_name(multi_frame_data):
+    runner = CustomCalculationRunner(multi_frame_data)
+    runner.run([{"name": "rel", "expr": "Energy - pivot_timestep('ref', 'Energy')"}])
+    rel = multi_frame_data.dataframe["rel"]
+    assert list(rel.iloc[:4]) == pytest.approx([0.0, 0.0, -0.5, -0.5])
+    assert pd.isna(rel.iloc[4])
+
+
+def test_row_wise_fallback(multi_frame_data):
+    runner = CustomCalculationRunner(multi_frame_data)
+    runner.run([{"name": "clipped", "expr": "max(Energy - pivot_timestep('ref', 'Energy'), -0.2)"},
+                {"name": "lowest", "expr": "min(Energy)"}])
+    df = multi_frame_data.dataframe
+    assert list(df["clipped"].iloc[:4]) == pytest.approx([0.0, 0.0, -0.2, -0.2])
+    # Evaluated per row like before, not reduced over the column
+    assert df["lowest"].isna().all()
+
+
+def test_division_by_zero_gives_nan_like_row_wise(multi_frame_data):
+    import numpy as np
+    df = multi_frame_data.dataframe
+    df["comment"] = "opt"
+    df["d1"] = [1.0, -2.0, 0.0, 3.0, 4.0]
+    runner = CustomCalculationRunner(multi_frame_data)
+    runner.run([{"name": "ratio", "expr": "d1 / 0.0"},
+                {"name": "log", "expr": "np.log(d1 - d1)"}])
+    assert df["ratio"].isna().all()
+    # NumPy functions give -inf row by row as well
+    assert (df["log"] == -np.inf).all()
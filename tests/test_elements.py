@@ -0,0 +1,28 @@
+import numpy as np
+from qmanalysis import elements
+
+
+def test_tables_are_indexed_by_atomic_number():
+    assert len(elements.SYMBOLS) == len(elements.MASSES) == len(elements.COVALENT_RADII) == 119
+    assert elements.SYMBOLS[6] == "C" and elements.SYMBOLS[92] == "U" and elements.SYMBOLS[118] == "Og"
+    assert elements.MASSES[8] == 15.999
+    assert elements.COVALENT_RADII[1] == 0.31
+
+
+def test_symbols_from_numbers():
+    assert list(elements.symbols_from_numbers([1, 6, 0, 17, 200, -1])) == \
+        ["H", "C", "Bq", "Cl", "El200", "El-1"]
+
+
+def test_numbers_from_symbols():
+    numbers = elements.numbers_from_symbols(["C", "cl", "CL", "Cl3", "H", "Xx", "1"])
+    assert list(numbers) == [6, 17, 17, 17, 1, -1, -1]
+    assert elements.numbers_from_symbols([]).shape == (0,)
+
+
+def test_round_trip_and_lookups():
+    numbers = np.arange(1, 119)
+    np.testing.assert_array_equal(
+        elements.numbers_from_symbols(elements.symbols_from_numbers(numbers)), numbers)
+    assert np.isnan(elements.masses([-1, 300])).all()
+    assert np.isnan(elements.covalent_radii([100])).all()
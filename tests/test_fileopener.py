@@ -0,0 +1,50 @@
+import gzip
+import lzma
+import pytest
+from qmanalysis.fileopener import detect_compression, open_text, strip_compression_suffix
+
+CONTENT = b"3\nwater\nO 0.0 0.0 0.0\n"
+
+
+@pytest.mark.parametrize("suffix,compress", [(".gz", gzip.compress), (".xz", lzma.compress)])
+def test_open_text_decompresses_by_suffix(tmp_path, suffix, compress):
+    path = tmp_path / f"water.xyz{suffix}"
+    path.write_bytes(compress(CONTENT))
+    with open_text(path) as f:
+        assert f.read() == CONTENT.decode()
+
+
+def test_open_text_detects_magic_bytes(tmp_path):
+    path = tmp_path / "water.xyz"
+    path.write_bytes(gzip.compress(CONTENT))
+    assert detect_compression(path) == "gzip"
+    with open_text(path) as f:
+        assert f.read() == CONTENT.decode()
+
+
+def test_open_text_decompresses_buffer(tmp_path):
+    with open_text(tmp_path / "water.xyz.xz", lzma.compress(CONTENT)) as f:
+        assert f.read() == CONTENT.decode()
+
+
+def test_plain_file_is_not_compressed(tmp_path):
+    path = tmp_path / "water.xyz"
+    path.write_bytes(CONTENT)
+    assert detect_compression(path) is None
+
+
+def test_strip_compression_suffix():
+    assert strip_compression_suffix("a.out.gz") == "a.out"
+    assert strip_compression_suffix("a.xyz.ZST") == "a.xyz"
+    assert strip_compression_suffix("a.xyz") == "a.xyz"
+
+
+def test_raw_text_reads_byte_range_on_demand(tmp_path):
+    from qmanalysis.fileopener import RawText, materialize_raw_text
+    path = tmp_path / "water.xyz.gz"
+    path.write_bytes(gzip.compress(CONTENT))
+    raw = RawText(path, 2, 7)
+    assert str(raw) == "water"
+    assert str(RawText(path)) == CONTENT.decode()
+    assert materialize_raw_text(raw) == "water"
+    assert materialize_raw_text(1.5) == 1.5
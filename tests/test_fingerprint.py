@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from qmanalysis.fingerprint import geometry_fingerprints
+
+
+def atom_data_for(frames):
+    class DummyAtomData:
+        pass
+    atom_data = DummyAtomData()
+    rows, index = [], []
+    for name, symbols, coords in frames:
+        for i, (symbol, xyz) in enumerate(zip(symbols, coords), start=1):
+            index.append((name, f"{name}.xyz", None, i))
+            rows.append((symbol, *xyz))
+    atom_data.dataframe = pd.DataFrame(rows, columns=["element", "x", "y", "z"], index=pd.MultiIndex.from_tuples(
+        index, names=["file_name", "file_path", "timestep_name", "atom_index"]))
+    return atom_data
+
+
+def test_fingerprints_are_invariant_to_rigid_motion_and_order():
+    rng = np.random.default_rng(0)
+    coords = rng.normal(size=(6, 3))
+    symbols = ["C", "C", "O", "H", "H", "H"]
+    rotation, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+    moved = coords @ rotation.T + [1.0, 2.0, 3.0]
+    permuted = [5, 3, 0, 1, 4, 2]
+    changed = coords.copy()
+    changed[0, 0] += 0.3
+    fingerprints = geometry_fingerprints(atom_data_for([
+        ("a", symbols, coords),
+        ("moved", symbols, moved),
+        ("permuted", [symbols[i] for i in permuted], coords[permuted]),
+        ("changed", symbols, changed),
+        ("other_elements", ["N"] + symbols[1:], coords),
+        ("smaller", symbols[:5], coords[:5]),
+    ]), tolerance=0.001)
+    assert fingerprints.iloc[0] == fingerprints.iloc[1] == fingerprints.iloc[2]
+    assert len(set(fingerprints.iloc[2:])) == 4
+    assert list(fingerprints.index.get_level_values("file_name"))[0] == "a"
+
+
+def test_enantiomers_get_different_fingerprints():
+    # CHFClBr on a distorted tetrahedron and its mirror image
+    symbols = ["C", "H", "F", "Cl", "Br"]
+    coords = np.array([[0.0, 0.0, 0.0], [0.63, 0.63, 0.63], [-0.8, -0.8, 0.8],
+                       [-1.0, 1.0, -1.0], [1.1, -1.1, -1.1]])
+    mirrored = coords * [-1.0, 1.0, 1.0]
+    rotation, _ = np.linalg.qr(np.random.default_rng(1).normal(size=(3, 3)))
+    rotation *= np.sign(np.linalg.det(rotation))
+    fingerprints = geometry_fingerprints(atom_data_for([
+        ("R", symbols, coords),
+        ("S", symbols, mirrored),
+        ("R_moved", symbols[::-1], coords[::-1] @ rotation.T + 2.0),
+    ]))
+    assert fingerprints["R"].iloc[0] != fingerprints["S"].iloc[0]
+    assert fingerprints["R"].iloc[0] == fingerprints["R_moved"].iloc[0]
+
+
+def test_achiral_structures_have_no_handedness():
+    from qmanalysis.fingerprint import chirality_signs
+    # Water (mirror planes), ethane-like staggered points (inversion centre), CO2 (linear)
+    water = [[0.0, 0.0, 0.12], [0.0, 0.76, -0.47], [0.0, -0.76, -0.47]]
+    inversion = [[0.3, 0.5, 0.9], [-0.3, -0.5, -0.9], [1.2, -0.4, 0.1]]
+    inversion.append([-1.2, 0.4, -0.1])
+    assert chirality_signs(np.array([water]), np.array([[8, 1, 1]])).tolist() == [0]
+    assert chirality_signs(np.array([inversion]), np.array([[6, 6, 1, 1]])).tolist() == [0]
+    co2 = [[0.0, 0.0, 0.0], [0.0, 0.0, 1.16], [0.0, 0.0, -1.16]]
+    assert chirality_signs(np.array([co2]), np.array([[6, 8, 8]])).tolist() == [0]
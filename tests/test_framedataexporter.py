@@ -0,0 +1,81 @@
+import gzip
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from qmanalysis.containers import FrameData
+from qmanalysis.framedataexporter import FrameDataExporter, tuple_labels
+
+
+@pytest.fixture
+def frame_data():
+    frame_data = FrameData()
+    n = 10
+    index = pd.MultiIndex.from_arrays([[f"f{i % 3}" for i in range(n)],
+                                       [Path(f"/d/f{i}.xyz") if i % 2 else f"/d/f{i}.xyz" for i in range(n)],
+                                       [None if i % 4 else f"s{i}" for i in range(n)]],
+                                      names=frame_data.dataframe.index.names)
+    frame_data.dataframe = pd.DataFrame({"raw_data": ["text"] * n, "HF": np.arange(n, dtype=float)},
+                                        index=index)
+    frame_data.constants = {"pi": 3.14}
+    return frame_data
+
+
+def test_tuple_labels_match_str_of_tuples(frame_data):
+    index = frame_data.dataframe.index[2:7]
+    expected = [str(t) for t in frame_data.dataframe.iloc[2:7].reset_index()[list(index.names)]
+                .apply(tuple, axis=1)]
+    assert list(tuple_labels(index)) == expected
+
+
+@pytest.mark.parametrize("method", ["export_csv_tuples", "export_csv_multiindex"])
+def test_chunked_export_matches_single_chunk(tmp_path, frame_data, method):
+    getattr(FrameDataExporter(frame_data), method)(tmp_path / "one.csv")
+    getattr(FrameDataExporter(frame_data, chunk_rows=3), method)(tmp_path / "chunked.csv")
+    assert (tmp_path / "one.csv").read_text() == (tmp_path / "chunked.csv").read_text()
+    assert "text" not in (tmp_path / "one.csv").read_text()
+    assert "pi" in (tmp_path / "one.csv").read_text().splitlines()[0]
+
+
+def test_gzip_export_with_append(tmp_path, frame_data):
+    exporter = FrameDataExporter(frame_data, chunk_rows=4)
+    exporter.export_csv_multiindex(tmp_path / "plain.csv")
+    exporter.export_csv_multiindex(tmp_path / "plain.csv", append=True)
+    exporter.export_csv_multiindex(tmp_path / "out.csv.gz")
+    exporter.export_csv_multiindex(tmp_path / "out.csv.gz", append=True)
+    exporter.export_csv_multiindex(tmp_path / "forced.csv", compression="gzip")
+    text = gzip.decompress((tmp_path / "out.csv.gz").read_bytes()).decode()
+    assert text == (tmp_path / "plain.csv").read_text()
+    assert gzip.decompress((tmp_path / "forced.csv").read_bytes())
+    assert len(text.splitlines()) == 1 + 2 * len(frame_data.dataframe)
+
+
+def test_workbook_sheets(tmp_path, frame_data):
+    from qmanalysis.containers import AtomData
+    atom_data = AtomData()
+    atom_index = pd.MultiIndex.from_tuples([("f0", "/d/f0.xyz", None, 1), ("f0", "/d/f0.xyz", None, 2)],
+                                           names=atom_data.dataframe.index.names)
+    atom_data.dataframe = pd.DataFrame({"element": ["C", "H"], "x": [0.0, 1.1]}, index=atom_index)
+    measurements = {"distance": [{"name": "CH", "a": 1, "b": 2}],
+                    "angle": [{"name": "HCH", "a": 2, "b": 1, "c": 3}]}
+    path = tmp_path / "out.xlsx"
+    FrameDataExporter(frame_data, chunk_rows=3).export_workbook(
+        path, sheets=["frames", "atoms", "measurements"], atom_data=atom_data, measurements=measurements)
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ["frames", "atoms", "measurements"]
+    frames = sheets["frames"]
+    assert list(frames.columns) == ["label", "HF", "pi", "label.1"]
+    assert list(frames["label"]) == list(tuple_labels(frame_data.dataframe.index))
+    assert frames["HF"].tolist() == frame_data.dataframe["HF"].tolist()
+    assert list(sheets["atoms"]["element"]) == ["C", "H"]
+    assert sheets["measurements"]["type"].tolist() == ["distance", "angle"]
+    assert sheets["measurements"]["c"].isna().tolist() == [True, False]
+
+
+def test_workbook_multiindex_and_unknown_sheet(tmp_path, frame_data):
+    FrameDataExporter(frame_data).export_xls_multiindex(tmp_path / "multi.xlsx")
+    frames = pd.read_excel(tmp_path / "multi.xlsx")
+    assert list(frames.columns[:3]) == list(frame_data.dataframe.index.names)
+    assert frames["timestep_name"].isna().sum() == frame_data.dataframe.index.get_level_values(2).isna().sum()
+    with pytest.raises(ValueError):
+        FrameDataExporter(frame_data).export_workbook(tmp_path / "bad.xlsx", sheets=["nope"])
@@ -0,0 +1,154 @@
+import gzip
+import pandas as pd
+import pytest
+from benchmarks.synthetic import gaussian_log_text
+from qmanalysis.containers import AtomData, FrameData
+from qmanalysis.gaussianoutreader import GaussianOutFile
+
+
+def read(path, **kwargs):
+    atom_data = AtomData()
+    frame_data = FrameData()
+    GaussianOutFile(atom_data, frame_data, str(path),
+                    file_name="opt", timestep_name="final", **kwargs)
+    return atom_data.dataframe, frame_data.dataframe
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "opt.out"
+    path.write_text(gaussian_log_text(n_atoms=12, n_steps=6, seed=3))
+    return path
+
+
+def test_reads_last_geometry_and_archive(log_path):
+    atoms, frames = read(log_path)
+    assert len(atoms) == 12
+    row = frames.iloc[0]
+    assert row["HF"] < -100.0
+    assert row["nimag"] == 0
+    assert str(row["raw_data"]) == log_path.read_text()
+
+
+def test_archive_only_matches_full_read(log_path, monkeypatch):
+    # Force several backwards reads
+    monkeypatch.setattr(
+        "qmanalysis.gaussianoutreader.TAIL_BLOCK_SIZE", 256)
+    full_atoms, full_frames = read(log_path)
+    tail_atoms, tail_frames = read(log_path, mode="archive_only")
+    pd.testing.assert_frame_equal(full_atoms, tail_atoms)
+    columns = full_frames.columns.drop("raw_data")
+    pd.testing.assert_frame_equal(full_frames[columns], tail_frames[columns])
+    tail_text = str(tail_frames.iloc[0]["raw_data"])
+    assert log_path.read_text().endswith(tail_text)
+    assert "Standard orientation" in tail_text and len(tail_text) < len(log_path.read_text())
+
+
+def test_archive_only_reads_compressed_and_buffered_input(log_path, tmp_path):
+    full_atoms, _ = read(log_path)
+    gz_path = tmp_path / "opt.out.gz"
+    gz_path.write_bytes(gzip.compress(log_path.read_bytes()))
+    atoms, _ = read(gz_path, mode="archive_only")
+    assert atoms[["x", "y", "z"]].to_numpy().tolist() == \
+        full_atoms[["x", "y", "z"]].to_numpy().tolist()
+    atoms, _ = read(log_path, mode="archive_only", data=log_path.read_bytes())
+    assert len(atoms) == 12
+
+
+def test_unknown_mode(log_path):
+    with pytest.raises(ValueError):
+        read(log_path, mode="fast")
+
+
+def test_optional_archive_fields(log_path):
+    _, frames = read(log_path, archive_fields=[
+                     "Version", "State", "PG", "Dipole", "RMSF", "Quadrupole"])
+    row = frames.iloc[0]
+    assert row["Version"] == "ES64L-G16RevC.01"
+    assert row["State"] == "1-A"
+    assert row["PG"] == "C01 [X(C6H6)]"
+    assert row["Dipole"] == (0.1, -0.2, 0.3)
+    assert pd.isna(row["Quadrupole"])
+    # Standard columns are not duplicated
+    assert list(frames.columns).count("RMSF") == 1
+
+
+def test_parse_archive_fields():
+    from qmanalysis.gaussianoutreader import parse_archive_fields, convert_archive_value
+    fields = parse_archive_fields(
+        ["1", "1", "GINC", "", "Version=EM64L", "HF=-1.5", "hf=2", "Dipole=1,2,3"])
+    assert fields == {"version": "EM64L", "hf": "-1.5", "dipole": "1,2,3"}
+    assert convert_archive_value(fields["hf"]) == -1.5
+    assert convert_archive_value(fields["dipole"]) == (1.0, 2.0, 3.0)
+
+
+def test_all_frames_become_timesteps(log_path):
+    atoms, frames = read(log_path, frames="all")
+    names = frames.index.get_level_values("timestep_name")
+    assert list(names) == [f"final_step{i:04d}" for i in range(1, 7)]
+    assert len(atoms) == 6 * 12
+    energies = frames["energy"].to_numpy(dtype=float)
+    assert (energies[1:] < energies[:-1]).all()
+    # Archive values belong to the final geometry only
+    assert frames["HF"].isna().sum() == 5
+    assert frames.iloc[-1]["energy"] == pytest.approx(frames.iloc[-1]["HF"])
+    final_atoms = atoms.xs("final_step0006", level="timestep_name")
+    last_atoms, _ = read(log_path)
+    assert final_atoms[["x", "y", "z"]].to_numpy().tolist() == \
+        last_atoms[["x", "y", "z"]].to_numpy().tolist()
+
+
+def test_frame_stride(log_path):
+    _, frames = read(log_path, frames="1::2")
+    assert list(frames.index.get_level_values("timestep_name")) == \
+        ["final_step0002", "final_step0004", "final_step0006"]
+
+
+def test_frames_with_archive_only_is_rejected(log_path):
+    with pytest.raises(ValueError):
+        read(log_path, frames="all", mode="archive_only")
+    with pytest.raises(ValueError):
+        read(log_path, frames="1:2:3:4")
+
+
+@pytest.mark.parametrize("frames", [5, "5", True])
+def test_bare_frame_number_is_rejected(frames):
+    from qmanalysis.gaussianoutreader import parse_frame_selection
+    with pytest.raises(ValueError):
+        parse_frame_selection(frames)
+    assert parse_frame_selection("5:6") == slice(5, 6)
+
+
+def test_eager_raw_data(log_path):
+    _, frames = read(log_path, raw_data="eager")
+    assert frames.iloc[0]["raw_data"] == log_path.read_text().rstrip("\n")
+    with pytest.raises(ValueError):
+        read(log_path, raw_data="sometimes")
+
+
+def test_normal_modes(tmp_path):
+    path = tmp_path / "freq.out"
+    path.write_text(gaussian_log_text(n_atoms=5, n_steps=2, seed=4, frequencies=True))
+    _, frames = read(path)
+    row = frames.iloc[0]
+    assert len(row["frequencies"]) == 9
+    assert (row["frequencies"][1:] >= row["frequencies"][:-1]).all()
+    for column in ("reduced_masses", "ir_intensities", "raman_activities"):
+        assert row[column].shape == (9,)
+    assert row["symmetry_number"] == 1
+    _, tail_frames = read(path, mode="archive_only")
+    assert tail_frames.iloc[0]["frequencies"].tolist() == row["frequencies"].tolist()
+    # Modes belong to the final geometry only
+    _, all_frames = read(path, frames="all")
+    assert all_frames["frequencies"].isna().tolist() == [True, False]
+    # Logs without a frequency job get no mode columns
+    plain_path = tmp_path / "plain.out"
+    plain_path.write_text(gaussian_log_text(n_atoms=5, n_steps=2, seed=4))
+    _, plain = read(plain_path)
+    assert "frequencies" not in plain.columns
+
+
+def test_parse_mode_values():
+    from qmanalysis.gaussianoutreader import parse_mode_values
+    values = parse_mode_values("  12.5   ********  -3.0")
+    assert values[0] == 12.5 and pd.isna(values[1]) and values[2] == -3.0
@@ -30,10 +30,11 @@ def write_file(path, content):
         f.write(content)
 
 
-def run_cli(yaml_path, root=None):
+def run_cli(yaml_path, root=None, extra_args=()):
     cmd = [sys.executable, "-m", "src.main", yaml_path]
     if root:
         cmd.extend(["-rp", root])
+    cmd.extend(extra_args)
     return subprocess.run(cmd, capture_output=True, text=True)
 
 
@@ -85,4 +86,59 @@ def test_invalid_file_type(tmp_path):
     result = run_cli(str(yaml_path), root=str(tmp_path))
     assert result.returncode != 0 or "unknown" in result.stderr.lower()
 
+def test_streaming_matches_in_memory(tmp_path):
+    yaml = TEST_YAML_MINIMAL.replace("path: test.xyz\n    type: xyz", "path: \"t*.xyz\"\n    type: xyz\n    name: t-\n    glob: True")
+    yaml = yaml.replace("output: []", """measurements:
+  distance:
+    - name: d
+      a: 1
+      b: 3
+output:
+  - file:
+    - path: ./out.csv
+      type: csv
+""")
+    write_file(tmp_path / "test.yaml", yaml)
+    for i in range(5):
+        write_file(tmp_path / f"t{i}.xyz", TEST_XYZ)
+    result = run_cli(str(tmp_path / "test.yaml"), root=str(tmp_path))
+    assert result.returncode == 0
+    in_memory = (tmp_path / "out.csv").read_text()
+    result = run_cli(str(tmp_path / "test.yaml"), root=str(tmp_path),
+                     extra_args=["--chunk-size", "2"])
+    assert result.returncode == 0
+    assert (tmp_path / "out.csv").read_text() == in_memory
+    result = run_cli(str(tmp_path / "test.yaml"), root=str(tmp_path),
+                     extra_args=["--prefetch", "3", "--io-workers", "2"])
+    assert result.returncode == 0
+    assert (tmp_path / "out.csv").read_text() == in_memory
+
+
+def test_profile_cprofile_without_report(tmp_path):
+    write_file(tmp_path / "test.yaml", TEST_YAML_MINIMAL)
+    write_file(tmp_path / "test.xyz", TEST_XYZ)
+    result = run_cli(str(tmp_path / "test.yaml"), root=str(tmp_path),
+                     extra_args=["--profile-cprofile", str(tmp_path / "prof")])
+    assert result.returncode == 0, result.stderr
+    stages = [path.stem.split("_", 1)[1] for path in sorted((tmp_path / "prof").glob("*.prof"))]
+    assert "load_files" in stages and "plotting" in stages
+
+
+def test_glob_reads_compressed_files(tmp_path):
+    import gzip
+    yaml = TEST_YAML_MINIMAL.replace("path: test.xyz\n    type: xyz", "path: \"t*.xyz\"\n    type: xyz\n    name: t-\n    glob: True")
+    yaml = yaml.replace("output: []", """output:
+  - file:
+    - path: ./out.csv
+      type: csv
+""")
+    write_file(tmp_path / "test.yaml", yaml)
+    write_file(tmp_path / "t0.xyz", TEST_XYZ)
+    (tmp_path / "t1.xyz.gz").write_bytes(gzip.compress(TEST_XYZ.encode()))
+    result = run_cli(str(tmp_path / "test.yaml"), root=str(tmp_path))
+    assert result.returncode == 0
+    out = (tmp_path / "out.csv").read_text()
+    assert "t-t0" in out and "t-t1" in out
+
+
 # More integration tests can be added for plotting, globbing, etc.
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis import kernels
+from qmanalysis.measure import Measure
+
+BACKENDS = ["numpy", pytest.param("numba", marks=pytest.mark.skipif(
+    not kernels.numba_available(), reason="numba is not installed"))]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = kernels.get_backend()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+@pytest.fixture
+def frames():
+    return np.random.default_rng(0).normal(size=(4, 20, 3))
+
+
+def single(method, coords):
+    class DummyAtomData:
+        pass
+    atom_data = DummyAtomData()
+    atom_data.dataframe = pd.DataFrame(coords, columns=["x", "y", "z"])
+    return getattr(Measure(), method)(atom_data, *range(len(coords)))
+
+
+@pytest.mark.parametrize("method, batch, atoms", [("distance", "distances", 2),
+                                                   ("angle", "angles", 3),
+                                                   ("dihedral", "dihedrals", 4)])
+def test_batch_matches_single_measurements(backend, frames, method, batch, atoms):
+    values = getattr(Measure(), batch)(*frames[:atoms])
+    expected = [single(method, frames[:atoms, i]) for i in range(frames.shape[1])]
+    np.testing.assert_allclose(values, expected, rtol=1e-10)
+
+
+def test_layout_kernels_match_numpy(backend):
+    rng = np.random.default_rng(1)
+    points, centers = rng.uniform(size=(30, 2)), rng.uniform(size=(30, 2))
+    diff = points[:, None] - points[None]
+    dist2 = (diff ** 2).sum(-1)[~np.eye(30, dtype=bool)]
+    assert kernels.pair_repulsion(points) == pytest.approx(np.sum(1.0 / (dist2 + 1e-9)))
+    d = np.linalg.norm(points[:, None] - centers[None], axis=-1)
+    assert kernels.center_repulsion(points, centers, 500.0) == pytest.approx(
+        np.sum(500.0 / (d ** 6 + 1e-9)))
+
+
+def test_prune_close(backend):
+    positions = np.array([[0.0, 0.0], [0.05, 0.0], [1.0, 0.0], [0.1, 0.0], [1.02, 0.0]])
+    assert list(kernels.prune_close(positions, 0.08)) == [True, False, True, True, False]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        kernels.set_backend("cuda")
+
+
+@pytest.mark.parametrize("kernel, atoms", [("angles", 3), ("dihedrals", 4)])
+def test_degenerate_input_matches_across_backends(kernel, atoms):
+    # Coincident atoms and collinear fragments have zero-length vectors
+    a = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    b = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    c = np.array([[1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    d = np.array([[2.0, 0.0, 0.0], [3.0, 0.0, 0.0], [2.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    points = [a, b, c, d][:atoms]
+    previous = kernels.get_backend()
+    results = {}
+    try:
+        for name in ["numpy", "numba"] if kernels.numba_available() else ["numpy"]:
+            kernels.set_backend(name)
+            results[name] = getattr(kernels, kernel)(*points)
+    finally:
+        kernels.set_backend(previous)
+    assert np.isnan(results["numpy"]).any()
+    for values in results.values():
+        np.testing.assert_allclose(values, results["numpy"], equal_nan=True)
+
+
+def test_run_measurements_matches_single_measurements_per_timestep(backend):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import resolve_atom, run_measurements
+    rng = np.random.default_rng(2)
+    keys = [("a", "a.out", f"step{k}") for k in range(3)] + [("b", "b.xyz", None)]
+    atom_data, frame_data = AtomData(), FrameData()
+    atom_data.dataframe = pd.DataFrame(
+        rng.normal(size=(4 * len(keys), 3)), columns=["x", "y", "z"],
+        index=pd.MultiIndex.from_tuples([key + (i,) for key in keys for i in range(1, 5)],
+                                        names=atom_data.dataframe.index.names))
+    atom_data.dataframe["alias"] = [str(i) for _ in keys for i in range(1, 5)]
+    frame_data.dataframe = pd.DataFrame(
+        {"HF": np.zeros(len(keys))},
+        index=pd.MultiIndex.from_tuples(keys, names=frame_data.dataframe.index.names))
+    yamldata = {"measurements": {"distance": [{"name": "d", "a": 1, "b": 2}],
+                                 "angle": [{"name": "a", "a": 1, "b": 2, "c": 3}],
+                                 "dihedral": [{"name": "t", "a": 1, "b": 2, "c": 3, "d": 4}]}}
+    run_measurements(yamldata, atom_data, frame_data)
+    measure = Measure()
+    for file_name, _, timestep in keys:
+        atoms = [resolve_atom(atom_data, i, timestep, file_name) for i in (1, 2, 3, 4)]
+        row = frame_data.dataframe.xs((file_name, timestep), level=["file_name", "timestep_name"]).iloc[0]
+        assert row["d"] == pytest.approx(measure.distance(atom_data, *atoms[:2]), rel=1e-10)
+        assert row["a"] == pytest.approx(measure.angle(atom_data, *atoms[:3]), rel=1e-10)
+        assert row["t"] == pytest.approx(measure.dihedral(atom_data, *atoms), rel=1e-10)
+    assert frame_data.dataframe["d"].nunique() == len(keys)
@@ -0,0 +1,316 @@
+import pytest
+import pandas as pd
+from pathlib import Path
+from src.main import chunk_entries, expand_files
+
+
+def test_expand_files_glob(tmp_path):
+    for name in ["a1.xyz", "a2.xyz"]:
+        (tmp_path / name).write_text("1\nc\nH 0 0 0\n")
+    files = [{"path": "consts.csv", "type": "global_constants_csv"},
+             {"path": "a*.xyz", "type": "xyz", "name": "a-", "glob": True}]
+    entries = expand_files(files, root_path=str(tmp_path))
+    assert entries[0] == (files[0], None, None)
+    assert sorted(name for _, _, name in entries[1:]) == ["a-a1", "a-a2"]
+
+
+def test_chunk_entries_keeps_constants_in_every_chunk():
+    xyz = {"type": "xyz"}
+    consts = {"type": "per_file_constants_csv"}
+    entries = [(xyz, "a", "a"), (xyz, "b", "b"), (consts, None, None), (xyz, "c", "c")]
+    chunks = list(chunk_entries(entries, 2))
+    assert len(chunks) == 2
+    assert [e[1] for e in chunks[0]] == ["a", "b", None]
+    assert [e[1] for e in chunks[1]] == [None, "c"]
+
+
+def test_import_does_not_load_plotting_or_scipy():
+    import subprocess
+    import sys
+    code = ("import sys, src.main; "
+            "print(any(m in sys.modules for m in ('matplotlib', 'scipy', 'strictyaml', 'asteval')))")
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_load_files_with_cache_matches_direct_read(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from qmanalysis.server import ParsedFileCache
+    from src.main import load_files
+    for name in ["a1.xyz", "a2.xyz"]:
+        (tmp_path / name).write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    yamldata = {"files": [{"path": "a*.xyz", "type": "xyz", "name": "a-", "glob": True}]}
+    direct_atoms, direct_frames = AtomData(), FrameData()
+    load_files(yamldata, direct_atoms, direct_frames, root_path=str(tmp_path))
+    cache = ParsedFileCache()
+    for _ in range(2):
+        atoms, frames = AtomData(), FrameData()
+        load_files(yamldata, atoms, frames, root_path=str(tmp_path), file_cache=cache)
+        assert sorted(atoms.dataframe.index) == sorted(direct_atoms.dataframe.index)
+        assert sorted(frames.dataframe.index) == sorted(direct_frames.dataframe.index)
+    assert cache.hits == 2
+
+
+def test_identical_files_are_parsed_once(tmp_path, monkeypatch):
+    import pandas as pd
+    import src.main as main_module
+    from qmanalysis.containers import AtomData, FrameData
+    for name in ["a1.xyz", "a2.xyz", "a3.xyz"]:
+        (tmp_path / name).write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    (tmp_path / "a3.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.80\n")
+    yamldata = {"files": [{"path": "a*.xyz", "type": "xyz", "name": "a-", "glob": True}]}
+    calls = []
+    reader = main_module.COORDINATE_READERS["xyz"]
+
+    def counting_reader(*args, **kwargs):
+        calls.append(kwargs["file_path"])
+        return reader(*args, **kwargs)
+    monkeypatch.setitem(main_module.COORDINATE_READERS, "xyz", counting_reader)
+    shared_atoms, shared_frames = AtomData(), FrameData()
+    main_module.load_files(yamldata, shared_atoms, shared_frames, root_path=str(tmp_path))
+    assert len(calls) == 2
+    atoms, frames = AtomData(), FrameData()
+    main_module.load_files(yamldata, atoms, frames, root_path=str(tmp_path), dedupe=False)
+    assert len(calls) == 5
+    pd.testing.assert_frame_equal(shared_atoms.dataframe.sort_index(), atoms.dataframe.sort_index())
+    assert set(shared_frames.dataframe.index.get_level_values("file_name")) == {"a-a1", "a-a2", "a-a3"}
+
+
+def test_shared_blocks_are_relabelled_without_copying_and_counted(tmp_path):
+    import numpy as np
+    from qmanalysis.containers import AtomData, FrameData
+    from qmanalysis.profiler import StageProfiler
+    from src.main import load_files, relabel_block
+    for name in ["a1.xyz", "a2.xyz"]:
+        (tmp_path / name).write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    yamldata = {"files": [{"path": "a*.xyz", "type": "xyz", "glob": True}]}
+    profiler = StageProfiler(enabled=True)
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path), profiler=profiler)
+    assert [rec["rows"] for rec in profiler.records if rec["stage"] == "load"] == [2, 2]
+    file_names = atoms.dataframe.index.get_level_values("file_name")
+    block = atoms.dataframe[file_names == file_names[0]]
+    relabelled = relabel_block(block, "copy", "copy.xyz")
+    assert set(relabelled.index.get_level_values("file_name")) == {"copy"}
+    assert np.shares_memory(relabelled["x"].to_numpy(), block["x"].to_numpy())
+
+
+def test_archive_only_logs_are_not_prefetched(tmp_path, monkeypatch):
+    import src.main as main_module
+    from benchmarks.synthetic import gaussian_log_text
+    from qmanalysis.containers import AtomData, FrameData
+    (tmp_path / "opt.out").write_text(gaussian_log_text(n_atoms=4, n_steps=3, seed=1))
+    (tmp_path / "a.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    yamldata = {"files": [{"path": "opt.out", "type": "gaussian_out", "mode": "archive_only"},
+                          {"path": "a.xyz", "type": "xyz"},
+                          {"path": "opt.out", "type": "gaussian_out", "name": "full"}]}
+    prefetched = []
+
+    class RecordingPrefetcher(main_module.Prefetcher):
+        def __init__(self, file_paths, **kwargs):
+            super().__init__(file_paths, **kwargs)
+            prefetched.extend(self.file_paths)
+    monkeypatch.setattr(main_module, "Prefetcher", RecordingPrefetcher)
+    atoms, frames = AtomData(), FrameData()
+    main_module.load_files(yamldata, atoms, frames, root_path=str(tmp_path), prefetch=2)
+    assert [Path(path).name for path in prefetched] == ["a.xyz", "opt.out"]
+    assert set(frames.dataframe.index.get_level_values("file_name")) == {"opt.out", "a.xyz", "full"}
+
+
+def test_global_constants_are_scalars_until_export(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import FrameDataExporter, load_files
+    (tmp_path / "a.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    (tmp_path / "globals.csv").write_text("name,value\npi,3.1415\nkB,3.86\n")
+    yamldata = {"files": [{"path": "globals.csv", "type": "global_constants_csv"},
+                          {"path": "a.xyz", "type": "xyz"}]}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    assert frames.constants == {"pi": 3.1415, "kB": 3.86}
+    assert "pi" not in frames.dataframe.columns
+    FrameDataExporter(frames).export_csv_multiindex(tmp_path / "out.csv")
+    header = (tmp_path / "out.csv").read_text().splitlines()[0].split(",")
+    assert header[-2:] == ["pi", "kB"]
+
+
+def test_mass_descriptor_measurements(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_measurements
+    (tmp_path / "h2.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    (tmp_path / "hd.xyz").write_text("2\nc\nH 0 0 0\nO 0 0 1.0\n")
+    yamldata = {"files": [{"path": "h2.xyz", "type": "xyz"}, {"path": "hd.xyz", "type": "xyz"}],
+                "measurements": {"distance": [{"name": "d", "a": 1, "b": 2}],
+                                 "center_of_mass": [{"name": "com"}],
+                                 "principal_moments": [{"name": "I"}],
+                                 "radius_of_gyration": [{"name": "rg"}]}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_measurements(yamldata, atoms, frames)
+    df = frames.dataframe.droplevel(["file_path", "timestep_name"])
+    assert df.loc["h2.xyz", "com_z"] == pytest.approx(0.37)
+    assert df.loc["h2.xyz", "rg"] == pytest.approx(0.37)
+    assert df.loc["h2.xyz", "I_1"] == pytest.approx(0.0, abs=1e-12)
+    assert df.loc["hd.xyz", "com_z"] == pytest.approx(15.999 / (15.999 + 1.008))
+    assert list(df["d"]) == pytest.approx([0.74, 1.0])
+
+
+def test_measurements_use_the_geometry_of_every_timestep(tmp_path):
+    import numpy as np
+    from benchmarks.synthetic import gaussian_log_text
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_measurements
+    (tmp_path / "opt.out").write_text(gaussian_log_text(n_atoms=6, n_steps=4, seed=2))
+    yamldata = {"files": [{"path": "opt.out", "type": "gaussian_out", "frames": "all"}],
+                "measurements": {"distance": [{"name": "d12", "a": 1, "b": 2}],
+                                 "angle": [{"name": "a123", "a": 1, "b": 2, "c": 3}]}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_measurements(yamldata, atoms, frames)
+    xyz = atoms.dataframe[["x", "y", "z"]]
+    expected = []
+    for timestep in frames.dataframe.index.get_level_values("timestep_name"):
+        coords = xyz.xs(timestep, level="timestep_name").to_numpy()
+        expected.append(np.linalg.norm(coords[0] - coords[1]))
+    assert len(expected) == 4 and len(set(np.round(expected, 6))) == 4
+    assert list(frames.dataframe["d12"]) == pytest.approx(expected)
+    assert frames.dataframe["a123"].nunique() == 4
+
+
+def test_connectivity_stage(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_connectivity
+    (tmp_path / "h2o.xyz").write_text("3\nc\nO 0 0 0\nH 0.96 0 0\nH -0.24 0.93 0\n")
+    yamldata = {"files": [{"path": "h2o.xyz", "type": "xyz"}],
+                "connectivity": {"measurements": True}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_connectivity(yamldata, atoms, frames)
+    row = frames.dataframe.iloc[0]
+    assert row["n_bonds"] == 2
+    assert row["bond_1_2"] == pytest.approx(0.96)
+    assert 100 < row["angle_2_1_3"] < 110
+
+
+def test_clustering_stage(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_clustering
+    (tmp_path / "a.xyz").write_text("3\nc\nO 0 0 0\nH 0.96 0 0\nH -0.24 0.93 0\n")
+    (tmp_path / "b.xyz").write_text("3\nc\nO 5 5 5\nH 5 5.96 5\nH 5 4.76 5.93\n")
+    (tmp_path / "c.xyz").write_text("3\nc\nO 0 0 0\nH 1.50 0 0\nH -0.24 0.93 0\n")
+    yamldata = {"files": [{"path": "*.xyz", "type": "xyz", "glob": True}],
+                "clustering": {"threshold": 0.05}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_clustering(yamldata, atoms, frames)
+    clusters = frames.dataframe["cluster_id"].droplevel(["file_path", "timestep_name"])
+    assert clusters["a"] == clusters["b"] != clusters["c"]
+    with pytest.raises(ValueError):
+        run_clustering({"clustering": {"workers": 2}}, atoms, frames)
+
+
+@pytest.mark.parametrize("action", ["drop", "flag"])
+def test_deduplicate_stage(tmp_path, action):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_deduplicate
+    (tmp_path / "a.xyz").write_text("3\nc\nO 0 0 0\nH 0.96 0 0\nH -0.24 0.93 0\n")
+    (tmp_path / "a_copy.xyz").write_text("3\nc\nO 5 5 5\nH 5 5.96 5\nH 5 4.76 5.93\n")
+    (tmp_path / "b.xyz").write_text("3\nc\nO 0 0 0\nH 1.50 0 0\nH -0.24 0.93 0\n")
+    yamldata = {"files": [{"path": "*.xyz", "type": "xyz", "glob": True}],
+                "deduplicate": {"action": action}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    seen = set()
+    run_deduplicate(yamldata, atoms, frames, seen=seen)
+    names = list(frames.dataframe.index.get_level_values("file_name"))
+    if action == "drop":
+        assert names == ["a", "b"]
+        assert set(atoms.dataframe.index.get_level_values("file_name")) == {"a", "b"}
+    else:
+        assert dict(zip(names, frames.dataframe["duplicate"])) == {"a": False, "a_copy": True, "b": False}
+    assert len(seen) == 2
+    # A later chunk with the same geometry only has repeats
+    run_deduplicate(yamldata, atoms, frames, seen=seen)
+    assert frames.dataframe.empty if action == "drop" else frames.dataframe["duplicate"].all()
+
+
+def test_thermochemistry_stage(tmp_path):
+    from benchmarks.synthetic import gaussian_log_text
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_calculations, run_thermochemistry
+    (tmp_path / "freq.out").write_text(gaussian_log_text(n_atoms=4, n_steps=1, frequencies=True))
+    (tmp_path / "h2.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    yamldata = {"files": [{"path": "freq.out", "type": "gaussian_out"}, {"path": "h2.xyz", "type": "xyz"}],
+                "thermochemistry": {"temperatures": [298.15, 400]},
+                "calc": [{"name": "dG", "expr": "G_400 - G_298.15"}]}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_thermochemistry(yamldata, atoms, frames)
+    run_calculations(yamldata, frames)
+    df = frames.dataframe.droplevel(["file_path", "timestep_name"])
+    row = df.loc["freq.out"]
+    assert row["H_298.15"] > row["HF"] + row["zpe_correction"] > row["G_298.15"] > row["G_400"]
+    assert row["dG"] == pytest.approx(row["G_400"] - row["G_298.15"])
+    assert df.loc["h2.xyz", ["zpe_correction", "G_298.15"]].isna().all()
+
+
+def test_spectra_stage(tmp_path):
+    import numpy as np
+    from benchmarks.synthetic import write_gaussian_logs
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_spectra
+    write_gaussian_logs(tmp_path, 3, n_atoms=4, n_steps=1, frequencies=True)
+    yamldata = {"files": [{"path": "*.out", "type": "gaussian_out", "glob": True}],
+                "spectra": [{"type": "ir", "path": "ir.npz", "plot": "ir.png", "range": [0, 3600]},
+                            {"type": "raman", "path": "raman.npz", "lineshape": "gaussian",
+                             "energy": None}]}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_spectra(yamldata, frames, root_path=str(tmp_path))
+    with np.load(tmp_path / "ir.npz") as ir:
+        assert ir["spectra"].shape == (3, 3601)
+        assert ir["weights"].sum() == pytest.approx(1.0)
+    with np.load(tmp_path / "raman.npz") as raman:
+        assert raman["weights"].tolist() == pytest.approx([1 / 3] * 3)
+    assert (tmp_path / "ir.png").stat().st_size > 0
+
+
+def test_aggregate_stage(tmp_path):
+    from qmanalysis.containers import AtomData, FrameData
+    from src.main import load_files, run_aggregate, run_measurements
+    (tmp_path / "a_1.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    (tmp_path / "a_2.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.80\n")
+    (tmp_path / "b_1.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.90\n")
+    yamldata = {"files": [{"path": "*.xyz", "type": "xyz", "glob": True}],
+                "measurements": {"distance": [{"name": "d", "a": 1, "b": 2}]},
+                "aggregate": {"pattern": "^(\\w)_", "columns": ["d"], "energy": None,
+                              "path": "summary.csv"}}
+    atoms, frames = AtomData(), FrameData()
+    load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    run_measurements(yamldata, atoms, frames)
+    summary, = run_aggregate(yamldata, frames, root_path=str(tmp_path))
+    assert summary.loc["a", "d_mean"] == pytest.approx(0.77)
+    written = pd.read_csv(tmp_path / "summary.csv", index_col=0)
+    assert list(written.index) == ["a", "b"]
+    assert written.loc["b", "n_frames"] == 1
+
+
+def test_only_files_of_equal_size_are_hashed(tmp_path, monkeypatch):
+    import src.main as main_module
+    from qmanalysis.containers import AtomData, FrameData
+    (tmp_path / "a1.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.74\n")
+    (tmp_path / "a2.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 0.75\n")
+    (tmp_path / "b.xyz").write_text("2\nc\nH 0 0 0\nH 0 0 1.5  \n")
+    hashed = []
+    read_shared_blocks = main_module.read_shared_blocks
+
+    def recording(parsed, reader, ftype, data=None, **reader_args):
+        hashed.append(Path(reader_args["file_path"]).name)
+        return read_shared_blocks(parsed, reader, ftype, data=data, **reader_args)
+    monkeypatch.setattr(main_module, "read_shared_blocks", recording)
+    yamldata = {"files": [{"path": "*.xyz", "type": "xyz", "glob": True}]}
+    atoms, frames = AtomData(), FrameData()
+    main_module.load_files(yamldata, atoms, frames, root_path=str(tmp_path))
+    assert sorted(hashed) == ["a1.xyz", "a2.xyz"]
+    assert len(frames.dataframe) == 3
@@ -113,3 +113,27 @@ def test_dihedral_linear():
     ])
     angle = m.dihedral(atom, 0, 1, 2, 3)
     assert pytest.approx(angle, abs=0.1) == 0.0
+
+
+def test_mass_descriptors():
+    class DummyAtomData:
+        pass
+    atom_data = DummyAtomData()
+    index = pd.MultiIndex.from_tuples(
+        [("a", "a.xyz", None, 1), ("a", "a.xyz", None, 2),
+         ("b", "b.xyz", "t1", 1), ("b", "b.xyz", "t1", 2), ("b", "b.xyz", "t1", 3)],
+        names=["file_name", "file_path", "timestep_name", "atom_index"])
+    atom_data.dataframe = pd.DataFrame({
+        "element": ["C", "O", "H", "H", "Xx"],
+        "x": [0.0, 1.0, -1.0, 1.0, 0.0], "y": 0.0, "z": 0.0}, index=index)
+    descriptors = Measure().mass_descriptors(atom_data)
+    co = descriptors.loc[("a", "a.xyz")].iloc[0]
+    mc, mo = 12.011, 15.999
+    com = mo / (mc + mo)
+    assert co["com_x"] == pytest.approx(com)
+    reduced = mc * mo / (mc + mo)
+    np.testing.assert_allclose(co[["moment_1", "moment_2", "moment_3"]].to_numpy(float),
+                               [0.0, reduced, reduced], atol=1e-12)
+    assert co["radius_of_gyration"] == pytest.approx(np.sqrt(reduced / (mc + mo)))
+    # An atom of unknown element makes the whole frame NaN
+    assert descriptors.loc[("b", "b.xyz", "t1")].isna().all()
@@ -0,0 +1,48 @@
+import threading
+import pytest
+from qmanalysis.prefetch import Prefetcher
+from qmanalysis.fileopener import open_text
+
+
+def test_prefetcher_yields_files_in_order(tmp_path):
+    paths = []
+    for i in range(7):
+        path = tmp_path / f"f{i}.txt"
+        path.write_bytes(f"content {i}".encode())
+        paths.append(path)
+    result = list(Prefetcher(paths, depth=3, workers=2))
+    assert [p for p, _ in result] == paths
+    assert [d for _, d in result] == [f"content {i}".encode() for i in range(7)]
+
+
+def test_prefetcher_bounds_reads_in_flight():
+    started = []
+    lock = threading.Lock()
+
+    def read(path):
+        with lock:
+            started.append(path)
+        return path
+
+    prefetched = iter(Prefetcher(range(20), depth=2, read=read))
+    assert next(prefetched) == (0, 0)
+    # The consumed file plus at most `depth` files ahead of it
+    assert len(started) <= 4
+    assert [d for _, d in prefetched] == list(range(1, 20))
+
+
+def test_prefetcher_raises_read_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(Prefetcher([tmp_path / "missing.xyz"], depth=1))
+
+
+def test_prefetcher_rejects_zero_depth():
+    with pytest.raises(ValueError):
+        Prefetcher([], depth=0)
+
+
+def test_open_text_from_buffer(tmp_path):
+    with open_text(tmp_path / "unused", b"a\r\nb\n") as f:
+        assert f.readlines() == ["a\n", "b\n"]
+    with open_text(tmp_path / "unused", "a\nb\n") as f:
+        assert f.readlines() == ["a\n", "b\n"]
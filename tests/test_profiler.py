@@ -0,0 +1,63 @@
+import csv
+import json
+import pytest
+from qmanalysis.profiler import StageProfiler
+
+
+def test_stage_records_timings():
+    profiler = StageProfiler()
+    with profiler.stage("load", file_path="a.xyz") as record:
+        record["rows"] = 3
+    assert len(profiler.records) == 1
+    rec = profiler.records[0]
+    assert rec["stage"] == "load"
+    assert rec["file_path"] == "a.xyz"
+    assert rec["rows"] == 3
+    assert rec["wall_s"] >= 0.0
+    assert rec["cpu_s"] >= 0.0
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler(enabled=False)
+    with profiler.stage("load") as record:
+        record["rows"] = 3
+    assert profiler.records == []
+
+
+def test_nested_stages_are_recorded_inner_first():
+    profiler = StageProfiler()
+    with profiler.stage("load_files"):
+        with profiler.stage("load", file_path="a.xyz"):
+            pass
+    assert [r["stage"] for r in profiler.records] == ["load", "load_files"]
+
+
+def test_stage_recorded_on_exception():
+    profiler = StageProfiler()
+    with pytest.raises(ValueError):
+        with profiler.stage("calc"):
+            raise ValueError("boom")
+    assert profiler.records[0]["stage"] == "calc"
+
+
+def test_write_report_json_and_csv(tmp_path):
+    profiler = StageProfiler()
+    with profiler.stage("measurements") as record:
+        record["rows"] = 5
+    profiler.write_report(tmp_path / "report.json")
+    profiler.write_report(tmp_path / "report.csv")
+    data = json.loads((tmp_path / "report.json").read_text())
+    assert data["stages"][0]["stage"] == "measurements"
+    with open(tmp_path / "report.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["stage"] == "measurements"
+    assert rows[0]["rows"] == "5"
+
+
+def test_cprofile_dump_per_stage(tmp_path):
+    profiler = StageProfiler(cprofile_dir=tmp_path / "prof")
+    with profiler.stage("load_files"):
+        with profiler.stage("load"):
+            sum(range(100))
+    dumps = sorted(p.name for p in (tmp_path / "prof").iterdir())
+    assert dumps == ["002_load_files.prof"]
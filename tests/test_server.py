@@ -0,0 +1,72 @@
+import io
+import os
+import threading
+import time
+import pytest
+from qmanalysis.server import ParsedFileCache, serve, submit
+
+
+def test_cache_hit_and_lru_eviction():
+    cache = ParsedFileCache(max_entries=2)
+    calls = []
+
+    def loader(value):
+        def load():
+            calls.append(value)
+            return value
+        return load
+    assert cache.get_or_load("a", loader("A")) == "A"
+    assert cache.get_or_load("b", loader("B")) == "B"
+    assert cache.get_or_load("a", loader("A2")) == "A"
+    cache.get_or_load("c", loader("C"))
+    # "b" was least recently used and is evicted
+    assert cache.get_or_load("b", loader("B2")) == "B2"
+    assert calls == ["A", "B", "C", "B2"]
+    assert cache.hits == 1
+    assert len(cache) == 2
+
+
+def test_key_changes_when_file_changes(tmp_path):
+    path = tmp_path / "a.xyz"
+    path.write_text("1\nc\nH 0 0 0\n")
+    key1 = ParsedFileCache.make_key("xyz", path, "a", None)
+    path.write_text("1\nc\nH 0 0 1.0\n")
+    os.utime(path, ns=(0, 12345))
+    key2 = ParsedFileCache.make_key("xyz", path, "a", None)
+    assert key1 != key2
+    assert ParsedFileCache.make_key("xyz", path, "b", None) != key2
+
+
+@pytest.fixture
+def server_socket(tmp_path):
+    socket_path = tmp_path / "q.sock"
+    jobs = []
+
+    def run_job(job, cache):
+        jobs.append(job)
+        if job.get("fail"):
+            raise ValueError("bad job")
+        cache.get_or_load(job["inputfile"], lambda: job["inputfile"])
+        print(f"ran {job['inputfile']}")
+
+    thread = threading.Thread(target=serve, args=(socket_path, run_job), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    return socket_path, jobs
+
+
+def test_submit_streams_output(server_socket):
+    socket_path, jobs = server_socket
+    out = io.StringIO()
+    assert submit(socket_path, {"inputfile": "job.yaml"}, out=out) == 0
+    assert "ran job.yaml" in out.getvalue()
+    assert jobs == [{"inputfile": "job.yaml"}]
+
+
+def test_submit_reports_errors(server_socket, capsys):
+    socket_path, _ = server_socket
+    assert submit(socket_path, {"inputfile": "job.yaml", "fail": True}, out=io.StringIO()) == 1
+    assert "bad job" in capsys.readouterr().err
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis import spectra as sp
+
+
+@pytest.mark.parametrize("lineshape", ["lorentzian", "gaussian"])
+def test_broadening_matches_direct_sum(lineshape):
+    grid = sp.wavenumber_grid(0.0, 2000.0, 1.0)
+    positions = np.array([[500.0, 1200.0, 1700.0], [800.0, np.nan, 2500.0]])
+    intensities = np.array([[10.0, 40.0, 5.0], [20.0, 1.0, 3.0]])
+    result = sp.broaden(sp.stick_spectra(positions, intensities, grid), lineshape, fwhm=20.0)
+    x = grid[:, None]
+    if lineshape == "lorentzian":
+        shape = 10.0 / np.pi / ((x - positions[0]) ** 2 + 100.0)
+    else:
+        sigma = 20.0 / (2 * np.sqrt(2 * np.log(2)))
+        shape = np.exp(-0.5 * ((x - positions[0]) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+    np.testing.assert_allclose(result[0], shape @ intensities[0], atol=1e-9)
+    # NaN and out-of-grid modes are left out, the area within the grid is kept
+    assert result[1].argmax() == 800
+    assert result[1].sum() == pytest.approx(20.0, rel=1e-2)
+
+
+def test_stick_spectra_interpolates_between_points():
+    grid = sp.wavenumber_grid(0.0, 10.0, 2.0)
+    sticks = sp.stick_spectra([[3.0, 10.0, -1.0]], [[4.0, 1.0, 7.0]], grid)
+    assert sticks.tolist() == [[0.0, 2.0, 2.0, 0.0, 0.0, 1.0]]
+
+
+def test_broaden_in_chunks(monkeypatch):
+    grid = sp.wavenumber_grid(0.0, 500.0, 1.0)
+    rng = np.random.default_rng(0)
+    sticks = sp.stick_spectra(rng.uniform(0, 500, (7, 5)), rng.uniform(0, 10, (7, 5)), grid)
+    whole = sp.broaden(sticks)
+    monkeypatch.setattr(sp, "SPECTRA_CHUNK_BYTES", 1)
+    np.testing.assert_allclose(sp.broaden(sticks), whole)
+    with pytest.raises(ValueError):
+        sp.broaden(sticks, "voigt")
+
+
+def test_frame_spectra_and_average(tmp_path):
+    class DummyFrameData:
+        pass
+    frame_data = DummyFrameData()
+    index = pd.MultiIndex.from_tuples([("a", "a.out", None), ("b", "b.out", None), ("c", "c.xyz", None)],
+                                      names=["file_name", "file_path", "timestep_name"])
+    frame_data.dataframe = pd.DataFrame({
+        "frequencies": [np.array([1000.0]), np.array([2000.0]), pd.NA],
+        "ir_intensities": [np.array([1.0]), np.array([1.0]), pd.NA],
+        "HF": [-10.0, -10.0 + 0.01, -20.0]}, index=index)
+    grid = sp.wavenumber_grid(0.0, 3000.0, 1.0)
+    frames, spectra = sp.frame_spectra(frame_data, "ir", grid, fwhm=4.0)
+    assert list(frames.get_level_values("file_name")) == ["a", "b"]
+    average, weights = sp.ensemble_average(spectra, frame_data.dataframe.loc[frames, "HF"], 298.15)
+    assert weights[0] > 0.99
+    assert average.argmax() == 1000
+    average, weights = sp.ensemble_average(spectra)
+    assert weights.tolist() == [0.5, 0.5]
+    path = tmp_path / "ir.npz"
+    sp.save_spectra(path, grid, frames, spectra, weights, average)
+    with np.load(path) as saved:
+        assert saved["spectra"].shape == (2, len(grid))
+        assert saved["spectra"].dtype == np.float32
+        assert saved["file_name"].tolist() == ["a", "b"]
+        assert saved["timestep_name"].tolist() == ["", ""]
+    with pytest.raises(ValueError):
+        sp.frame_spectra(frame_data, "uv")
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from qmanalysis import thermochemistry as th
+
+# Principal moments (u Å²) of water
+WATER_MOMENTS = [0.6148, 1.1551, 1.7699]
+WATER_FREQUENCIES = [1713.0, 3727.0, 3849.0]
+
+
+def test_atom_translational_entropy():
+    # Sackur-Tetrode entropy of argon at 1 atm
+    result = th.thermochemistry(th.pad_modes([[]]), [298.15], [39.948], [[0.0, 0.0, 0.0]])
+    assert result["entropy"][0, 0] * th.CALORIE == pytest.approx(154.74, abs=0.01)
+    assert result["zpe"][0] == 0.0
+    kt = th.BOLTZMANN * 298.15 / th.HARTREE
+    assert result["enthalpy"][0, 0] == pytest.approx(2.5 * kt)
+
+
+def test_water_matches_harmonic_reference():
+    result = th.thermochemistry([WATER_FREQUENCIES], [298.15, 500.0], [18.015], [WATER_MOMENTS],
+                                symmetry_numbers=2, qrrho_cutoff=None)
+    assert result["zpe"][0] == pytest.approx(0.02116, abs=1e-5)
+    assert result["entropy"][0, 0] == pytest.approx(45.06, abs=0.01)
+    kt = th.BOLTZMANN * 298.15 / th.HARTREE
+    # Thermal vibrational energy of these modes is negligible at room temperature
+    assert result["enthalpy"][0, 0] == pytest.approx(result["zpe"][0] + 4 * kt, abs=1e-5)
+    s_hartree = result["entropy"] / th._ENTROPY_UNIT / th.HARTREE
+    np.testing.assert_allclose(result["free_energy"],
+                               result["enthalpy"] - np.array([298.15, 500.0]) * s_hartree)
+    assert result["entropy"][0, 1] > result["entropy"][0, 0]
+
+
+def test_quasi_rrho_only_changes_low_modes():
+    frequencies = [[15.0] + WATER_FREQUENCIES, WATER_FREQUENCIES + [np.nan]]
+    rrho = th.thermochemistry(frequencies, [298.15], [18.015] * 2, [WATER_MOMENTS] * 2, qrrho_cutoff=None)
+    qrrho = th.thermochemistry(frequencies, [298.15], [18.015] * 2, [WATER_MOMENTS] * 2)
+    assert qrrho["entropy"][0, 0] < rrho["entropy"][0, 0]
+    assert qrrho["entropy"][1, 0] == pytest.approx(rrho["entropy"][1, 0], abs=1e-6)
+    np.testing.assert_allclose(qrrho["enthalpy"], rrho["enthalpy"])
+
+
+def test_imaginary_and_padded_modes_are_skipped():
+    with_imaginary = th.thermochemistry([[-250.0] + WATER_FREQUENCIES], [298.15], [18.015], [WATER_MOMENTS])
+    plain = th.thermochemistry(th.pad_modes([WATER_FREQUENCIES, [1.0]])[:1], [298.15], [18.015],
+                               [WATER_MOMENTS])
+    for key in ("zpe", "enthalpy", "entropy"):
+        np.testing.assert_allclose(with_imaginary[key], plain[key])
+
+
+def test_linear_molecule_rotational_entropy():
+    # CO at 298.15 K: rigid rotor entropy R (ln(T / theta) + 1), theta = 2.77 K
+    result = th.thermochemistry([[2170.0]], [298.15], [28.010], [[0.0, 8.7, 8.7]])
+    atom = th.thermochemistry([[2170.0]], [298.15], [28.010], [[0.0, 0.0, 0.0]])
+    rotational = (result["entropy"] - atom["entropy"])[0, 0]
+    theta = th.PLANCK ** 2 / (8 * np.pi ** 2 * 8.7 * th.AMU * 1e-20 * th.BOLTZMANN)
+    assert rotational == pytest.approx(8.314462618 / th.CALORIE * (np.log(298.15 / theta) + 1))
+
+
+def test_frame_thermochemistry_columns():
+    class DummyFrameData:
+        pass
+    frame_data = DummyFrameData()
+    index = pd.MultiIndex.from_tuples([("a", "a.out", None), ("b", "b.xyz", None)],
+                                      names=["file_name", "file_path", "timestep_name"])
+    frame_data.dataframe = pd.DataFrame({
+        "frequencies": [np.array(WATER_FREQUENCIES), pd.NA], "HF": [-76.4, np.nan],
+        "symmetry_number": [2, pd.NA], "multiplicity": ["1", pd.NA]}, index=index)
+    descriptors = pd.DataFrame({"mass": 18.015, "moment_1": WATER_MOMENTS[0], "moment_2": WATER_MOMENTS[1],
+                                "moment_3": WATER_MOMENTS[2]}, index=index)
+    result = th.frame_thermochemistry(frame_data, descriptors, [298.15, 300], qrrho_cutoff=None)
+    assert list(result.columns) == ["zpe_correction", "H_298.15", "S_298.15", "G_298.15",
+                                    "H_300", "S_300", "G_300"]
+    assert result.loc[("a", "a.out", None), "S_298.15"] == pytest.approx(45.06, abs=0.01)
+    assert result.loc[("a", "a.out", None), "G_298.15"] == pytest.approx(-76.4 + 0.00353, abs=1e-5)
+    assert result.loc[("b", "b.xyz", None)].isna().all()
+    corrections = th.frame_thermochemistry(frame_data, descriptors, [298.15], energy=None)
+    assert -0.01 < corrections.iloc[0]["G_298.15"] < 0.01
+
+
+def test_boltzmann_weights():
+    kt = th.BOLTZMANN * 298.15 / th.HARTREE
+    weights = th.boltzmann_weights([-100.0, -100.0 + kt, np.nan, -100.0], 298.15)
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[1] / weights[0] == pytest.approx(np.exp(-1))
+    assert weights[2] == 0.0 and weights[0] == weights[3]
+    # Large absolute energies do not underflow
+    assert th.boltzmann_weights([-5000.0, -5000.5]).tolist() == pytest.approx([0.0, 1.0])
+    assert np.isnan(th.boltzmann_weights([np.nan])).all()
+
+
+def test_boltzmann_weights_per_group():
+    weights = th.boltzmann_weights([-1.0, -1.0, -7.0, np.nan, np.nan], 298.15, groups=[0, 0, 1, 1, 2])
+    assert weights[:3].tolist() == pytest.approx([0.5, 0.5, 1.0])
+    assert weights[3] == 0.0 and np.isnan(weights[4])
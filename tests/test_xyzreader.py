@@ -108,3 +108,29 @@ C 0.0 0.0 0.0
     idx = ("one", str(file_path), "init", 0)
     assert atom_data.dataframe.loc[idx, "alias"] == "0"
     assert pd.isna(atom_data.dataframe.loc[idx, "charge"])
+
+
+def test_xyzfile_reads_from_buffer():
+    content = "3\nwater\nO 0.0 0.0 0.0\nH 0.0 0.0 1.0\nH 0.0 1.0 0.0\n"
+    atom_data = AtomData()
+    frame_data = FrameData()
+    XYZFile(atom_data, frame_data, "in_memory.xyz",
+            file_name="w", timestep_name="init", data=content.encode())
+    assert frame_data.dataframe.loc[("w", "in_memory.xyz", "init"),
+                                    "file_comment"] == "water"
+    assert len(atom_data.dataframe) == 3
+
+
+@pytest.mark.parametrize("suffix", [".xyz", ".xyz.gz"])
+def test_eager_and_lazy_raw_data_are_identical(tmp_path, suffix):
+    import gzip
+    content = "2\r\n  water?\r\n\r\nO 0.0 0.0 0.0\r\n  H 0.0 0.0 1.0  \r\n\r\n"
+    file_path = tmp_path / ("w" + suffix)
+    data = content.encode()
+    file_path.write_bytes(gzip.compress(data) if suffix.endswith(".gz") else data)
+    texts = []
+    for raw_data in ("eager", "lazy"):
+        frame_data = FrameData()
+        XYZFile(AtomData(), frame_data, str(file_path), raw_data=raw_data)
+        texts.append(str(frame_data.dataframe.iloc[0]["raw_data"]))
+    assert texts[0] == texts[1] == content.replace("\r\n", "\n")
@@ -16,19 +16,12 @@ import math
 import argparse
 import os
 import sys
+from qmanalysis.elements import symbols_from_numbers
+from qmanalysis.fileopener import open_text, strip_compression_suffix
 
 MAXATM = 1000
 MAXBUF = 1000000
 
-# Element symbols, index matches atomic number (1-based in Fortran, so ELMS[1] == "H")
-ELMS = [
-    "Bq", "H", "He", "Li", "Be", "B", "C", "N", "O", "F", "Ne", "Na", "Mg", "Al", "Si", "P", "S", "Cl", "Ar", "K",
-    "Ca", "Sc", "Ti", "V", "Cr", "Mn", "Fe", "Co", "Ni", "Cu", "Zn", "Ga", "Ge", "As", "Se", "Br", "Kr", "Rb", "Sr",
-    "Y", "Zr", "Nb", "Mo", "Tc", "Ru", "Rh", "Pd", "Ag", "Cd", "In", "Sn", "Sb", "Te", "I", "Xe", "Cs", "Ba", "La",
-    "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb", "Lu", "Hf", "Ta", "W", "Re", "Os",
-    "Ir", "Pt", "Au", "Hg", "Tl", "Pb", "Bi", "Po", "At", "Rn", "Fr", "Ra", "Ac", "Th", "Pa", "U", "Np", "Pu", "Am",
-    "Cm", "Bk", "Cf", "Es", "Fm", "Md", "No", "Lr", "Rf", "Ha", "Sg", "Ns", "Hs", "Mt"
-]
 # Orbital labels
 ORT = [
     "S   ", "PX  ", "PY  ", "PZ  ", "XY  ", "XZ  ", "YZ  ", "XX  ", "ZZ  ", "YY  ",
@@ -150,18 +143,18 @@ def parse_gaussian_output(lines):
         z = [0.0]
     else:
         # Parse atom lines
-        el = []
+        numbers = []
         x = []
         y = []
         z = []
         for line in lines[j:k+1]:
             parts = line.split()
             if len(parts) >= 6:
-                atomic_number = int(parts[1])
-                el.append(ELMS[atomic_number])
+                numbers.append(int(parts[1]))
                 x.append(float(parts[3]))
                 y.append(float(parts[4]))
                 z.append(float(parts[5]))
+        el = list(symbols_from_numbers(numbers))
         na = len(el)
 
     # Output coordinates and atomic charges in XYZ format
@@ -304,11 +297,11 @@ def parse_gaussian_output(lines):
 
 
 def get_xyz_filename(input_file):
-    base, ext = os.path.splitext(input_file)
+    base, ext = os.path.splitext(strip_compression_suffix(input_file))
     if ext == ".out":
         return base + ".xyz"
     else:
-        return input_file + ".xyz"
+        return base + ext + ".xyz"
 
 
 def process_file(input_file, output_file, force=False, to_stdout=False):
@@ -316,7 +309,8 @@ def process_file(input_file, output_file, force=False, to_stdout=False):
         print(
             f"Error: Output file '{output_file}' already exists. Use --force to overwrite.", file=sys.stderr)
         return
-    with open(input_file, "r") as f:
+    # Compressed logs are decompressed while reading
+    with open_text(input_file) as f:
         lines = f.readlines()
     from io import StringIO
     import contextlib
@@ -334,7 +328,7 @@ def process_file(input_file, output_file, force=False, to_stdout=False):
 def process_directory(directory, force=False, recurse=False):
     for root, dirs, files in os.walk(directory):
         for fname in files:
-            if fname.endswith(".out"):
+            if strip_compression_suffix(fname).endswith(".out"):
                 in_path = os.path.join(root, fname)
                 out_path = os.path.join(root, get_xyz_filename(fname))
                 if os.path.exists(out_path) and not force:
@@ -357,7 +351,8 @@ def main():
         "  3. Directory mode: Use --dir/-d and provide a directory as the first argument. All .out files in the directory will be converted to .xyz files (with '.out' removed and '.xyz' appended). "
         "Existing .xyz files will not be overwritten unless --force is specified.\n"
         "  4. Recursive directory mode: Use --recurse/-r (implies --dir) to process all .out files in the directory and its subdirectories recursively.\n"
-        "  5. Stdout mode: Use --stdout/-s to print the result to stdout instead of writing to a file.\n\n"
+        "  5. Stdout mode: Use --stdout/-s to print the result to stdout instead of writing to a file.\n"
+        "Compressed input (.out.gz, .out.xz, .out.zst) is decompressed while reading; the compression suffix is dropped from the output name.\n\n"
         "FLAGS:\n"
         "  -f, --force    Overwrite existing .xyz files.\n"
         "  -d, --dir      Treat the input as a directory and process all .out files within.\n"